@@ -0,0 +1,103 @@
+"""DOCX renders per second: shared renderer vs the old per-call python-docx renderer.
+
+Usage:
+    python -m benchmarks.bench_docx_render [--seconds 3]
+
+Renders a typical one-page CV and a ~10-page CV to in-memory bytes.
+"""
+import argparse
+import io
+import re
+import time
+
+from src.services.docx_renderer import render_markup
+
+TYPICAL_CV = """**HEADING: JANE DOE**
+jane@example.com | +1-555-0100 | linkedin.com/in/janedoe
+
+**HEADING: PROFESSIONAL SUMMARY**
+Data engineer with **6 years** of experience building reliable batch and streaming pipelines.
+
+**HEADING: EXPERIENCE**
+**Senior Data Engineer | Acme Corp | 2021-Present**
+• Built **ETL** pipelines processing 500GB daily with Airflow and Spark
+• Cut warehouse costs by **35%** by partitioning and compacting tables
+• Mentored four engineers and led the migration to dbt
+**Data Engineer | Beta Ltd | 2018-2021**
+• Developed Python services for ingestion from 40+ sources
+• Optimized SQL queries, reducing dashboard latency from 30s to 3s
+
+**HEADING: EDUCATION**
+BSc Computer Science | State University | 2018
+
+**HEADING: SKILLS**
+Python, SQL, Spark, Airflow, dbt, AWS, Docker, Kubernetes
+"""
+
+
+def long_cv(pages=10):
+    """Roughly `pages` pages of experience entries"""
+    jobs = []
+    for i in range(pages * 3):
+        jobs.append(f"**Engineer {i} | Company {i} | 20{i % 20:02d}-20{(i + 2) % 20:02d}**")
+        jobs.extend(f"• Delivered **project {i}.{j}** improving throughput by {j * 7}% across teams" for j in range(8))
+    return TYPICAL_CV.replace("**HEADING: EDUCATION**", "\n".join(jobs) + "\n\n**HEADING: EDUCATION**")
+
+
+def legacy_render(text):
+    """The renderer cv_builder/cv_modifier used before: a new Document and re.split per line"""
+    from docx import Document
+    from docx.shared import Pt
+
+    doc = Document()
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith('**HEADING:'):
+            paragraph = doc.add_heading(line.replace('**HEADING:', '').replace('**', '').strip(), level=1)
+            paragraph.runs[0].font.size = Pt(16)
+            paragraph.runs[0].font.bold = True
+        else:
+            if line.startswith('• '):
+                paragraph = doc.add_paragraph(style='List Bullet')
+                line = line[2:]
+            else:
+                paragraph = doc.add_paragraph()
+            for part in re.split(r'(\*\*.*?\*\*)', line):
+                if part.startswith('**') and part.endswith('**'):
+                    paragraph.add_run(part[2:-2]).bold = True
+                elif part:
+                    paragraph.add_run(part)
+
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def measure(label, fn, text, seconds):
+    fn(text)  # warm up (loads the template)
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        fn(text)
+        count += 1
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {count / elapsed:8.1f} renders/s   {elapsed / count * 1000:7.2f} ms/render")
+    return count / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=3.0, help="time per measurement")
+    args = parser.parse_args()
+
+    for name, text in (("typical CV", TYPICAL_CV), ("10-page CV", long_cv(10))):
+        print(f"{name}: {len(text.splitlines())} lines, {len(render_markup(text)) // 1024} KB docx")
+        legacy = measure("  legacy (python-docx per call)", legacy_render, text, args.seconds)
+        shared = measure("  shared renderer", render_markup, text, args.seconds)
+        print(f"  speedup {shared / legacy:.1f}x\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Time and peak memory of the per-request hot paths, saved as JSON for comparison across commits.
+
+Usage:
+    python -m benchmarks.bench_hot_paths [--sizes small,medium,large] [-k docx] [--min-time 1.0]
+        [--save results.json] [--compare baseline.json] [--threshold 0.10] [--fail-on-regression]
+
+Benchmarks parse_pdf, parse_docx, build_prompt (with a cold and a cached CV
+parse), generate_cv_file, create_docx_from_text and create_cover_letter_docx
+on the synthetic corpus from benchmarks.corpus. Each case is run
+until --min-time has passed (at least --min-runs times) after one warm-up
+call. Peak memory is measured on a separate call under tracemalloc, so it
+counts Python allocations only (not lxml's C buffers) and doesn't slow down
+the timed runs.
+
+--compare prints the change in median time and peak memory against a saved
+run; changes beyond --threshold are flagged, and --fail-on-regression exits
+with status 1 if any case got slower or bigger.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from benchmarks.corpus import SIZES, build_corpus
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def cases(corpus, work_dir):
+    """[(name, size, fn)] for every hot path and corpus size"""
+    from src.services import cv_parser
+    from src.services.ai_analizer import build_prompt
+    from src.services.cover_letter_generator import create_cover_letter_docx
+    from src.services.cv_builder import generate_cv_file
+    from src.services.cv_modifier import create_docx_from_text
+    from src.services.file_parser import parse_docx, parse_pdf
+
+    user_info = {"name": "Alex Taylor", "email": "alex@example.com", "phone": "+44 7700 900123"}
+    output_path = os.path.join(work_dir, "out.docx")
+
+    def build_prompt_cold(text, jd):
+        cv_parser._structured_cvs.clear()
+        return build_prompt(text, jd)
+
+    found = []
+    for size, entry in corpus.items():
+        text, markup, jd = entry["text"], entry["markup"], entry["job_description"]
+        letter = "\n\n".join(jd.split("\n\n")[:4])
+        found += [
+            ("parse_pdf", size, lambda entry=entry: parse_pdf(entry["pdf"])),
+            ("parse_docx", size, lambda entry=entry: parse_docx(entry["docx"])),
+            ("build_prompt", size, lambda text=text, jd=jd: build_prompt_cold(text, jd)),
+            ("build_prompt (cached parse)", size, lambda text=text, jd=jd: build_prompt(text, jd)),
+            ("generate_cv_file", size, lambda markup=markup: generate_cv_file(markup, "bench_generated_cv.docx")),
+            ("create_docx_from_text", size, lambda markup=markup: create_docx_from_text(markup, output_path)),
+            ("create_cover_letter_docx", size,
+             lambda letter=letter: create_cover_letter_docx(letter, user_info, "bench_cover_letter.docx")),
+        ]
+    return found
+
+
+def measure(fn, min_time, min_runs):
+    """Timing stats (ms) and peak traced memory (bytes) of fn()"""
+    fn()  # warm up: imports, templates, caches a real process would already have
+
+    timings = []
+    start = time.perf_counter()
+    while len(timings) < min_runs or time.perf_counter() - start < min_time:
+        call_start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - call_start) * 1000)
+
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "runs": len(timings),
+        "min_ms": round(timings[0], 4),
+        "median_ms": round(statistics.median(timings), 4),
+        "mean_ms": round(statistics.mean(timings), 4),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 4),
+        "stdev_ms": round(statistics.stdev(timings), 4) if len(timings) > 1 else 0.0,
+        "peak_kb": round(peak / 1024, 1)
+    }
+
+
+def compare(results, baseline, threshold):
+    """[(key, time change, memory change, regressed)] for cases present in both runs"""
+    rows = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if not previous:
+            continue
+        time_change = current["median_ms"] / previous["median_ms"] - 1 if previous["median_ms"] else 0.0
+        memory_change = current["peak_kb"] / previous["peak_kb"] - 1 if previous["peak_kb"] else 0.0
+        rows.append((key, time_change, memory_change, time_change > threshold or memory_change > threshold))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(SIZES))
+    parser.add_argument("-k", "--filter", default="", help="only cases whose name contains this")
+    parser.add_argument("--min-time", type=float, default=1.0, help="seconds per case")
+    parser.add_argument("--min-runs", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--save", default=None, help="write results to this JSON file")
+    parser.add_argument("--compare", default=None, help="JSON results of an earlier run")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative change flagged as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="jobfit-bench-")
+    try:
+        corpus = build_corpus(os.path.join(work_dir, "corpus"), args.sizes.split(","), args.seed)
+        results = {}
+        print(f"{'case':<44} {'runs':>6} {'median ms':>10} {'p95 ms':>10} {'peak KB':>9}")
+        for name, size, fn in cases(corpus, work_dir):
+            key = f"{name}[{size}]"
+            if args.filter not in key:
+                continue
+            results[key] = stats = measure(fn, args.min_time, args.min_runs)
+            print(f"{key:<44} {stats['runs']:>6} {stats['median_ms']:>10.3f} {stats['p95_ms']:>10.3f} "
+                  f"{stats['peak_kb']:>9.1f}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        for name in ("bench_generated_cv.docx", "bench_cover_letter.docx"):
+            if os.path.exists(f"/tmp/{name}"):
+                os.remove(f"/tmp/{name}")
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "min_time": args.min_time
+        },
+        "results": results
+    }
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved {len(results)} results to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows = compare(results, baseline["results"], args.threshold)
+        print(f"\nAgainst {args.compare} (commit {baseline['meta'].get('commit')}):")
+        print(f"{'case':<44} {'time':>9} {'memory':>9}")
+        for key, time_change, memory_change, regressed in rows:
+            print(f"{key:<44} {time_change:>+9.1%} {memory_change:>+9.1%}{'   REGRESSION' if regressed else ''}")
+        if args.fail_on_regression and any(row[3] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
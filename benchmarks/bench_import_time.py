@@ -0,0 +1,95 @@
+"""Cold-start import time of the app (or any module), like `python -X importtime`.
+
+Each run imports the module in a fresh interpreter, so nothing is cached in
+sys.modules. Reports wall-clock import time over the runs and the slowest
+imports by cumulative time from the last run, plus whether the heavy service
+libraries got imported eagerly.
+
+Usage:
+    python -m benchmarks.bench_import_time [--module src.main] [-n 5] [--top 15] [--json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Libraries that should only load on first use
+HEAVY_MODULES = ("openai", "docx", "PyPDF2", "supabase", "httpx", "sqlalchemy", "numpy")
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "eager": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def run_once(module):
+    """Import module in a fresh interpreter; return (seconds, eager heavy modules, importtime rows)"""
+    code = PROBE.format(module=module, heavy=HEAVY_MODULES)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, cwd=os.getcwd(), env=os.environ.copy()
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    return probe["seconds"], probe["eager"], parse_importtime(result.stderr)
+
+
+def parse_importtime(stderr):
+    """Parse -X importtime output into [(cumulative_us, self_us, module)]"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+        except ValueError:
+            continue
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="src.main")
+    parser.add_argument("-n", "--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", action="store_true", help="print one JSON line (for tracking over time)")
+    args = parser.parse_args()
+
+    timings = []
+    eager, rows = [], []
+    for _ in range(args.runs):
+        seconds, eager, rows = run_once(args.module)
+        timings.append(seconds * 1000)
+
+    summary = {
+        "module": args.module,
+        "runs": args.runs,
+        "median_ms": round(statistics.median(timings), 1),
+        "min_ms": round(min(timings), 1),
+        "max_ms": round(max(timings), 1),
+        "eager_heavy_modules": eager
+    }
+
+    if args.json:
+        print(json.dumps(summary))
+        return
+
+    print(f"import {args.module}: median {summary['median_ms']} ms "
+          f"(min {summary['min_ms']}, max {summary['max_ms']}) over {args.runs} runs")
+    print(f"heavy libraries imported eagerly: {', '.join(eager) or 'none'}\n")
+
+    print(f"{'cumulative':>12} {'self':>10}  module")
+    for cumulative_us, self_us, name in sorted(rows, reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:10.1f}ms {self_us / 1000:8.1f}ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
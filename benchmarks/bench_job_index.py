@@ -0,0 +1,65 @@
+"""Job index: vectorize throughput and cosine top-k search latency.
+
+Usage:
+    python -m benchmarks.bench_job_index [--postings 2000] [--queries 32] [--dims 2048]
+
+Postings are synthetic job descriptions built from a shared vocabulary, so
+they overlap the way real postings for related roles do.
+"""
+import argparse
+import random
+import time
+
+from src.services.job_index import JobIndex, vectorize
+
+WORDS = (
+    "python sql spark airflow aws gcp azure kubernetes docker terraform java scala go react typescript "
+    "data engineer backend frontend platform senior staff lead remote hybrid pipelines streaming batch "
+    "warehouse modelling analytics machine learning mlops api microservices postgres kafka dbt snowflake "
+    "experience years team build maintain design scale reliable product customers mentor ownership"
+).split()
+
+
+def posting(rng, words=180):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--postings", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=32)
+    parser.add_argument("--dims", type=int, default=2048)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    rows = [{"id": i, "user_id": "u1", "job_description": posting(rng)} for i in range(args.postings)]
+    queries = [posting(rng) for _ in range(args.queries)]
+
+    start = time.perf_counter()
+    vectorize([row["job_description"] for row in rows], args.dims)
+    elapsed = time.perf_counter() - start
+    print(f"vectorize: {args.postings / elapsed:8.0f} postings/s")
+
+    index = JobIndex(lambda user_id: rows, dims=args.dims)
+    start = time.perf_counter()
+    index.search("u1", queries[:1])
+    print(f"first search (loads {args.postings} rows): {(time.perf_counter() - start) * 1000:7.1f} ms")
+
+    start = time.perf_counter()
+    for query in queries:
+        index.search("u1", [query], k=5)
+    single = (time.perf_counter() - start) / len(queries)
+
+    start = time.perf_counter()
+    index.search("u1", queries, k=5)
+    batched = (time.perf_counter() - start) / len(queries)
+    print(f"search: {single * 1000:.2f} ms/query one at a time, {batched * 1000:.2f} ms/query batched")
+
+    start = time.perf_counter()
+    index.append([{"id": args.postings + i, "user_id": "u1", "job_description": query} for i, query in enumerate(queries)])
+    print(f"append: {(time.perf_counter() - start) / len(queries) * 1000:.2f} ms/posting")
+    print(f"index memory: {index.stats()['bytes'] / 1024 / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Data layer throughput against a SqlRepository (local SQLite by default).
+
+Usage:
+    python -m benchmarks.bench_repository [--url sqlite:///bench.db] [--users 50] [--rows 2000] [-n 500]
+
+Pass a postgresql:// URL to measure a real Postgres instead. The tables are
+created if missing; rows are written under random user ids each run.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from src.services.repository import SqlRepository
+
+FEED_COLUMNS = ("id", "created_at", "match_score", "job_description_preview", "original_cv_path", "improved_cv_path")
+
+
+def make_rows(user_ids, count):
+    start = datetime.now(timezone.utc) - timedelta(days=365)
+    rows = []
+    for i in range(count):
+        rows.append({
+            "user_id": random.choice(user_ids),
+            "job_description": "We are hiring a backend engineer. " * 30,
+            "match_score": random.randint(0, 100),
+            "matching_skills": random.sample(["Python", "SQL", "FastAPI", "Docker", "AWS"], 3),
+            "missing_skills": random.sample(["Kubernetes", "Go", "Terraform", "Kafka", "Rust"], 2),
+            "suggestions": ["Quantify achievements"],
+            "cover_letter_points": [],
+            "created_at": (start + timedelta(seconds=i * 60)).isoformat()
+        })
+    return rows
+
+
+def run(label, fn, iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    total = sum(timings) / 1000
+    print(f"{label:<28} mean {statistics.mean(timings):8.3f} ms   "
+          f"p50 {statistics.median(timings):8.3f} ms   p95 {p95:8.3f} ms   {iterations / total:9.0f} ops/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=None, help="database URL (default: a temporary SQLite file)")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("-n", "--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    tmp_dir = None
+    url = args.url
+    if url is None:
+        tmp_dir = tempfile.mkdtemp(prefix="jobfit-bench-")
+        url = f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+
+    repo = SqlRepository(url)
+    user_ids = [str(uuid.uuid4()) for _ in range(args.users)]
+    rows = make_rows(user_ids, args.rows)
+
+    print(f"{url}\n{args.rows} rows, {args.users} users, {args.iterations} iterations\n")
+
+    start = time.perf_counter()
+    for offset in range(0, len(rows), 50):
+        repo.insert_rows("cv_analyses", rows[offset:offset + 50])
+    elapsed = time.perf_counter() - start
+    print(f"{'batched insert (50/batch)':<28} {len(rows) / elapsed:9.0f} rows/s")
+
+    single = make_rows(user_ids, args.iterations)
+    run("single-row insert", lambda: repo.insert_rows("cv_analyses", [single.pop()]), args.iterations)
+    run("list user analyses", lambda: repo.list_user_rows("cv_analyses", random.choice(user_ids)), args.iterations)
+    run("feed page (20)",
+        lambda: repo.feed_page("cv_analyses", FEED_COLUMNS, random.choice(user_ids), None, 0, 21), args.iterations)
+    run("latest analysis id", lambda: repo.latest_row_id("cv_analyses", random.choice(user_ids)), args.iterations)
+    run("skill filter", lambda: repo.rows_with_skill(
+        random.choice(user_ids), "Kubernetes", "missing_skills", ("id", "created_at")), args.iterations)
+
+    repo.engine.dispose()
+    if tmp_dir:
+        for name in os.listdir(tmp_dir):
+            os.remove(os.path.join(tmp_dir, name))
+        os.rmdir(tmp_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Storage call latency with a fresh client per call vs the pooled client.
+
+Usage:
+    python -m benchmarks.bench_storage_clients --token <access_token> --path <user_id>/<file>.docx -n 50
+
+Needs SUPABASE_URL / SUPABASE_KEY and a real object in the cv-files bucket.
+Without --path only client construction is measured.
+"""
+import argparse
+import statistics
+import time
+
+from supabase import create_client
+
+from src.services import clients
+
+
+def fresh_client(access_token):
+    """The old behaviour: build a new client (and session) for every call"""
+    client = create_client(clients.url, clients.key)
+    if access_token:
+        client.auth.set_session(access_token, "")
+    return client
+
+
+def sign(client, path):
+    return client.storage.from_("cv-files").create_signed_url(path=path, expires_in=3600)
+
+
+def run(label, fn, iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(f"{label:<28} mean {statistics.mean(timings):8.2f} ms   "
+          f"p50 {statistics.median(timings):8.2f} ms   p95 {p95:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--token", default=None, help="user access token")
+    parser.add_argument("--path", default=None, help="storage path to sign")
+    parser.add_argument("-n", "--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{args.iterations} iterations\n")
+
+    run("client setup (fresh)", lambda: fresh_client(args.token), args.iterations)
+    run("client setup (pooled)", lambda: clients.get_supabase_client(args.token), args.iterations)
+
+    if args.path:
+        run("signed URL (fresh client)", lambda: sign(fresh_client(args.token), args.path), args.iterations)
+        run("signed URL (pooled client)",
+            lambda: sign(clients.get_supabase_client(args.token), args.path), args.iterations)
+
+
+if __name__ == "__main__":
+    main()
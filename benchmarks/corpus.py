@@ -0,0 +1,172 @@
+"""Synthetic CVs and job descriptions for benchmarks, as markup, DOCX and PDF.
+
+Usage:
+    python -m benchmarks.corpus [--out bench_corpus] [--sizes small,medium,large] [--seed 7]
+
+Everything is generated from a seeded RNG, so the same size and seed give the
+same documents on every machine and commit. DOCX files are written the way
+Word users send them (heading and bullet styles), not with our own renderer,
+and PDFs by a tiny text-only PDF writer, so no extra dependency is needed.
+"""
+import argparse
+import os
+import random
+
+# roles, bullets per role, skills lines
+SIZES = {
+    "small": (2, 3, 1),
+    "medium": (5, 6, 3),
+    "large": (20, 8, 6),
+}
+
+FIRST_NAMES = ("Alex", "Sam", "Jordan", "Priya", "Mateo", "Aisha", "Lena", "Tom")
+LAST_NAMES = ("Taylor", "Nguyen", "Okafor", "Schmidt", "Rossi", "Kowalski", "Silva", "Patel")
+COMPANIES = ("Northwind", "Contoso", "Fabrikam", "Globex", "Initech", "Umbrella", "Hooli", "Vandelay", "Stark")
+TITLES = ("Backend Engineer", "Data Engineer", "Platform Engineer", "ML Engineer", "Software Engineer")
+SKILLS = ("Python", "SQL", "FastAPI", "Docker", "Kubernetes", "AWS", "PostgreSQL", "React", "TypeScript",
+          "Terraform", "Kafka", "Go", "Machine Learning", "CI/CD", "Git", "Redis", "Airflow", "Spark", "dbt")
+VERBS = ("Built", "Led", "Designed", "Migrated", "Optimized", "Automated", "Scaled", "Shipped")
+OBJECTS = ("the billing pipeline", "an event ingestion service", "the search API", "our CI/CD platform",
+           "a feature store", "the reporting warehouse", "customer onboarding flows", "the auth service")
+
+
+def cv_markup(size="medium", seed=7):
+    """A CV in the app's markup (**HEADING: ...**, • bullets, **bold**)"""
+    roles, bullets, skill_lines = SIZES[size]
+    rng = random.Random(f"{size}:{seed}")
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    lines = [
+        f"**HEADING: {name.upper()}**",
+        f"{name.split()[0].lower()}@example.com | +44 7700 900{rng.randint(100, 999)} | "
+        f"linkedin.com/in/{name.replace(' ', '').lower()}",
+        "",
+        "**HEADING: PROFESSIONAL SUMMARY**",
+        f"{rng.choice(TITLES)} with **{roles + 2} years** of experience building reliable, data-heavy services.",
+        "",
+        "**HEADING: EXPERIENCE**",
+    ]
+    year = 2024
+    for _ in range(roles):
+        start = year - rng.randint(1, 3)
+        lines.append(f"**{rng.choice(TITLES)} | {rng.choice(COMPANIES)} | {start}-{year}**")
+        for _ in range(bullets):
+            lines.append(f"• {rng.choice(VERBS)} {rng.choice(OBJECTS)} with {rng.choice(SKILLS)}, "
+                         f"cutting latency by **{rng.randint(10, 80)}%** for {rng.randint(2, 90)}k users")
+        year = start
+    lines += ["", "**HEADING: EDUCATION**", f"**BSc Computer Science | University of Leeds | {year - 1}**", "",
+              "**HEADING: SKILLS**"]
+    for index in range(skill_lines):
+        lines.append(f"{('Languages', 'Tools', 'Cloud', 'Data', 'Practices', 'Other')[index]}: "
+                     + ", ".join(rng.sample(SKILLS, 6)))
+    return "\n".join(lines) + "\n"
+
+
+def plain_text(markup):
+    """The markup as the text a parser would extract from a document"""
+    return "\n".join(line.replace("**HEADING:", "").replace("**", "").strip() for line in markup.splitlines())
+
+
+def job_description(size="medium", seed=7):
+    roles, bullets, _ = SIZES[size]
+    rng = random.Random(f"jd:{size}:{seed}")
+    paragraphs = [f"{rng.choice(COMPANIES)} is hiring a {rng.choice(TITLES)} to join a product team of "
+                  f"{rng.randint(5, 40)} engineers."]
+    for _ in range(roles):
+        paragraphs.append("Responsibilities:\n" + "\n".join(
+            f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} using {rng.choice(SKILLS)}" for _ in range(bullets)))
+    paragraphs.append("Requirements:\n" + "\n".join(f"- {rng.randint(2, 6)}+ years with {skill}"
+                                                    for skill in rng.sample(SKILLS, 6)))
+    return "\n\n".join(paragraphs)
+
+
+def write_docx(markup, path):
+    """A DOCX with Word's Heading 1 and List Bullet styles"""
+    from docx import Document
+
+    document = Document()
+    for line in markup.splitlines():
+        line = line.strip()
+        if line.startswith("**HEADING:"):
+            document.add_heading(line.replace("**HEADING:", "").replace("**", "").strip(), level=1)
+        elif line.startswith("• "):
+            document.add_paragraph(line[2:].replace("**", ""), style="List Bullet")
+        elif line:
+            document.add_paragraph(line.replace("**", ""))
+    document.save(path)
+    return path
+
+
+def _pdf_string(text):
+    encoded = text.encode("cp1252", errors="replace")
+    return b"(" + encoded.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def write_pdf(text, path, lines_per_page=56, font_size=10):
+    """A text-only PDF (Helvetica, WinAnsi) with one line of text per line, paginated"""
+    lines = text.splitlines() or [""]
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)]
+
+    # 1 catalog, 2 page tree, 3 font, then a page and a content stream per page
+    objects = [None, None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"]
+    page_ids = []
+    for page_lines in pages:
+        stream = b"BT /F1 %d Tf %d TL 56 790 Td\n" % (font_size, font_size + 4)
+        stream += b"".join(_pdf_string(line) + b" Tj T*\n" for line in page_lines) + b"ET"
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects))
+        page_ids.append(len(objects))
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % page_id for page_id in page_ids), len(page_ids))
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+
+    with open(path, "wb") as f:
+        f.write(bytes(output))
+    return path
+
+
+def build_corpus(directory, sizes=tuple(SIZES), seed=7):
+    """Write cv_<size>.docx/.pdf/.txt and jd_<size>.txt; returns {size: {...}} with texts and paths"""
+    os.makedirs(directory, exist_ok=True)
+    corpus = {}
+    for size in sizes:
+        markup = cv_markup(size, seed)
+        entry = {
+            "markup": markup,
+            "text": plain_text(markup),
+            "job_description": job_description(size, seed),
+            "docx": write_docx(markup, os.path.join(directory, f"cv_{size}.docx")),
+            "pdf": write_pdf(plain_text(markup), os.path.join(directory, f"cv_{size}.pdf")),
+        }
+        for name, text in ((f"cv_{size}.txt", markup), (f"jd_{size}.txt", entry["job_description"])):
+            with open(os.path.join(directory, name), "w") as f:
+                f.write(text)
+        corpus[size] = entry
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", default="bench_corpus")
+    parser.add_argument("--sizes", default=",".join(SIZES))
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.out, args.sizes.split(","), args.seed)
+    for size, entry in corpus.items():
+        print(f"{size:<8} {len(entry['markup'].splitlines()):5d} lines   "
+              f"docx {os.path.getsize(entry['docx']) // 1024:4d} KB   pdf {os.path.getsize(entry['pdf']) // 1024:4d} KB")
+
+
+if __name__ == "__main__":
+    main()
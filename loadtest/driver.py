@@ -0,0 +1,306 @@
+"""Replay realistic JobFit sessions against a running app at a target rate.
+
+Usage:
+    python -m loadtest.driver [--base-url http://127.0.0.1:8000] [--rps 2] [--duration 60] [--warmup 5]
+        [--users 20] [--mix analyze=3,cover_letter=1,cover_letter_batch=0] [--json results.json]
+
+Sessions start open-loop (Poisson arrivals at --rps) so a slow server builds
+up a backlog instead of quietly lowering the load; when --max-sessions are
+already running a new session is counted as dropped. Each virtual user logs
+in once. Session kinds:
+
+    analyze             /analyze -> /apply-changes -> /process-changes
+    cover_letter        /generate-cover-letter for one company
+    cover_letter_batch  /generate-cover-letter for several companies from one base letter
+
+Requests that start during the warmup are not measured. Per route the
+report gives throughput, error counts and p50/p95/p99 latency; --json saves it
+for comparison between runs.
+"""
+import argparse
+import asyncio
+import html
+import io
+import json
+import math
+import random
+import re
+import time
+from collections import Counter, defaultdict
+
+from loadtest.fake_openai import CV_MARKUP, SKILLS
+
+SESSION_KINDS = ("analyze", "cover_letter", "cover_letter_batch")
+COMPANIES = ("Northwind", "Contoso", "Fabrikam", "Globex", "Initech", "Umbrella", "Hooli", "Vandelay")
+TITLES = ("Backend Engineer", "Senior Python Developer", "Data Engineer", "Platform Engineer", "ML Engineer")
+
+_HIDDEN_RE = r'name="{}" value="(.*?)">'
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = max(0, math.ceil(p / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def parse_mix(text):
+    """{"analyze": 3, ...} from "analyze=3,cover_letter=1" """
+    mix = {}
+    for item in text.split(","):
+        kind, _, weight = item.partition("=")
+        kind = kind.strip()
+        if kind not in SESSION_KINDS:
+            raise ValueError(f"Unknown session kind: {kind}")
+        mix[kind] = float(weight or 1)
+    if not any(mix.values()):
+        raise ValueError("The session mix has no weight")
+    return mix
+
+
+def job_description(rng):
+    company, title = rng.choice(COMPANIES), rng.choice(TITLES)
+    required, nice = rng.sample(SKILLS, 5), rng.sample(SKILLS, 3)
+    return (f"{company} is hiring a {title}.\n\n"
+            f"You will design, build and run the services behind our core product, working closely with "
+            f"product and data teams.\n\nRequirements:\n" + "\n".join(f"- Production experience with {skill}"
+                                                                      for skill in required) +
+            "\n\nNice to have:\n" + "\n".join(f"- {skill}" for skill in nice) +
+            f"\n\nWe offer flexible hours, a learning budget and a friendly team. Ref {rng.randint(1000, 9999)}.")
+
+
+def cv_docx(text=CV_MARKUP):
+    """A DOCX CV built from markup text"""
+    from docx import Document
+
+    document = Document()
+    for line in text.splitlines():
+        document.add_paragraph(line.replace("**HEADING:", "").replace("**", "").strip())
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+class Recorder:
+    """Per-route latencies and outcomes for requests started after the warmup"""
+
+    def __init__(self, measure_from):
+        self.measure_from = measure_from
+        self.latencies = defaultdict(list)
+        self.outcomes = defaultdict(Counter)
+        self.sessions = Counter()
+
+    def record(self, route, started, seconds, outcome):
+        if started < self.measure_from:
+            return
+        self.latencies[route].append(seconds)
+        self.outcomes[route][outcome] += 1
+
+    def summary(self, measured_seconds):
+        routes = {}
+        for route in sorted(self.latencies):
+            latencies = sorted(self.latencies[route])
+            outcomes = self.outcomes[route]
+            routes[route] = {
+                "count": len(latencies),
+                "ok": outcomes["ok"],
+                "errors": len(latencies) - outcomes["ok"],
+                "outcomes": dict(outcomes),
+                "throughput_rps": round(len(latencies) / measured_seconds, 3) if measured_seconds else 0.0,
+                "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+                "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+                "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+                "max_ms": round(latencies[-1] * 1000, 1)
+            }
+        return {"measured_seconds": round(measured_seconds, 2), "routes": routes, "sessions": dict(self.sessions)}
+
+
+def outcome_of(response):
+    """"ok", or what went wrong: http_<status>, redirect, error_page"""
+    if response.status_code >= 400:
+        return f"http_{response.status_code}"
+    if 300 <= response.status_code < 400:
+        return "redirect"
+    if response.text.lstrip().startswith("<p>Error"):
+        return "error_page"
+    return "ok"
+
+
+class Driver:
+    def __init__(self, client, recorder, args, rng):
+        self.client = client
+        self.recorder = recorder
+        self.args = args
+        self.rng = rng
+        self.cv_data = cv_docx()
+        self.tokens = []
+        self.job_descriptions = defaultdict(list)
+
+    async def request(self, route, method, path, token=None, **kwargs):
+        """Send one request and record it; returns the response, or None on a transport error"""
+        started = time.monotonic()
+        try:
+            response = await self.client.request(
+                method, path, cookies={"access_token": token} if token else None, **kwargs)
+        except Exception as e:
+            self.recorder.record(route, started, time.monotonic() - started, f"exception:{type(e).__name__}")
+            return None
+        self.recorder.record(route, started, time.monotonic() - started, outcome_of(response))
+        return response
+
+    async def login(self, index):
+        response = await self.client.post("/login", data={
+            "email": f"loadtest-{index}@example.com", "password": "loadtest-password"})
+        token = response.cookies.get("access_token")
+        if not token:
+            raise RuntimeError(f"Login failed for user {index}: HTTP {response.status_code}")
+        return token
+
+    def pick_job_description(self, token):
+        """A fresh posting, or (with --repeat-ratio) one this user already analyzed"""
+        previous = self.job_descriptions[token]
+        if previous and self.rng.random() < self.args.repeat_ratio:
+            return self.rng.choice(previous)
+        text = job_description(self.rng)
+        previous.append(text)
+        return text
+
+    async def analyze_session(self, token):
+        response = await self.request("/analyze", "POST", "/analyze", token, files={
+            "cv_file": ("cv.docx", self.cv_data,
+                        "application/vnd.openxmlformats-officedocument.wordprocessingml.document")
+        }, data={"job_description": self.pick_job_description(token)})
+        if response is None or outcome_of(response) != "ok":
+            return False
+
+        def hidden(name):
+            match = re.search(_HIDDEN_RE.format(name), response.text, re.DOTALL)
+            return html.unescape(match.group(1)) if match else ""
+
+        suggestions = [html.unescape(value) for value in re.findall(_HIDDEN_RE.format("suggestions"), response.text)]
+        form = {"cv_text": hidden("cv_text"), "filename": hidden("filename"),
+                "original_cv_path": hidden("original_cv_path"), "suggestions": suggestions or ["Add metrics"]}
+
+        await asyncio.sleep(self.args.think_time)
+        response = await self.request("/apply-changes", "POST", "/apply-changes", token, data=form)
+        if response is None or outcome_of(response) != "ok":
+            return False
+
+        await asyncio.sleep(self.args.think_time)
+        form["suggestions"] = form["suggestions"][:3]
+        response = await self.request("/process-changes", "POST", "/process-changes", token, data=form)
+        return response is not None and outcome_of(response) == "ok"
+
+    async def cover_letter_session(self, token, batch=False):
+        companies = self.rng.sample(COMPANIES, 4 if batch else 1)
+        title = self.rng.choice(TITLES)
+        form = {
+            "name": "Alex Taylor", "email": "alex.taylor@example.com", "phone": "+44 7700 900123",
+            "resume_text": CV_MARKUP, "job_title": title, "company_name": companies[0],
+            "job_description": self.pick_job_description(token),
+            "more_targets": "\n".join(f"{company} | {title}" for company in companies[1:])
+        }
+        route = "/generate-cover-letter (batch)" if batch else "/generate-cover-letter"
+        response = await self.request(route, "POST", "/generate-cover-letter", token, data=form)
+        return response is not None and outcome_of(response) == "ok"
+
+    async def session(self, kind):
+        token = self.rng.choice(self.tokens)
+        try:
+            if kind == "analyze":
+                ok = await self.analyze_session(token)
+            else:
+                ok = await self.cover_letter_session(token, batch=kind == "cover_letter_batch")
+        except Exception as e:
+            print(f"Session error: {type(e).__name__}: {str(e)}")
+            ok = False
+        self.recorder.sessions["completed" if ok else "failed"] += 1
+
+    async def run(self):
+        self.tokens = await asyncio.gather(*(self.login(index) for index in range(self.args.users)))
+
+        kinds, weights = zip(*self.args.mix.items())
+        running = set()
+        start = time.monotonic()
+        self.recorder.measure_from = start + self.args.warmup
+        end = start + self.args.warmup + self.args.duration
+
+        next_arrival = start
+        while next_arrival < end:
+            await asyncio.sleep(max(0.0, next_arrival - time.monotonic()))
+            if len(running) >= self.args.max_sessions:
+                self.recorder.sessions["dropped"] += 1
+            else:
+                self.recorder.sessions["started"] += 1
+                task = asyncio.create_task(self.session(self.rng.choices(kinds, weights)[0]))
+                running.add(task)
+                task.add_done_callback(running.discard)
+            next_arrival += self.rng.expovariate(self.args.rps) if self.args.arrivals == "poisson" \
+                else 1.0 / self.args.rps
+
+        if running:
+            done, pending = await asyncio.wait(running, timeout=self.args.drain)
+            for task in pending:
+                task.cancel()
+            if pending:
+                self.recorder.sessions["cancelled"] += len(pending)
+        return time.monotonic() - self.recorder.measure_from
+
+
+def print_report(summary):
+    print(f"\nMeasured {summary['measured_seconds']} s; sessions: "
+          + ", ".join(f"{key} {value}" for key, value in sorted(summary["sessions"].items())))
+    print(f"\n{'route':<32} {'count':>6} {'errors':>6} {'req/s':>7} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'p99 ms':>9} {'max ms':>9}")
+    for route, stats in summary["routes"].items():
+        print(f"{route:<32} {stats['count']:>6} {stats['errors']:>6} {stats['throughput_rps']:>7.2f} "
+              f"{stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f} {stats['max_ms']:>9.1f}")
+        failures = {outcome: count for outcome, count in stats["outcomes"].items() if outcome != "ok"}
+        if failures:
+            print(f"{'':<32} " + ", ".join(f"{outcome} {count}" for outcome, count in sorted(failures.items())))
+
+
+async def main_async(args):
+    import httpx
+
+    recorder = Recorder(measure_from=float("inf"))
+    limits = httpx.Limits(max_connections=args.max_sessions * 2, max_keepalive_connections=args.max_sessions)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        driver = Driver(client, recorder, args, random.Random(args.seed))
+        measured = await driver.run()
+    return recorder.summary(measured)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--rps", type=float, default=2.0, help="sessions started per second")
+    parser.add_argument("--duration", type=float, default=60.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="unmeasured seconds before that")
+    parser.add_argument("--drain", type=float, default=60.0, help="seconds to wait for running sessions at the end")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("analyze=3,cover_letter=1"))
+    parser.add_argument("--arrivals", choices=("poisson", "uniform"), default="poisson")
+    parser.add_argument("--max-sessions", type=int, default=200, help="concurrent sessions before new ones drop")
+    parser.add_argument("--think-time", type=float, default=0.0, help="seconds between steps of a session")
+    parser.add_argument("--repeat-ratio", type=float, default=0.1,
+                        help="fraction of sessions reusing a job description the user already submitted")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", default=None, help="write the summary to this file")
+    args = parser.parse_args()
+
+    summary = asyncio.run(main_async(args))
+    summary["config"] = {
+        "base_url": args.base_url, "rps": args.rps, "duration": args.duration, "warmup": args.warmup,
+        "users": args.users, "mix": args.mix, "arrivals": args.arrivals, "repeat_ratio": args.repeat_ratio
+    }
+    print_report(summary)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+"""Local stand-in for the OpenAI API, for load tests.
+
+Serves POST /v1/responses and /v1/chat/completions (both with stream=true
+support) with canned answers shaped like what each JobFit prompt expects:
+analysis JSON, CV markup, cover letters and tailored paragraphs. Latency is
+drawn from a configurable distribution (see loadtest.latency): the sample is
+the time to first token, then each output token takes --token-interval.
+A fraction of requests can fail with 429/500 to exercise error paths.
+
+Usage:
+    python -m loadtest.fake_openai [--port 8101] [--latency lognormal:1.5,0.4]
+        [--model-latency gpt-4o-mini=lognormal:0.6,0.3] [--token-interval 0.005] [--error-rate 0.01]
+
+Point the app at it with OPENAI_BASE_URL=http://127.0.0.1:8101/v1 and any OPENAI_API_KEY.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from loadtest.latency import parse_latency
+
+app = FastAPI(title="Fake OpenAI")
+
+config = {
+    "latency": parse_latency(os.getenv("FAKE_OPENAI_LATENCY", "lognormal:1.5,0.4")),
+    "model_latency": {},
+    "token_interval": float(os.getenv("FAKE_OPENAI_TOKEN_INTERVAL", "0.005")),
+    "error_rate": float(os.getenv("FAKE_OPENAI_ERROR_RATE", "0")),
+}
+stats = {"requests": 0, "streamed": 0, "errors": 0, "in_flight": 0, "max_in_flight": 0}
+
+SKILLS = ("Python", "SQL", "FastAPI", "Docker", "Kubernetes", "AWS", "PostgreSQL", "React", "TypeScript",
+          "Terraform", "Kafka", "Go", "Machine Learning", "CI/CD", "Git", "Redis", "Airflow", "Spark")
+_TOKEN_RE = re.compile(r"\S+\s*|\s+")
+
+CV_MARKUP = """**HEADING: ALEX TAYLOR**
+alex.taylor@example.com | +44 7700 900123 | linkedin.com/in/alextaylor
+
+**HEADING: PROFESSIONAL SUMMARY**
+Backend engineer with 6 years of experience building data-heavy Python services.
+
+**HEADING: EXPERIENCE**
+**Senior Backend Engineer | Northwind Analytics | 2021-Present**
+• Cut p95 API latency from 900 ms to 180 ms by caching and batching database reads
+• Led the migration of 40 services to Kubernetes with zero-downtime deploys
+**Backend Engineer | Contoso Retail | 2018-2021**
+• Built the order pipeline in FastAPI and PostgreSQL handling 2M orders a month
+
+**HEADING: EDUCATION**
+**BSc Computer Science | University of Leeds | 2018**
+
+**HEADING: SKILLS**
+Languages: Python, SQL, Go
+Tools: Docker, Kubernetes, AWS, PostgreSQL, Kafka
+"""
+
+COVER_LETTER = """[DATE]
+
+Dear [HIRING_MANAGER],
+
+I am writing to apply for the [POSITION] role. Over six years as a backend engineer I have built and scaled Python services that teams rely on every day, and I would love to bring that experience to your team.
+
+At Northwind Analytics I cut p95 API latency from 900 ms to 180 ms and led the move of 40 services to Kubernetes without downtime. Before that I built an order pipeline handling two million orders a month.
+
+What draws me to [COMPANY_NAME] is its focus on reliable, data-driven products. I am excited by the chance to help [COMPANY_NAME] grow its platform while keeping it fast and dependable.
+
+I would welcome the chance to discuss how I can contribute. Thank you for your time and consideration.
+
+Sincerely,
+Alex Taylor"""
+
+PARAGRAPH = ("What draws me to this company is its focus on reliable, data-driven products, and I am excited "
+             "by the chance to help the team grow its platform while keeping it fast and dependable.")
+
+
+def configure(latency=None, model_latency=None, token_interval=None, error_rate=None):
+    if latency is not None:
+        config["latency"] = parse_latency(latency)
+    if model_latency is not None:
+        config["model_latency"] = {model: parse_latency(spec) for model, spec in model_latency.items()}
+    if token_interval is not None:
+        config["token_interval"] = token_interval
+    if error_rate is not None:
+        config["error_rate"] = error_rate
+
+
+def _analysis(prompt):
+    """Analysis JSON with skills picked deterministically from the prompt"""
+    rng = random.Random(hashlib.sha256(prompt.encode("utf-8")).digest())
+    skills = rng.sample(SKILLS, 9)
+    return json.dumps({
+        "match_score": rng.randint(35, 95),
+        "matching_skills": skills[:5],
+        "missing_skills": skills[5:],
+        "suggestions": [
+            "Quantify the impact of your most recent role with metrics",
+            f"Add a bullet showing hands-on {skills[5]} experience",
+            "Move the skills section above education",
+            "Tighten the summary to two sentences focused on this role"
+        ],
+        "cover_letter_points": [
+            f"Highlight {skills[0]} delivery at scale",
+            "Mention the latency improvement project"
+        ]
+    }, indent=2)
+
+
+def answer(prompt):
+    """Canned completion text matching what the prompt asks for"""
+    if "Return ONLY valid JSON" in prompt:
+        return _analysis(prompt)
+    if "Rewrite this cover letter paragraph" in prompt:
+        return PARAGRAPH
+    if "cover letter" in prompt.lower():
+        return COVER_LETTER
+    return CV_MARKUP
+
+
+def _tokens(text):
+    return _TOKEN_RE.findall(text)
+
+
+def _prompt_text(body):
+    """Prompt text from a Responses `input` or Chat Completions `messages`"""
+    if "messages" in body:
+        parts = body["messages"]
+    else:
+        parts = body.get("input", "")
+        if isinstance(parts, str):
+            return parts
+    texts = []
+    for message in parts or []:
+        content = message.get("content", "")
+        if isinstance(content, str):
+            texts.append(content)
+        else:
+            texts.extend(item.get("text", "") for item in content if isinstance(item, dict))
+    return "\n".join(texts)
+
+
+def _usage(prompt, completion_tokens, chat):
+    prompt_tokens = max(1, len(prompt) // 4)
+    if chat:
+        return {
+            "prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": 0}
+        }
+    return {
+        "input_tokens": prompt_tokens, "output_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+        "input_tokens_details": {"cached_tokens": 0},
+        "output_tokens_details": {"reasoning_tokens": 0}
+    }
+
+
+def _first_token_delay(model):
+    return config["model_latency"].get(model, config["latency"]).sample()
+
+
+def _injected_error():
+    if config["error_rate"] and random.random() < config["error_rate"]:
+        stats["errors"] += 1
+        if random.random() < 0.5:
+            return JSONResponse({"error": {"message": "Rate limit reached (fake)", "type": "requests",
+                                           "code": "rate_limit_exceeded"}}, status_code=429,
+                                headers={"retry-after": "1"})
+        return JSONResponse({"error": {"message": "The server had an error (fake)", "type": "server_error"}},
+                            status_code=500)
+    return None
+
+
+def _chat_completion(model, text, usage):
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:24]}", "object": "chat.completion", "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+        "usage": usage
+    }
+
+
+def _response(response_id, message_id, model, text, usage, status="completed"):
+    return {
+        "id": response_id, "object": "response", "created_at": int(time.time()), "model": model,
+        "status": status, "parallel_tool_calls": True, "tool_choice": "auto", "tools": [],
+        "output": [{
+            "type": "message", "id": message_id, "status": status, "role": "assistant",
+            "content": [{"type": "output_text", "text": text, "annotations": []}]
+        }] if text is not None else [],
+        "usage": usage
+    }
+
+
+def _sse(data, event=None):
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+async def _stream_chat(model, prompt, tokens):
+    completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+    created = int(time.time())
+
+    def chunk(delta, finish_reason=None):
+        return _sse({
+            "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+        })
+
+    try:
+        await asyncio.sleep(_first_token_delay(model))
+        yield chunk({"role": "assistant", "content": ""})
+        for token in tokens:
+            yield chunk({"content": token})
+            await asyncio.sleep(config["token_interval"])
+        yield chunk({}, "stop")
+        yield "data: [DONE]\n\n"
+    finally:
+        stats["in_flight"] -= 1
+
+
+async def _stream_response(model, prompt, tokens):
+    response_id, message_id = f"resp_{uuid.uuid4().hex}", f"msg_{uuid.uuid4().hex}"
+    sequence = iter(range(1_000_000))
+
+    def event(kind, **fields):
+        return _sse({"type": kind, "sequence_number": next(sequence), **fields}, event=kind)
+
+    try:
+        await asyncio.sleep(_first_token_delay(model))
+        yield event("response.created", response=_response(response_id, message_id, model, None, None, "in_progress"))
+        yield event("response.output_item.added", output_index=0, item={
+            "type": "message", "id": message_id, "status": "in_progress", "role": "assistant", "content": []})
+        for token in tokens:
+            yield event("response.output_text.delta", item_id=message_id, output_index=0, content_index=0,
+                        delta=token)
+            await asyncio.sleep(config["token_interval"])
+        text = "".join(tokens)
+        yield event("response.output_text.done", item_id=message_id, output_index=0, content_index=0, text=text)
+        yield event("response.completed", response=_response(
+            response_id, message_id, model, text, _usage(prompt, len(tokens), chat=False)))
+    finally:
+        stats["in_flight"] -= 1
+
+
+async def _complete(request, chat):
+    body = await request.json()
+    model = body.get("model", "gpt-4o-mini")
+    prompt = _prompt_text(body)
+    stats["requests"] += 1
+
+    error = _injected_error()
+    if error is not None:
+        return error
+
+    text = answer(prompt)
+    tokens = _tokens(text)
+    max_tokens = body.get("max_tokens") or body.get("max_output_tokens")
+    if max_tokens:
+        tokens = tokens[:max_tokens]
+
+    stats["in_flight"] += 1
+    stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+    if body.get("stream"):
+        stats["streamed"] += 1
+        stream = _stream_chat(model, prompt, tokens) if chat else _stream_response(model, prompt, tokens)
+        return StreamingResponse(stream, media_type="text/event-stream")
+
+    try:
+        await asyncio.sleep(_first_token_delay(model) + len(tokens) * config["token_interval"])
+    finally:
+        stats["in_flight"] -= 1
+    text = "".join(tokens)
+    usage = _usage(prompt, len(tokens), chat)
+    if chat:
+        return _chat_completion(model, text, usage)
+    return _response(f"resp_{uuid.uuid4().hex}", f"msg_{uuid.uuid4().hex}", model, text, usage)
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    return await _complete(request, chat=True)
+
+
+@app.post("/v1/responses")
+async def responses(request: Request):
+    return await _complete(request, chat=False)
+
+
+@app.get("/stats")
+async def get_stats():
+    return {**stats, "latency": repr(config["latency"]), "token_interval": config["token_interval"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8101)
+    parser.add_argument("--latency", default=None, help="time to first token, e.g. lognormal:1.5,0.4")
+    parser.add_argument("--model-latency", action="append", default=[], metavar="MODEL=SPEC",
+                        help="per-model override, repeatable")
+    parser.add_argument("--token-interval", type=float, default=None, help="seconds per output token")
+    parser.add_argument("--error-rate", type=float, default=None, help="fraction of requests answered 429/500")
+    args = parser.parse_args()
+
+    configure(
+        latency=args.latency,
+        model_latency=dict(item.split("=", 1) for item in args.model_latency) if args.model_latency else None,
+        token_interval=args.token_interval,
+        error_rate=args.error_rate
+    )
+
+    import uvicorn
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,625 @@
+"""Local stand-in for Supabase auth, storage and tables, for load tests.
+
+Everything lives in memory. It implements the subset of the APIs the app
+and supabase-py use:
+
+- auth: password sign-in (unknown emails are signed up on first login, since
+  the app's own signup is disabled), refresh, signup, /user and logout. Access
+  tokens are HS256 JWTs signed with --jwt-secret, so the app verifies them
+  locally when SUPABASE_JWT_SECRET is set to the same value.
+- storage: upload (multipart or raw body), download with Range, HEAD, single
+  and batch signed URLs, and delete.
+- tables (PostgREST): select with eq/neq/lt/lte/gt/gte/cs/in/is/ilike
+  filters, or=(...) / and(...) groups, order, limit and offset; insert with
+  unique constraints, update and delete; and the search_analyses,
+  acquire_storage_object and release_storage_object RPCs.
+
+Row-level security is not enforced. --latency adds a delay (see
+loadtest.latency) to every storage and table request.
+
+Usage:
+    python -m loadtest.fake_supabase [--port 8102] [--jwt-secret loadtest-secret] [--latency constant:0.01]
+
+Point the app at it with SUPABASE_URL=http://127.0.0.1:8102, SUPABASE_KEY=<anon key printed at
+startup> and SUPABASE_JWT_SECRET=<the same secret>.
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import os
+import re
+import time
+import uuid
+from datetime import datetime, timezone
+from urllib.parse import unquote
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+from loadtest.latency import parse_latency
+
+app = FastAPI(title="Fake Supabase")
+
+config = {
+    "jwt_secret": os.getenv("FAKE_SUPABASE_JWT_SECRET", "loadtest-secret"),
+    "latency": parse_latency(os.getenv("FAKE_SUPABASE_LATENCY", "0")),
+    "token_ttl": int(os.getenv("FAKE_SUPABASE_TOKEN_TTL", "3600")),
+}
+
+# Columns that must be unique per table, as in the real schema
+UNIQUE_COLUMNS = {
+    "skill_analytics": ("user_id",),
+    "storage_objects": ("user_id", "content_hash"),
+}
+PREVIEW_LENGTH = 120
+
+
+class State:
+    def __init__(self):
+        self.users = {}  # email -> {"user": {...}, "password": str}
+        self.refresh_tokens = {}
+        self.tables = {}
+        self.next_ids = {}
+        self.objects = {}  # "bucket/path" -> (bytes, content_type, updated_at)
+        self.requests = 0
+
+
+state = State()
+
+
+def configure(jwt_secret=None, latency=None, token_ttl=None):
+    if jwt_secret is not None:
+        config["jwt_secret"] = jwt_secret
+    if latency is not None:
+        config["latency"] = parse_latency(latency)
+    if token_ttl is not None:
+        config["token_ttl"] = token_ttl
+
+
+def reset():
+    global state
+    state = State()
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+# ==================== JWT ====================
+
+def _b64url(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def encode_jwt(payload, secret=None):
+    secret = secret or config["jwt_secret"]
+    header = _b64url(json.dumps({"alg": "HS256", "typ": "JWT"}).encode("utf-8"))
+    body = _b64url(json.dumps(payload).encode("utf-8"))
+    signature = hmac.new(secret.encode("utf-8"), f"{header}.{body}".encode("ascii"), hashlib.sha256).digest()
+    return f"{header}.{body}.{_b64url(signature)}"
+
+
+def decode_jwt(token):
+    """The payload of a valid, unexpired token signed with our secret, else None"""
+    try:
+        header, body, signature = token.split(".")
+        expected = hmac.new(config["jwt_secret"].encode("utf-8"), f"{header}.{body}".encode("ascii"),
+                            hashlib.sha256).digest()
+        if not hmac.compare_digest(_b64url(expected), signature):
+            return None
+        payload = json.loads(base64.urlsafe_b64decode(body + "=" * (-len(body) % 4)))
+    except Exception:
+        return None
+    if payload.get("exp") and payload["exp"] < time.time():
+        return None
+    return payload
+
+
+def anon_key(secret=None):
+    """A long-lived anon-role key, the value to use as SUPABASE_KEY"""
+    now = int(time.time())
+    return encode_jwt({"iss": "fake-supabase", "role": "anon", "iat": now, "exp": now + 10 * 365 * 86400}, secret)
+
+
+def _bearer(request):
+    header = request.headers.get("authorization", "")
+    return decode_jwt(header[7:]) if header.lower().startswith("bearer ") else None
+
+
+def _unauthorized():
+    return JSONResponse({"message": "Invalid JWT", "statusCode": "401", "error": "Unauthorized"}, status_code=401)
+
+
+async def _delay():
+    state.requests += 1
+    seconds = config["latency"].sample()
+    if seconds:
+        await asyncio.sleep(seconds)
+
+
+# ==================== AUTH ====================
+
+def _create_user(email, password, metadata=None):
+    now = _now()
+    user = {
+        "id": str(uuid.uuid4()), "aud": "authenticated", "role": "authenticated", "email": email,
+        "email_confirmed_at": now, "confirmed_at": now, "created_at": now, "updated_at": now,
+        "app_metadata": {"provider": "email", "providers": ["email"]},
+        "user_metadata": metadata or {"name": email.split("@")[0]},
+        "identities": [], "is_anonymous": False
+    }
+    state.users[email] = {"user": user, "password": password}
+    return user
+
+
+def _session(user):
+    now = int(time.time())
+    expires_at = now + config["token_ttl"]
+    access_token = encode_jwt({
+        "iss": "fake-supabase", "sub": user["id"], "aud": "authenticated", "role": "authenticated",
+        "email": user["email"], "user_metadata": user["user_metadata"], "iat": now, "exp": expires_at
+    })
+    refresh_token = uuid.uuid4().hex
+    state.refresh_tokens[refresh_token] = user["email"]
+    user["last_sign_in_at"] = _now()
+    return {
+        "access_token": access_token, "token_type": "bearer", "expires_in": config["token_ttl"],
+        "expires_at": expires_at, "refresh_token": refresh_token, "user": user
+    }
+
+
+def _auth_error(message, status_code=400, code="invalid_credentials"):
+    return JSONResponse({"code": status_code, "error_code": code, "msg": message}, status_code=status_code)
+
+
+@app.post("/auth/v1/signup")
+async def signup(request: Request):
+    body = await request.json()
+    if body.get("email") in state.users:
+        return _auth_error("User already registered", 422, "user_already_exists")
+    user = _create_user(body.get("email"), body.get("password"), body.get("data"))
+    return _session(user)
+
+
+@app.post("/auth/v1/token")
+async def token(request: Request, grant_type: str = "password"):
+    body = await request.json()
+    if grant_type == "refresh_token":
+        email = state.refresh_tokens.pop(body.get("refresh_token"), None)
+        if email is None:
+            return _auth_error("Invalid Refresh Token", code="refresh_token_not_found")
+        return _session(state.users[email]["user"])
+
+    account = state.users.get(body.get("email"))
+    if account is None:
+        _create_user(body.get("email"), body.get("password"))
+        account = state.users[body.get("email")]
+    if account["password"] != body.get("password"):
+        return _auth_error("Invalid login credentials")
+    return _session(account["user"])
+
+
+@app.get("/auth/v1/user")
+async def get_user(request: Request):
+    claims = _bearer(request)
+    account = state.users.get(claims.get("email")) if claims else None
+    if account is None:
+        return _auth_error("invalid JWT", 401, "bad_jwt")
+    return account["user"]
+
+
+@app.post("/auth/v1/logout")
+async def logout():
+    return Response(status_code=204)
+
+
+@app.get("/auth/v1/.well-known/jwks.json")
+async def jwks():
+    return {"keys": []}
+
+
+# ==================== STORAGE ====================
+
+def _parse_range(header, size):
+    match = re.match(r"bytes=(\d*)-(\d*)$", header or "")
+    if not match or size == 0:
+        return None
+    start, end = match.groups()
+    if start == "":
+        start, end = max(0, size - int(end)), size - 1
+    else:
+        start, end = int(start), min(int(end) if end else size - 1, size - 1)
+    return (start, end) if start <= end else None
+
+
+def _object_response(key, request, head=False):
+    stored = state.objects.get(key)
+    if stored is None:
+        return JSONResponse({"statusCode": "404", "error": "not_found", "message": "Object not found"},
+                            status_code=404)
+    data, content_type, updated_at = stored
+    headers = {
+        "etag": f'"{hashlib.md5(data).hexdigest()}"', "last-modified": updated_at,
+        "accept-ranges": "bytes", "content-length": str(len(data))
+    }
+    byte_range = _parse_range(request.headers.get("range"), len(data))
+    status_code = 200
+    if byte_range:
+        start, end = byte_range
+        data = data[start:end + 1]
+        headers.update({"content-range": f"bytes {start}-{end}/{len(stored[0])}", "content-length": str(len(data))})
+        status_code = 206
+    return Response(b"" if head else data, status_code=status_code, media_type=content_type, headers=headers)
+
+
+def _sign(key, expires):
+    return hmac.new(config["jwt_secret"].encode("utf-8"), f"{key}:{expires}".encode("utf-8"),
+                    hashlib.sha256).hexdigest()
+
+
+def _signed_url(key, expires_in):
+    expires = int(time.time()) + int(expires_in)
+    return f"/object/sign/{key}?token={expires}.{_sign(key, expires)}"
+
+
+@app.post("/storage/v1/object/sign/{target:path}")
+async def create_signed_urls(target: str, request: Request):
+    await _delay()
+    if _bearer(request) is None:
+        return _unauthorized()
+    body = await request.json()
+    expires_in = body.get("expiresIn", 3600)
+    if "/" in target:
+        if target not in state.objects:
+            return JSONResponse({"statusCode": "404", "error": "not_found", "message": "Object not found"},
+                                status_code=404)
+        return {"signedURL": _signed_url(target, expires_in)}
+
+    signed = []
+    for path in body.get("paths", []):
+        key = f"{target}/{path}"
+        found = key in state.objects
+        signed.append({"path": path, "signedURL": _signed_url(key, expires_in) if found else None,
+                       "error": None if found else "Either the object does not exist or you do not have access to it"})
+    return signed
+
+
+@app.get("/storage/v1/object/sign/{key:path}")
+async def download_signed(key: str, request: Request, token: str = ""):
+    await _delay()
+    expires, _, signature = token.partition(".")
+    if not expires.isdigit() or int(expires) < time.time() or not hmac.compare_digest(signature, _sign(key, expires)):
+        return JSONResponse({"statusCode": "400", "error": "InvalidSignature", "message": "Invalid signature"},
+                            status_code=400)
+    return _object_response(key, request)
+
+
+@app.api_route("/storage/v1/object/authenticated/{key:path}", methods=["GET", "HEAD"])
+async def download_authenticated(key: str, request: Request):
+    await _delay()
+    if _bearer(request) is None:
+        return _unauthorized()
+    return _object_response(unquote(key), request, head=request.method == "HEAD")
+
+
+@app.api_route("/storage/v1/object/{key:path}", methods=["GET", "HEAD", "POST", "PUT", "DELETE"])
+async def object_route(key: str, request: Request):
+    await _delay()
+    if _bearer(request) is None:
+        return _unauthorized()
+    key = unquote(key)
+
+    if request.method in ("GET", "HEAD"):
+        return _object_response(key, request, head=request.method == "HEAD")
+
+    if request.method == "DELETE":
+        body = await request.json()
+        removed = []
+        for path in body.get("prefixes", []):
+            if state.objects.pop(f"{key}/{path}", None) is not None:
+                removed.append({"name": path, "bucket_id": key})
+        return removed
+
+    content_type = request.headers.get("content-type", "application/octet-stream")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form["file"]
+        data, content_type = await upload.read(), upload.content_type or "application/octet-stream"
+    else:
+        data = await request.body()
+
+    upsert = request.method == "PUT" or request.headers.get("x-upsert", "false").lower() == "true"
+    if key in state.objects and not upsert:
+        return JSONResponse({"statusCode": "409", "error": "Duplicate", "message": "The resource already exists"},
+                            status_code=400)
+    state.objects[key] = (data, content_type, datetime.now(timezone.utc).strftime("%a, %d %b %Y %H:%M:%S GMT"))
+    return {"Key": key, "Id": str(uuid.uuid4())}
+
+
+# ==================== TABLES (PostgREST) ====================
+
+def _split_top_level(text):
+    """Split on commas outside parentheses and double quotes"""
+    parts, depth, quoted, current = [], 0, False, []
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and char == "," and depth == 0:
+            parts.append("".join(current))
+            current = []
+            continue
+        current.append(char)
+    if current:
+        parts.append("".join(current))
+    return parts
+
+
+def _coerce(value, like):
+    """The filter string as the type of the stored value it's compared with"""
+    value = value.strip('"')
+    if isinstance(like, bool):
+        return value.lower() == "true"
+    if isinstance(like, int):
+        return int(value)
+    if isinstance(like, float):
+        return float(value)
+    return value
+
+
+def _compare(row_value, op, value):
+    if op == "is":
+        expected = {"null": None, "true": True, "false": False}.get(value.lower())
+        return row_value is expected
+    if op == "in":
+        options = [item.strip('"') for item in _split_top_level(value.strip("()"))]
+        return str(row_value) in options
+    if op == "cs":
+        items = value.strip("{}")
+        wanted = json.loads(items) if value.startswith("[") else [item.strip('"') for item in items.split(",") if item]
+        return all(item in (row_value or []) for item in wanted)
+    if op in ("like", "ilike"):
+        pattern = "^" + re.escape(value.strip('"')).replace("\\*", ".*").replace("%", ".*") + "$"
+        return row_value is not None and re.match(pattern, str(row_value), re.I if op == "ilike" else 0) is not None
+    if row_value is None:
+        return False
+    value = _coerce(value, row_value)
+    return {
+        "eq": row_value == value, "neq": row_value != value, "lt": row_value < value,
+        "lte": row_value <= value, "gt": row_value > value, "gte": row_value >= value
+    }[op]
+
+
+def _term(text):
+    """A predicate for one PostgREST filter term: col.op.value, and(...), or(...) or not.col.op.value"""
+    for group, combine in (("and(", all), ("or(", any)):
+        if text.startswith(group):
+            terms = [_term(part) for part in _split_top_level(text[len(group):-1])]
+            return lambda row: combine(term(row) for term in terms)
+    column, op, value = text.split(".", 2)
+    return _filter(column, f"{op}.{value}")
+
+
+def _filter(column, expression):
+    negate = expression.startswith("not.")
+    if negate:
+        expression = expression[4:]
+    op, _, value = expression.partition(".")
+    return lambda row: _compare(row.get(column), op, value) != negate
+
+
+def _query(request):
+    """(predicates, select columns, order, limit, offset) from PostgREST query parameters"""
+    predicates, columns, order, limit, offset = [], None, [], None, 0
+    for name, value in request.query_params.multi_items():
+        if name == "select":
+            columns = None if value.strip() == "*" else [column.strip() for column in value.split(",")]
+        elif name == "order":
+            for item in value.split(","):
+                column, *flags = item.split(".")
+                order.append((column, "desc" in flags))
+        elif name == "limit":
+            limit = int(value)
+        elif name == "offset":
+            offset = int(value)
+        elif name in ("or", "and"):
+            predicates.append(_term(f"{name}{value}"))
+        elif name != "columns":
+            predicates.append(_filter(name, value))
+    return predicates, columns, order, limit, offset
+
+
+def _matching(table, predicates):
+    return [row for row in state.tables.get(table, []) if all(predicate(row) for predicate in predicates)]
+
+
+def _sorted(rows, order):
+    for column, desc in reversed(order):
+        rows = sorted(rows, key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+    return rows
+
+
+def _project(rows, columns):
+    if columns is None:
+        return [dict(row) for row in rows]
+    return [{column: row.get(column) for column in columns} for row in rows]
+
+
+def _prefers_representation(request):
+    return "return=representation" in request.headers.get("prefer", "")
+
+
+def _duplicate(table, row):
+    unique = UNIQUE_COLUMNS.get(table)
+    if not unique:
+        return False
+    key = tuple(row.get(column) for column in unique)
+    return any(tuple(existing.get(column) for column in unique) == key for existing in state.tables.get(table, []))
+
+
+def _insert(table, row):
+    state.next_ids[table] = state.next_ids.get(table, 0) + 1
+    row = {"id": state.next_ids[table], "created_at": _now(), **row}
+    if table == "cv_analyses":
+        row["job_description_preview"] = (row.get("job_description") or "")[:PREVIEW_LENGTH]
+    state.tables.setdefault(table, []).append(row)
+    return row
+
+
+@app.get("/rest/v1/{table}")
+async def select_rows(table: str, request: Request):
+    await _delay()
+    if _bearer(request) is None:
+        return _unauthorized()
+    predicates, columns, order, limit, offset = _query(request)
+    rows = _sorted(_matching(table, predicates), order)[offset:]
+    if limit is not None:
+        rows = rows[:limit]
+    return _project(rows, columns)
+
+
+@app.post("/rest/v1/{table}")
+async def insert_rows(table: str, request: Request):
+    await _delay()
+    if _bearer(request) is None:
+        return _unauthorized()
+    body = await request.json()
+    rows = body if isinstance(body, list) else [body]
+    if any(_duplicate(table, row) for row in rows):
+        return JSONResponse({"code": "23505", "details": None, "hint": None,
+                             "message": f'duplicate key value violates unique constraint "{table}_key"'},
+                            status_code=409)
+    inserted = [_insert(table, row) for row in rows]
+    if _prefers_representation(request):
+        return JSONResponse(inserted, status_code=201)
+    return Response(status_code=201)
+
+
+@app.patch("/rest/v1/{table}")
+async def update_rows(table: str, request: Request):
+    await _delay()
+    if _bearer(request) is None:
+        return _unauthorized()
+    changes = await request.json()
+    predicates, columns, _, _, _ = _query(request)
+    rows = _matching(table, predicates)
+    for row in rows:
+        row.update(changes)
+    if _prefers_representation(request):
+        return _project(rows, columns)
+    return Response(status_code=204)
+
+
+@app.delete("/rest/v1/{table}")
+async def delete_rows(table: str, request: Request):
+    await _delay()
+    if _bearer(request) is None:
+        return _unauthorized()
+    predicates, columns, _, _, _ = _query(request)
+    removed = _matching(table, predicates)
+    state.tables[table] = [row for row in state.tables.get(table, []) if row not in removed]
+    if _prefers_representation(request):
+        return _project(removed, columns)
+    return Response(status_code=204)
+
+
+def _search_analyses(user_id, query, limit, offset):
+    """Naive stand-in for the full-text search RPC: rows containing every query word"""
+    words = re.findall(r"\w+", (query or "").lower())
+    if not words:
+        return []
+    results = []
+    for row in state.tables.get("cv_analyses", []):
+        if row.get("user_id") != user_id:
+            continue
+        text = " ".join([row.get("job_description") or ""] + [str(skill) for skill in
+                        (row.get("matching_skills") or []) + (row.get("missing_skills") or [])]).lower()
+        hits = sum(text.count(word) for word in words)
+        if all(word in text for word in words):
+            results.append({
+                **{column: row.get(column) for column in (
+                    "id", "created_at", "match_score", "job_description_preview", "matching_skills",
+                    "missing_skills")},
+                "snippet": (row.get("job_description") or "")[:160], "rank": float(hits)
+            })
+    results.sort(key=lambda row: row["created_at"], reverse=True)
+    results.sort(key=lambda row: row["rank"], reverse=True)
+    return results[offset:offset + limit]
+
+
+def _acquire_storage_object(user_id, content_hash, storage_path, size_bytes):
+    for row in state.tables.get("storage_objects", []):
+        if row["user_id"] == user_id and row["content_hash"] == content_hash:
+            row["ref_count"] += 1
+            return row["storage_path"]
+    _insert("storage_objects", {"user_id": user_id, "content_hash": content_hash, "storage_path": storage_path,
+                                "size_bytes": size_bytes, "ref_count": 1})
+    return storage_path
+
+
+def _release_storage_object(user_id, storage_path):
+    rows = state.tables.get("storage_objects", [])
+    for row in rows:
+        if row["user_id"] == user_id and row["storage_path"] == storage_path:
+            row["ref_count"] -= 1
+            if row["ref_count"] <= 0:
+                rows.remove(row)
+                return 0
+            return row["ref_count"]
+    return 0
+
+
+RPCS = {
+    "search_analyses": lambda args: _search_analyses(
+        args["p_user_id"], args["p_query"], args.get("p_limit", 20), args.get("p_offset", 0)),
+    "acquire_storage_object": lambda args: _acquire_storage_object(
+        args["p_user_id"], args["p_content_hash"], args["p_storage_path"], args.get("p_size_bytes", 0)),
+    "release_storage_object": lambda args: _release_storage_object(args["p_user_id"], args["p_storage_path"]),
+}
+
+
+@app.post("/rest/v1/rpc/{name}")
+async def rpc(name: str, request: Request):
+    await _delay()
+    if _bearer(request) is None:
+        return _unauthorized()
+    if name not in RPCS:
+        return JSONResponse({"code": "PGRST202", "message": f"Could not find the function public.{name}"},
+                            status_code=404)
+    return JSONResponse(RPCS[name](await request.json()))
+
+
+@app.get("/stats")
+async def get_stats():
+    return {
+        "requests": state.requests,
+        "users": len(state.users),
+        "objects": len(state.objects),
+        "object_bytes": sum(len(data) for data, _, _ in state.objects.values()),
+        "rows": {table: len(rows) for table, rows in state.tables.items()}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8102)
+    parser.add_argument("--jwt-secret", default=None)
+    parser.add_argument("--latency", default=None, help="delay added to storage and table requests")
+    args = parser.parse_args()
+
+    configure(jwt_secret=args.jwt_secret, latency=args.latency)
+    print(f"SUPABASE_KEY={anon_key()}", flush=True)
+
+    import uvicorn
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Latency distributions for the fake services, parsed from short specs.
+
+    0.5 / constant:0.5         always 0.5 s
+    uniform:0.2,1.5            uniform between 0.2 and 1.5 s
+    normal:1.0,0.3             mean 1.0 s, standard deviation 0.3 s (clamped at 0)
+    lognormal:1.2,0.5          median 1.2 s, sigma 0.5 (long right tail, like real LLM calls)
+    exponential:0.8            mean 0.8 s
+"""
+import math
+import random
+
+
+class Latency:
+    def __init__(self, kind, params):
+        self.kind = kind
+        self.params = params
+
+    def sample(self, rng=random):
+        if self.kind == "constant":
+            value = self.params[0]
+        elif self.kind == "uniform":
+            value = rng.uniform(*self.params)
+        elif self.kind == "normal":
+            value = rng.gauss(*self.params)
+        elif self.kind == "lognormal":
+            median, sigma = self.params
+            value = rng.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+        else:
+            value = rng.expovariate(1.0 / self.params[0]) if self.params[0] > 0 else 0.0
+        return max(0.0, value)
+
+    def __repr__(self):
+        return f"{self.kind}:{','.join(str(param) for param in self.params)}"
+
+
+_ARITY = {"constant": 1, "uniform": 2, "normal": 2, "lognormal": 2, "exponential": 1}
+
+
+def parse_latency(spec):
+    """Latency from a spec such as "lognormal:1.2,0.5"; raises ValueError if malformed"""
+    spec = str(spec).strip()
+    kind, _, params = spec.partition(":") if ":" in spec else ("constant", "", spec)
+    kind = kind.strip().lower()
+    if kind not in _ARITY:
+        raise ValueError(f"Unknown latency distribution: {kind}")
+    try:
+        values = tuple(float(param) for param in params.split(","))
+    except ValueError:
+        raise ValueError(f"Invalid latency spec: {spec}")
+    if len(values) != _ARITY[kind] or any(value < 0 for value in values):
+        raise ValueError(f"{kind} takes {_ARITY[kind]} non-negative parameter(s): {spec}")
+    return Latency(kind, values)
@@ -0,0 +1,109 @@
+"""Run the app against the fake OpenAI and Supabase servers, all on localhost.
+
+Usage:
+    python -m loadtest.stack [--app-port 8000] [--workers 1] [--openai-latency lognormal:1.5,0.4]
+        [--supabase-latency constant:0.005] [--database-url sqlite:///loadtest.db]
+
+Starts loadtest.fake_openai, loadtest.fake_supabase and uvicorn src.main:app
+with the environment wired between them, waits until all three answer and
+runs until interrupted. Then drive it with python -m loadtest.driver.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+from loadtest.fake_supabase import anon_key
+
+
+def wait_until_up(url, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=1)
+            return True
+        except urllib.error.HTTPError:
+            return True  # answering, just not with 2xx
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def app_environment(args, spool_dir):
+    env = dict(os.environ)
+    env.pop("DATABASE_URL", None)
+    env.update({
+        "SUPABASE_URL": f"http://127.0.0.1:{args.supabase_port}",
+        "SUPABASE_KEY": anon_key(args.jwt_secret),
+        "SUPABASE_JWT_SECRET": args.jwt_secret,
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{args.openai_port}/v1",
+        "OPENAI_API_KEY": "sk-loadtest",
+        "STORAGE_BACKEND": "supabase",
+        "WRITE_BEHIND_SPOOL_DIR": spool_dir,
+    })
+    if args.database_url:
+        env["DATABASE_URL"] = args.database_url
+    return env
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app-port", type=int, default=8000)
+    parser.add_argument("--openai-port", type=int, default=8101)
+    parser.add_argument("--supabase-port", type=int, default=8102)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the app")
+    parser.add_argument("--jwt-secret", default="loadtest-secret")
+    parser.add_argument("--openai-latency", default="lognormal:1.5,0.4")
+    parser.add_argument("--token-interval", type=float, default=0.005)
+    parser.add_argument("--openai-error-rate", type=float, default=0.0)
+    parser.add_argument("--supabase-latency", default="0")
+    parser.add_argument("--database-url", default=None, help="use a SQL database instead of the fake tables")
+    args = parser.parse_args()
+
+    spool_dir = tempfile.mkdtemp(prefix="jobfit-loadtest-spool-")
+    commands = [
+        ("fake openai", f"http://127.0.0.1:{args.openai_port}/stats", [
+            sys.executable, "-m", "loadtest.fake_openai", "--port", str(args.openai_port),
+            "--latency", args.openai_latency, "--token-interval", str(args.token_interval),
+            "--error-rate", str(args.openai_error_rate)], None),
+        ("fake supabase", f"http://127.0.0.1:{args.supabase_port}/stats", [
+            sys.executable, "-m", "loadtest.fake_supabase", "--port", str(args.supabase_port),
+            "--jwt-secret", args.jwt_secret, "--latency", args.supabase_latency], None),
+        ("app", f"http://127.0.0.1:{args.app_port}/login", [
+            sys.executable, "-m", "uvicorn", "src.main:app", "--port", str(args.app_port),
+            "--workers", str(args.workers), "--log-level", "warning", "--no-access-log"],
+         app_environment(args, spool_dir)),
+    ]
+
+    processes = []
+    try:
+        for name, health_url, command, env in commands:
+            processes.append(subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL))
+            if not wait_until_up(health_url):
+                print(f"{name} did not start")
+                return 1
+            print(f"{name:<14} {health_url.rsplit('/', 1)[0]}")
+
+        print(f"\nReady. Drive it with:\n  python -m loadtest.driver --base-url http://127.0.0.1:{args.app_port}")
+        while all(process.poll() is None for process in processes):
+            time.sleep(0.5)
+        print("A process exited; stopping")
+        return 1
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+-- Content-addressed storage objects with reference counts.
+-- One row per distinct file (by SHA-256) per user; every DB row that points
+-- at the file holds one reference. The object is deleted when the count
+-- reaches zero.
+
+create table if not exists storage_objects (
+    id bigint generated by default as identity primary key,
+    user_id uuid not null,
+    content_hash text not null,
+    storage_path text not null,
+    size_bytes bigint not null default 0,
+    ref_count integer not null default 1,
+    created_at timestamptz not null default now(),
+    unique (user_id, content_hash)
+);
+
+create index if not exists storage_objects_user_path_idx
+    on storage_objects (user_id, storage_path);
+
+
+-- Take a reference on (user_id, content_hash), registering p_storage_path if
+-- this is the first copy. Returns the canonical storage path.
+create or replace function acquire_storage_object(
+    p_user_id uuid,
+    p_content_hash text,
+    p_storage_path text,
+    p_size_bytes bigint
+) returns text
+language sql
+as $$
+    insert into storage_objects (user_id, content_hash, storage_path, size_bytes, ref_count)
+    values (p_user_id, p_content_hash, p_storage_path, p_size_bytes, 1)
+    on conflict (user_id, content_hash)
+        do update set ref_count = storage_objects.ref_count + 1
+    returning storage_path;
+$$;
+
+
+-- Drop a reference on a storage path. Returns the remaining count; the row is
+-- removed when it reaches zero (the caller then deletes the object).
+-- Paths not tracked here (uploaded before dedup) report 0.
+create or replace function release_storage_object(
+    p_user_id uuid,
+    p_storage_path text
+) returns integer
+language plpgsql
+as $$
+declare
+    remaining integer;
+begin
+    update storage_objects
+        set ref_count = ref_count - 1
+        where user_id = p_user_id and storage_path = p_storage_path
+        returning ref_count into remaining;
+
+    if remaining is null then
+        return 0;
+    end if;
+
+    if remaining <= 0 then
+        delete from storage_objects
+            where user_id = p_user_id and storage_path = p_storage_path;
+        return 0;
+    end if;
+
+    return remaining;
+end;
+$$;
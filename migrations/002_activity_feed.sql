@@ -0,0 +1,15 @@
+-- Activity feed support: a short job description preview so the dashboard
+-- can skip the full text, and indexes matching the feed's keyset order.
+
+alter table cv_analyses
+    add column if not exists job_description_preview text
+    generated always as (left(job_description, 120)) stored;
+
+create index if not exists cv_analyses_user_created_idx
+    on cv_analyses (user_id, created_at desc, id desc);
+
+create index if not exists generated_cvs_user_created_idx
+    on generated_cvs (user_id, created_at desc, id desc);
+
+create index if not exists cover_letters_user_created_idx
+    on cover_letters (user_id, created_at desc, id desc);
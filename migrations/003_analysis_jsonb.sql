@@ -0,0 +1,38 @@
+-- Store analysis lists as native jsonb arrays instead of JSON-encoded strings.
+-- Older rows were written with json.dumps, so depending on the original column
+-- type they hold either JSON text or a jsonb *string* containing JSON. The
+-- casts below handle the first case; the update unwraps the second. For very
+-- large tables run scripts/backfill_analysis_jsonb.py instead of the update.
+
+alter table cv_analyses
+    alter column matching_skills type jsonb using coalesce(matching_skills::jsonb, '[]'::jsonb),
+    alter column missing_skills type jsonb using coalesce(missing_skills::jsonb, '[]'::jsonb),
+    alter column suggestions type jsonb using coalesce(suggestions::jsonb, '[]'::jsonb),
+    alter column cover_letter_points type jsonb using coalesce(cover_letter_points::jsonb, '[]'::jsonb);
+
+update cv_analyses set
+    matching_skills = case when jsonb_typeof(matching_skills) = 'string'
+        then (matching_skills #>> '{}')::jsonb else matching_skills end,
+    missing_skills = case when jsonb_typeof(missing_skills) = 'string'
+        then (missing_skills #>> '{}')::jsonb else missing_skills end,
+    suggestions = case when jsonb_typeof(suggestions) = 'string'
+        then (suggestions #>> '{}')::jsonb else suggestions end,
+    cover_letter_points = case when jsonb_typeof(cover_letter_points) = 'string'
+        then (cover_letter_points #>> '{}')::jsonb else cover_letter_points end
+where jsonb_typeof(matching_skills) = 'string'
+   or jsonb_typeof(missing_skills) = 'string'
+   or jsonb_typeof(suggestions) = 'string'
+   or jsonb_typeof(cover_letter_points) = 'string';
+
+alter table cv_analyses
+    alter column matching_skills set default '[]'::jsonb,
+    alter column missing_skills set default '[]'::jsonb,
+    alter column suggestions set default '[]'::jsonb,
+    alter column cover_letter_points set default '[]'::jsonb;
+
+-- Containment queries such as missing_skills @> '["AWS"]'
+create index if not exists cv_analyses_missing_skills_idx
+    on cv_analyses using gin (missing_skills jsonb_path_ops);
+
+create index if not exists cv_analyses_matching_skills_idx
+    on cv_analyses using gin (matching_skills jsonb_path_ops);
@@ -0,0 +1,55 @@
+-- Full-text search over a user's analyses. The tsvector is a generated
+-- column, so every insert or update (including the write-behind batches from
+-- save_analysis) keeps it current without a separate indexing step.
+-- Skills rank highest, then the job description, then suggestions.
+
+alter table cv_analyses
+    add column if not exists search_vector tsvector
+    generated always as (
+        setweight(jsonb_to_tsvector('english',
+            coalesce(matching_skills, '[]'::jsonb) || coalesce(missing_skills, '[]'::jsonb), '["string"]'), 'A') ||
+        setweight(to_tsvector('english', coalesce(job_description, '')), 'B') ||
+        setweight(jsonb_to_tsvector('english', coalesce(suggestions, '[]'::jsonb), '["string"]'), 'C')
+    ) stored;
+
+create index if not exists cv_analyses_search_idx
+    on cv_analyses using gin (search_vector);
+
+
+-- Ranked search for one user, one page at a time. Matched words in the
+-- snippet are wrapped in chr(2)/chr(3); the app escapes the text and turns
+-- those into <mark> tags.
+create or replace function search_analyses(
+    p_user_id uuid,
+    p_query text,
+    p_limit integer default 20,
+    p_offset integer default 0
+) returns table (
+    id bigint,
+    created_at timestamptz,
+    match_score numeric,
+    job_description_preview text,
+    matching_skills jsonb,
+    missing_skills jsonb,
+    snippet text,
+    rank real
+)
+language sql
+stable
+as $$
+    select
+        a.id,
+        a.created_at,
+        a.match_score::numeric,
+        a.job_description_preview,
+        a.matching_skills,
+        a.missing_skills,
+        ts_headline('english', coalesce(a.job_description, ''), q.query,
+            'StartSel=' || chr(2) || ', StopSel=' || chr(3) || ', MaxWords=30, MinWords=10, MaxFragments=2'),
+        ts_rank_cd(a.search_vector, q.query)
+    from cv_analyses a, websearch_to_tsquery('english', p_query) as q(query)
+    where a.user_id = p_user_id
+      and a.search_vector @@ q.query
+    order by 8 desc, a.created_at desc
+    limit p_limit offset p_offset;
+$$;
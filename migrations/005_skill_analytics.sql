@@ -0,0 +1,12 @@
+-- Per-user skill-gap aggregates (see src/services/skill_analytics.py for the
+-- stats document). The app updates a row every time analyses are written,
+-- using `version` for optimistic concurrency, so reads never scan
+-- cv_analyses. Fill it for existing users with
+-- scripts/backfill_skill_analytics.py.
+
+create table if not exists skill_analytics (
+    user_id uuid primary key,
+    stats jsonb not null,
+    version integer not null default 1,
+    updated_at timestamptz not null default now()
+);
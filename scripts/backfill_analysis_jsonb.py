@@ -0,0 +1,83 @@
+"""Convert JSON-encoded string values in cv_analyses list columns to real arrays.
+
+Run after migrations/003_analysis_jsonb.sql on tables too large for its
+single UPDATE. Works in id-ordered batches through the REST API, so it can be
+stopped and restarted at any point. Values that aren't a JSON list are left
+as they are and reported by id, to be fixed by hand.
+
+Usage:
+    python -m scripts.backfill_analysis_jsonb [--batch-size 500] [--dry-run]
+"""
+import argparse
+import json
+
+from src.services.clients import get_anon_client
+from src.services.database import ANALYSIS_LIST_COLUMNS
+
+
+def decode_value(value):
+    """Return the list for a legacy string value, or None if already a list.
+
+    Raises ValueError for a string that isn't a JSON list, so the caller can
+    keep it rather than overwrite it with an empty list.
+    """
+    if not isinstance(value, str):
+        return None
+    if not value.strip():
+        return []
+    try:
+        decoded = json.loads(value)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"not JSON: {e}")
+    if not isinstance(decoded, list):
+        raise ValueError(f"JSON {type(decoded).__name__}, not a list")
+    return decoded
+
+
+def backfill(batch_size=500, dry_run=False):
+    supabase = get_anon_client()
+    last_id = 0
+    scanned = 0
+    updated = 0
+    undecodable = []
+    columns = ", ".join(("id",) + ANALYSIS_LIST_COLUMNS)
+
+    while True:
+        response = supabase.table("cv_analyses").select(columns).gt("id", last_id).order("id").limit(
+            batch_size).execute()
+        rows = response.data
+        if not rows:
+            break
+
+        for row in rows:
+            changes = {}
+            for column in ANALYSIS_LIST_COLUMNS:
+                try:
+                    decoded = decode_value(row.get(column))
+                except ValueError as e:
+                    print(f"⚠️ Left cv_analyses {row['id']}.{column} unchanged: {e}")
+                    undecodable.append((row["id"], column))
+                    continue
+                if decoded is not None:
+                    changes[column] = decoded
+
+            if changes:
+                updated += 1
+                if not dry_run:
+                    supabase.table("cv_analyses").update(changes).eq("id", row["id"]).execute()
+
+        scanned += len(rows)
+        last_id = rows[-1]["id"]
+        print(f"Scanned {scanned} rows, {'would update' if dry_run else 'updated'} {updated} (last id {last_id})")
+
+    return {"scanned": scanned, "updated": updated, "undecodable": undecodable}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    result = backfill(args.batch_size, args.dry_run)
+    print(f"✅ Done: {result}")
@@ -0,0 +1,39 @@
+"""Build skill_analytics rows from existing analyses.
+
+Run once after migrations/005_skill_analytics.sql, or for a single user to
+repair stats that drifted (e.g. after a failed update). Rebuilding replaces
+the user's stats with a full recount, so it is safe to re-run. Analyses are
+read in id-ordered batches, and nothing is saved until every batch has been
+counted.
+
+Usage:
+    python -m scripts.backfill_skill_analytics [--user <user_id>] [--batch-size 1000]
+"""
+import argparse
+
+from src.services.database import count_skill_stats, rebuild_skill_analytics
+from src.services.skill_analytics import empty_stats
+
+
+def backfill(user_id=None, batch_size=1000):
+    stats_by_user = count_skill_stats(user_id, batch_size)
+    if user_id and user_id not in stats_by_user:
+        stats_by_user[user_id] = empty_stats()  # no analyses left
+
+    for done, (stats_user_id, stats) in enumerate(stats_by_user.items(), 1):
+        rebuild_skill_analytics(stats_user_id, stats)
+        if done % 100 == 0:
+            print(f"Rebuilt {done}/{len(stats_by_user)} users")
+
+    return {"users": len(stats_by_user),
+            "analyses": sum(stats["analyses"] for stats in stats_by_user.values())}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--user", default=None, help="only rebuild this user")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    result = backfill(args.user, args.batch_size)
+    print(f"✅ Done: {result}")
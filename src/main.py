@@ -1,56 +1,227 @@
+import functools
+import hmac
 import os
 import tempfile
+import time
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import List, Optional
 from fastapi import FastAPI, UploadFile, File, Form, Request, Cookie
-from fastapi.responses import HTMLResponse, FileResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
 from src.services.file_parser import parse_file
 from src.services.ai_analizer import analyze_cv
 from src.services.cv_modifier import modify_cv
-from src.services.auth import signup_user, login_user, get_user_from_token
-from src.services.storage import upload_file, download_file, get_file_url
+from src.services.auth import signup_user, login_user, get_user_from_token, forget_token
+from src.services.storage import upload_file, upload_many, get_file_url, get_file_urls, get_file_info, iter_file
+from src.services.storage_backends import get_storage_backend, LocalStorageBackend
 from src.services.database import (
     save_analysis,
-    get_user_analyses,
     get_analysis_by_id,
-    update_analysis_improved_cv,
+    update_latest_analysis_improved_cv,
     save_generated_cv,
     save_cover_letter,
-    get_user_all_activities
+    save_cover_letters,
+    get_user_activity_feed,
+    search_analyses,
+    get_skill_analytics,
+    find_similar_analyses,
+    find_duplicate_analysis,
+    flush_pending_writes,
+    activity_cache_stats,
+    write_buffer_stats,
+    job_index_stats
+)
+from src.services.clients import client_pool_stats
+from src.services.cover_letter_generator import (
+    generate_cover_letter,
+    create_cover_letter_docx,
+    generate_cover_letters,
+    parse_targets
 )
-from src.services.cover_letter_generator import generate_cover_letter, create_cover_letter_docx
 from src.services.cv_builder import build_cv_from_info, generate_cv_file
+from src.services.export import iter_user_export
+from src.utils.admission import AdmissionController, Rejected
+from src.utils.http import parse_range_header, etag_matches
+from src.utils.idempotency import IdempotencyCache, body_fingerprint, new_key as new_idempotency_key
+from src.utils.metrics import (
+    ADMISSION_REJECTED, ADMISSION_WAIT, HTTP_SECONDS, IDEMPOTENT_REQUESTS, register_stats,
+    render as render_metrics, stage_timer
+)
+from src.utils.profiling import RequestProfiler
 
 app = FastAPI(title="JobFit - CV Analyzer")
 
 # Get the base directory
 BASE_DIR = Path(__file__).resolve().parent
 
-# Debug: Print paths
-print(f"BASE_DIR: {BASE_DIR}")
-print(f"Static dir: {BASE_DIR / 'static'}")
-print(f"Static dir exists: {(BASE_DIR / 'static').exists()}")
-
-# Mount static files with error handling
+# Mount static files, falling back to the deployment path
 static_dir = BASE_DIR / "static"
+if not static_dir.exists():
+    static_dir = Path("/opt/render/project/src/src/static")
 if static_dir.exists():
     app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
-    print(f"✅ Static files mounted from: {static_dir}")
 else:
-    print(f"⚠️ WARNING: Static directory not found at {static_dir}")
-    # Try alternative path (in case of deployment)
-    alt_static_dir = Path("/opt/render/project/src/src/static")
-    if alt_static_dir.exists():
-        app.mount("/static", StaticFiles(directory=str(alt_static_dir)), name="static")
-        print(f"✅ Static files mounted from alternative path: {alt_static_dir}")
-    else:
-        print(f"❌ Static files not found at alternative path either")
+    print(f"⚠️ WARNING: Static directory not found at {BASE_DIR / 'static'}")
+
+
+class TimedTemplates(Jinja2Templates):
+    """Jinja2Templates that records rendering as the "render" stage"""
+
+    def TemplateResponse(self, *args, **kwargs):
+        with stage_timer("render"):
+            return super().TemplateResponse(*args, **kwargs)
+
 
 # Setup templates
-templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
+templates = TimedTemplates(directory=str(BASE_DIR / "templates"))
+# Forms posting to expensive routes add ?idempotency_key={{ idempotency_key() }} to their action.
+# Their pages are sent with NO_STORE so a page restored from history renders a fresh key.
+templates.env.globals["idempotency_key"] = new_idempotency_key
+NO_STORE = {"Cache-Control": "no-store"}
+
+# Internal stats exported on /metrics next to the request and stage timings
+register_stats("jobfit_activity_cache", "Per-user activity cache", activity_cache_stats)
+register_stats("jobfit_write_buffer", "Write-behind buffer", write_buffer_stats)
+register_stats("jobfit_user_clients", "Per-user Supabase client pool", client_pool_stats)
+register_stats("jobfit_job_index", "Similar-job index", job_index_stats)
+
+# /metrics requires "Authorization: Bearer <METRICS_TOKEN>" and is off (404) when it isn't set,
+# since it exposes per-user cache and queue internals
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+# Admin-only endpoints require the "X-Admin-Token: <ADMIN_TOKEN>" header (disabled when unset)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+# Opt-in request profiling: PROFILE_SAMPLE_RATE of requests (0 = off), plus admin
+# requests sent with "X-Profile: 1". The PROFILE_KEEP slowest are kept.
+_profiler = RequestProfiler(
+    sample_rate=float(os.getenv("PROFILE_SAMPLE_RATE", "0")),
+    keep=int(os.getenv("PROFILE_KEEP", "20"))
+)
+
+
+def profiled_in_thread(func):
+    """For sync routes: profile the work FastAPI runs on its thread pool as part of the request"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return _profiler.run_in_thread(func, *args, **kwargs)
+    return wrapper
+
+
+# Admission control for the routes that call the LLM (ADMISSION_MAX_IN_FLIGHT=0 turns it off)
+# These routes are plain def: FastAPI runs them on its thread pool, so their blocking LLM,
+# storage and database calls run concurrently instead of holding the event loop.
+# Sync routes are wrapped with @profiled_in_thread so request profiles still see their work.
+ADMISSION_ROUTES = {"/analyze", "/process-changes", "/generate-cv", "/generate-cover-letter"}
+_admission = AdmissionController(
+    max_in_flight=int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "8")),
+    per_user_in_flight=int(os.getenv("ADMISSION_USER_IN_FLIGHT", "2")),
+    user_rate=float(os.getenv("ADMISSION_USER_RATE", "10")),
+    user_burst=int(os.getenv("ADMISSION_USER_BURST", "5")),
+    max_queue=int(os.getenv("ADMISSION_QUEUE_SIZE", "32")),
+    queue_timeout=float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "20"))
+)
+register_stats("jobfit_admission", "Admission control for LLM routes", lambda: _admission.stats())
+
+# Duplicate submissions (same user, route and key) share one run; results are replayed for IDEMPOTENCY_TTL
+_idempotency = IdempotencyCache(
+    ttl=int(os.getenv("IDEMPOTENCY_TTL", "600")),
+    maxsize=int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "1024"))
+)
+register_stats("jobfit_idempotency", "Idempotent POST responses", lambda: _idempotency.stats())
+
+
+def is_admin(request: Request):
+    token = request.headers.get("x-admin-token")
+    return bool(ADMIN_TOKEN and token and hmac.compare_digest(token, ADMIN_TOKEN))
+
+
+# Declared before the metrics middleware so it runs inside it and shed requests are timed too
+@app.middleware("http")
+async def admission_control(request: Request, call_next):
+    route = request.url.path
+    if request.method != "POST" or route not in ADMISSION_ROUTES or not _admission.enabled:
+        return await call_next(request)
+    user = get_current_user(request.cookies.get("access_token"))
+    if not user:
+        return await call_next(request)  # the route redirects to /login
+
+    try:
+        waited = await _admission.acquire(user.id)
+    except Rejected as e:
+        ADMISSION_REJECTED.inc(route, e.reason)
+        return templates.TemplateResponse("busy.html", {
+            "request": request,
+            "user": user,
+            "retry_after": e.retry_after,
+            "reason": e.reason
+        }, status_code=429, headers={"Retry-After": str(e.retry_after)})
+
+    ADMISSION_WAIT.observe(waited, route)
+    start = time.monotonic()
+    try:
+        return await call_next(request)
+    finally:
+        _admission.release(user.id, time.monotonic() - start)
+
+
+# Declared after admission control so it runs outside it: duplicates never take a slot or quota
+@app.middleware("http")
+async def collapse_duplicate_submissions(request: Request, call_next):
+    route = request.url.path
+    # Read from the query string (or a header for API clients) so uploads aren't parsed twice
+    key = request.headers.get("idempotency-key") or request.query_params.get("idempotency_key")
+    if request.method != "POST" or route not in ADMISSION_ROUTES or not key:
+        return await call_next(request)
+    user = get_current_user(request.cookies.get("access_token"))
+    if not user:
+        return await call_next(request)
+
+    # The body is cached on the request, so the route still reads it
+    fingerprint = body_fingerprint(await request.body(), request.headers.get("content-type"))
+    response, outcome = await _idempotency.run((user.id, route, key[:128], fingerprint), lambda: call_next(request))
+    IDEMPOTENT_REQUESTS.inc(route, outcome)
+    return response
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        # Label by route template, not the raw path, to keep the series count bounded
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        HTTP_SECONDS.observe(time.perf_counter() - start, request.method, route, str(status_code))
+
+
+@app.middleware("http")
+async def profile_requests(request: Request, call_next):
+    forced = request.headers.get("x-profile") == "1" and is_admin(request)
+    profile = _profiler.start() if _profiler.should_profile(forced) else None
+    if profile is None:
+        return await call_next(request)
+
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        _profiler.finish(profile, time.perf_counter() - start, request.method, request.url.path, status_code)
+
+
+@app.on_event("shutdown")
+def shutdown():
+    # Write out records still queued in the write-behind buffer
+    flush_pending_writes()
 
 
 def get_current_user(access_token: Optional[str]):
@@ -112,7 +283,8 @@ async def signup(
 
 
 @app.get("/logout")
-async def logout():
+async def logout(access_token: Optional[str] = Cookie(None)):
+    forget_token(access_token)
     response = RedirectResponse(url="/login", status_code=303)
     response.delete_cookie("access_token")
     return response
@@ -135,7 +307,7 @@ async def upload_page(request: Request, access_token: Optional[str] = Cookie(Non
     user = get_current_user(access_token)
     if not user:
         return RedirectResponse(url="/login", status_code=303)
-    return templates.TemplateResponse("upload.html", {"request": request, "user": user})
+    return templates.TemplateResponse("upload.html", {"request": request, "user": user}, headers=NO_STORE)
 
 
 @app.get("/create", response_class=HTMLResponse)
@@ -143,22 +315,61 @@ async def create_page(request: Request, access_token: Optional[str] = Cookie(Non
     user = get_current_user(access_token)
     if not user:
         return RedirectResponse(url="/login", status_code=303)
-    return templates.TemplateResponse("create.html", {"request": request, "user": user})
+    return templates.TemplateResponse("create.html", {"request": request, "user": user}, headers=NO_STORE)
 
 
 @app.get("/dashboard", response_class=HTMLResponse)
-async def dashboard_page(request: Request, access_token: Optional[str] = Cookie(None)):
+async def dashboard_page(request: Request, before: Optional[str] = None, access_token: Optional[str] = Cookie(None)):
     user = get_current_user(access_token)
     if not user:
         return RedirectResponse(url="/login", status_code=303)
 
-    # Get all user activities
-    activities = get_user_all_activities(user.id)
+    # Get one page of user activities
+    feed = get_user_activity_feed(user.id, before=before)
+    activities = feed["items"]
+
+    # Sign every downloadable file in one storage request
+    file_paths = [
+        activity.get("cv_file_path") or activity.get("cover_letter_file_path")
+        for activity in activities
+    ]
+    download_urls = get_file_urls(file_paths, access_token).get("urls", {})
 
     return templates.TemplateResponse("dashboard.html", {
         "request": request,
         "user": user,
-        "activities": activities
+        "activities": activities,
+        "next_cursor": feed["next_cursor"],
+        "download_urls": download_urls,
+        "skill_analytics": get_skill_analytics(user.id, top_n=5)
+    })
+
+
+@app.get("/api/skill-analytics")
+async def skill_analytics_api(top: int = 10, access_token: Optional[str] = Cookie(None)):
+    user = get_current_user(access_token)
+    if not user:
+        return JSONResponse({"error": "Not authenticated"}, status_code=401)
+
+    return JSONResponse(get_skill_analytics(user.id, top_n=max(1, min(top, 50))))
+
+
+@app.get("/search", response_class=HTMLResponse)
+async def search_page(request: Request, q: str = "", page: int = 1, access_token: Optional[str] = Cookie(None)):
+    user = get_current_user(access_token)
+    if not user:
+        return RedirectResponse(url="/login", status_code=303)
+
+    search = search_analyses(user.id, q, page=page)
+
+    return templates.TemplateResponse("search.html", {
+        "request": request,
+        "user": user,
+        "query": q,
+        "results": search["results"],
+        "page": search["page"],
+        "has_more": search["has_more"],
+        "error": search.get("error")
     })
 
 
@@ -194,7 +405,8 @@ async def analysis_detail(
 # ==================== CV GENERATION ====================
 
 @app.post("/generate-cv", response_class=HTMLResponse)
-async def generate_cv(
+@profiled_in_thread
+def generate_cv(
         request: Request,
         name: str = Form(...),
         email: str = Form(...),
@@ -328,7 +540,8 @@ async def generate_cv(
 # ==================== CV ANALYSIS ====================
 
 @app.post("/analyze", response_class=HTMLResponse)
-async def analyze(
+@profiled_in_thread
+def analyze(
         request: Request,
         cv_file: UploadFile = File(...),
         job_description: str = Form(...),
@@ -340,7 +553,7 @@ async def analyze(
 
     suffix = os.path.splitext(cv_file.filename)[1]
     with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-        content = await cv_file.read()
+        content = cv_file.file.read()
         tmp.write(content)
         tmp_path = tmp.name
 
@@ -349,9 +562,18 @@ async def analyze(
         upload_result = upload_file(tmp_path, f"original_{cv_file.filename}", user.id, access_token)
         original_cv_storage_path = upload_result.get("path") if upload_result["success"] else None
 
-        # Parse and analyze
+        # Parse and analyze; the same CV against a near-identical posting reuses the earlier result
         cv_text = parse_file(tmp_path)
-        result = analyze_cv(cv_text, job_description, save_to_db=False)
+        # One index search serves both the "similar jobs" list and the duplicate check
+        similar_analyses = find_similar_analyses(user.id, [job_description], k=5)[0]
+        reused_analysis = find_duplicate_analysis(user.id, job_description, original_cv_storage_path,
+                                                  similar=similar_analyses)
+        similar_analyses = similar_analyses[:3]
+        if reused_analysis:
+            result = {key: reused_analysis.get(key) for key in
+                      ("match_score", "matching_skills", "missing_skills", "suggestions", "cover_letter_points")}
+        else:
+            result = analyze_cv(cv_text, job_description, save_to_db=False)
 
         if "error" in result:
             return f"<p>Error: {result['error']}</p>"
@@ -384,6 +606,8 @@ async def analyze(
             "cv_text": cv_text,
             "filename": cv_file.filename,
             "original_cv_path": original_cv_storage_path,
+            "reused_analysis": reused_analysis,
+            "similar_analyses": similar_analyses,
             "user": user
         })
 
@@ -413,11 +637,12 @@ async def apply_changes(
         "original_cv_path": original_cv_path,
         "suggestions": suggestions,
         "user": user
-    })
+    }, headers=NO_STORE)
 
 
 @app.post("/process-changes", response_class=HTMLResponse)
-async def process_changes(
+@profiled_in_thread
+def process_changes(
         request: Request,
         cv_text: str = Form(...),
         filename: str = Form(...),
@@ -460,10 +685,7 @@ async def process_changes(
         print(f"Download URL: {download_url}")
 
         # UPDATE: Save improved CV path to the most recent analysis
-        analyses = get_user_analyses(user.id)
-        if analyses and len(analyses) > 0:
-            latest_analysis_id = analyses[0]["id"]
-            update_analysis_improved_cv(latest_analysis_id, improved_cv_storage_path)
+        update_latest_analysis_improved_cv(user.id, improved_cv_storage_path)
 
         # Clean up
         os.unlink(output_path)
@@ -488,11 +710,12 @@ async def cover_letter_page(request: Request, access_token: Optional[str] = Cook
     user = get_current_user(access_token)
     if not user:
         return RedirectResponse(url="/login", status_code=303)
-    return templates.TemplateResponse("cover_letter.html", {"request": request, "user": user})
+    return templates.TemplateResponse("cover_letter.html", {"request": request, "user": user}, headers=NO_STORE)
 
 
 @app.post("/generate-cover-letter", response_class=HTMLResponse)
-async def generate_cover_letter_route(
+@profiled_in_thread
+def generate_cover_letter_route(
         request: Request,
         name: str = Form(...),
         email: str = Form(...),
@@ -503,6 +726,8 @@ async def generate_cover_letter_route(
         job_title: str = Form(...),
         company_name: str = Form(...),
         job_description: str = Form(...),
+        more_targets: str = Form(""),
+        tailor: bool = Form(False),
         access_token: Optional[str] = Cookie(None)
 ):
     user = get_current_user(access_token)
@@ -517,7 +742,7 @@ async def generate_cover_letter_route(
         if resume_file and resume_file.filename:
             suffix = os.path.splitext(resume_file.filename)[1]
             with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-                content = await resume_file.read()
+                content = resume_file.file.read()
                 tmp.write(content)
                 tmp_path = tmp.name
 
@@ -534,6 +759,11 @@ async def generate_cover_letter_route(
             "linkedin": linkedin
         }
 
+        if more_targets.strip():
+            targets = parse_targets(f"{company_name} | {job_title}\n{more_targets}", default_position=job_title)
+            return cover_letter_batch(request, user, access_token, resume_content, job_description,
+                                      user_info, targets, tailor)
+
         # Generate cover letter with AI
         cover_letter_text = generate_cover_letter(resume_content, job_description, user_info)
 
@@ -602,29 +832,155 @@ async def generate_cover_letter_route(
                 pass
 
 
+def cover_letter_batch(request, user, access_token, resume_content, job_description, user_info, targets, tailor):
+    """Letters for several companies from one base letter, uploaded concurrently"""
+    letters = generate_cover_letters(resume_content, job_description, user_info, targets, tailor=tailor)
+
+    upload_results = upload_many([(letter["data"], letter["filename"]) for letter in letters], user.id, access_token)
+
+    saved = []
+    for letter, upload_result in zip(letters, upload_results):
+        letter["storage_path"] = upload_result.get("path") if upload_result["success"] else None
+        if letter["storage_path"]:
+            saved.append({
+                "job_title": letter["target"]["position"],
+                "company_name": letter["target"]["company_name"],
+                "cover_letter_file_path": letter["storage_path"]
+            })
+    save_cover_letters(user.id, user_info["name"], saved)
+
+    urls = get_file_urls([letter["storage_path"] for letter in letters], access_token)["urls"]
+    for letter in letters:
+        letter["download_url"] = urls.get(letter["storage_path"])
+
+    if not any(letter["download_url"] for letter in letters):
+        return "<p>Error: Could not generate download URLs. Check logs.</p>"
+
+    return templates.TemplateResponse("cover_letters_preview.html", {
+        "request": request,
+        "user": user,
+        "letters": letters
+    })
+
+
 # ==================== FILE DOWNLOAD ====================
 
+def stream_stored_file(request: Request, path: str, access_token: Optional[str] = None):
+    """Stream a stored file, honouring Range, If-Range and If-None-Match"""
+    info = get_file_info(path, access_token)
+    if not info["success"]:
+        return JSONResponse({"error": "File not found"}, status_code=404)
+
+    size = info["size"]
+    headers = {
+        "ETag": info["etag"],
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f'attachment; filename="{path.split("/")[-1]}"'
+    }
+
+    if etag_matches(request.headers.get("if-none-match"), info["etag"]):
+        return Response(status_code=304, headers=headers)
+
+    byte_range = None
+    if_range = request.headers.get("if-range")
+    if not if_range or etag_matches(if_range, info["etag"]):
+        try:
+            byte_range = parse_range_header(request.headers.get("range"), size)
+        except ValueError:
+            headers["Content-Range"] = f"bytes */{size}"
+            return Response(status_code=416, headers=headers)
+
+    if byte_range:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    else:
+        start, end = 0, size - 1
+        status_code = 200
+    headers["Content-Length"] = str(end - start + 1)
+
+    return StreamingResponse(
+        iter_file(path, info, access_token, start, end),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/octet-stream"
+    )
+
+
 @app.get("/download-file/{path:path}")
-async def download_stored_file(path: str, access_token: Optional[str] = Cookie(None)):
+async def download_stored_file(request: Request, path: str, access_token: Optional[str] = Cookie(None)):
     user = get_current_user(access_token)
     if not user:
         return RedirectResponse(url="/login", status_code=303)
 
-    try:
-        # Download from Supabase storage WITH ACCESS TOKEN
-        temp_path = f"/tmp/{path.split('/')[-1]}"
-        result = download_file(path, temp_path, access_token)
-
-        if result["success"]:
-            return FileResponse(
-                path=temp_path,
-                filename=path.split('/')[-1],
-                media_type="application/octet-stream"
-            )
-        else:
-            return {"error": "File not found"}
-    except Exception as e:
-        return {"error": str(e)}
+    # Stored files live under the owner's user id
+    if not path.startswith(f"{user.id}/"):
+        return JSONResponse({"error": "File not found"}, status_code=404)
+
+    return stream_stored_file(request, path, access_token)
+
+
+@app.get("/metrics")
+async def metrics(request: Request):
+    """Prometheus metrics"""
+    if not METRICS_TOKEN:
+        return JSONResponse({"error": "Not found"}, status_code=404)
+    token = request.headers.get("authorization", "")
+    if not hmac.compare_digest(token.encode(), f"Bearer {METRICS_TOKEN}".encode()):
+        return Response(status_code=401)
+    return Response(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/admin/profiles")
+async def list_profiles(request: Request):
+    """The slowest profiled requests kept in memory"""
+    if not is_admin(request):
+        return JSONResponse({"error": "Not found"}, status_code=404)
+    return {"sample_rate": _profiler.sample_rate, "profiled": _profiler.profiled, "profiles": _profiler.profiles()}
+
+
+@app.get("/admin/profiles/collapsed")
+async def all_profiles_collapsed(request: Request):
+    """All kept profiles merged into collapsed stacks (flamegraph.pl / speedscope input)"""
+    if not is_admin(request):
+        return JSONResponse({"error": "Not found"}, status_code=404)
+    return Response(_profiler.collapsed(), media_type="text/plain; charset=utf-8")
+
+
+@app.get("/admin/profiles/{profile_id}/collapsed")
+async def profile_collapsed(request: Request, profile_id: int):
+    """One kept profile as collapsed stacks"""
+    if not is_admin(request):
+        return JSONResponse({"error": "Not found"}, status_code=404)
+    stacks = _profiler.collapsed(profile_id)
+    if stacks is None:
+        return JSONResponse({"error": "Profile not found"}, status_code=404)
+    return Response(stacks, media_type="text/plain; charset=utf-8")
+
+
+@app.get("/export")
+async def export_all(access_token: Optional[str] = Cookie(None)):
+    """Zip of the user's files and analysis history, streamed as it is built"""
+    user = get_current_user(access_token)
+    if not user:
+        return RedirectResponse(url="/login", status_code=303)
+
+    filename = f"jobfit-export-{datetime.now(timezone.utc):%Y%m%d}.zip"
+    return StreamingResponse(
+        iter_user_export(user.id, access_token),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@app.get("/local-files/{path:path}")
+async def local_stored_file(request: Request, path: str, expires: str = "", signature: str = ""):
+    """Serve signed URLs issued by the local storage backend"""
+    backend = get_storage_backend()
+    if not isinstance(backend, LocalStorageBackend) or not backend.verify_signature(path, expires, signature):
+        return JSONResponse({"error": "File not found"}, status_code=404)
+
+    return stream_stored_file(request, path)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,96 @@
+"""Structured view of a CV's text: contact details, sections, roles, bullets and skills.
+
+Built by src.services.cv_parser and rendered back into compact prompt text
+with StructuredCV.to_prompt(fields), so each AI call only sends the parts of
+the CV it actually uses.
+"""
+
+# Fields a prompt can ask for, in the order they are rendered
+PROMPT_FIELDS = ("contact", "summary", "experience", "education", "skills", "other")
+
+
+class Contact:
+    """details holds the rest of the contact lines (location, personal sites) as written"""
+    __slots__ = ("name", "email", "phone", "links", "details")
+
+    def __init__(self, name="", email="", phone="", links=(), details=()):
+        self.name = name
+        self.email = email
+        self.phone = phone
+        self.links = tuple(links)
+        self.details = tuple(details)
+
+    def to_line(self):
+        return " | ".join(part for part in (self.name, self.email, self.phone, *self.links, *self.details) if part)
+
+
+class Role:
+    """One entry of an experience-like section: its heading line and the bullets under it"""
+    __slots__ = ("title", "bullets")
+
+    def __init__(self, title, bullets=None):
+        self.title = title
+        self.bullets = bullets if bullets is not None else []
+
+
+class Section:
+    """A titled block of the CV. kind is one of PROMPT_FIELDS except "contact".
+
+    Skills sections hold their lists with skill names normalized.
+    """
+    __slots__ = ("title", "kind", "lines", "roles")
+
+    def __init__(self, title, kind, lines=None, roles=None):
+        self.title = title
+        self.kind = kind
+        self.lines = lines if lines is not None else []
+        self.roles = roles if roles is not None else []
+
+    def to_prompt(self, max_bullets=None):
+        lines = [f"{self.title.upper()}:"]
+        lines.extend(self.lines)
+        for role in self.roles:
+            lines.append(f"- {role.title}")
+            bullets = role.bullets if max_bullets is None else role.bullets[:max_bullets]
+            lines.extend(f"  • {bullet}" for bullet in bullets)
+        return "\n".join(lines)
+
+
+class StructuredCV:
+    __slots__ = ("content_hash", "raw_text", "contact", "sections", "skills")
+
+    def __init__(self, content_hash, raw_text, contact, sections, skills):
+        self.content_hash = content_hash
+        self.raw_text = raw_text
+        self.contact = contact
+        self.sections = sections
+        self.skills = skills
+
+    @property
+    def is_structured(self):
+        """True when section headings were found; otherwise prompts fall back to the raw text"""
+        return any(section.kind != "summary" for section in self.sections)
+
+    @property
+    def roles(self):
+        return [role for section in self.sections if section.kind == "experience" for role in section.roles]
+
+    def to_prompt(self, fields=PROMPT_FIELDS, max_bullets=None):
+        """Compact CV text holding only `fields`; the raw text when the CV isn't structured.
+
+        max_bullets caps the bullets rendered per role.
+        """
+        if not self.is_structured:
+            return self.raw_text
+
+        parts = []
+        if "contact" in fields and self.contact.to_line():
+            parts.append(f"CONTACT: {self.contact.to_line()}")
+        for section in self.sections:
+            if section.kind not in fields:
+                continue
+            parts.append(section.to_prompt(max_bullets))
+        return "\n\n".join(parts)
+
+    def __repr__(self):
+        return f"StructuredCV({self.content_hash[:12]}, sections={[s.title for s in self.sections]!r})"
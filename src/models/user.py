@@ -0,0 +1,24 @@
+class TokenUser:
+    """Minimal user object built from verified access-token claims.
+
+    Exposes the same attributes the templates and routes read from the
+    Supabase user object: id, email and user_metadata.
+    """
+
+    def __init__(self, id, email=None, user_metadata=None, role=None):
+        self.id = id
+        self.email = email or ""
+        self.user_metadata = user_metadata or {}
+        self.role = role
+
+    @classmethod
+    def from_claims(cls, claims):
+        return cls(
+            id=claims.get("sub"),
+            email=claims.get("email"),
+            user_metadata=claims.get("user_metadata"),
+            role=claims.get("role")
+        )
+
+    def __repr__(self):
+        return f"TokenUser(id={self.id!r}, email={self.email!r})"
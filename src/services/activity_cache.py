@@ -0,0 +1,110 @@
+import threading
+from collections import OrderedDict
+
+from src.utils.cache import TTLCache
+
+KINDS = ("feed", "analysis", "latest")
+_MISSING = object()
+
+
+class UserActivityCache:
+    """Per-user read cache for the dashboard feed, single analyses and the latest analysis id.
+
+    One entry per user (LRU-bounded, expiring after ttl seconds) holds that
+    user's cached reads, so a write can drop or update everything for the
+    user at once. Reads use lookup()/store() with a token: a result fetched
+    while a write invalidated the user is not stored, so a slow read can't
+    put stale data back. Invalidation is per process; the TTL bounds how
+    stale other workers can be.
+    """
+
+    def __init__(self, maxsize=2048, ttl=120, max_pages=8):
+        self.max_pages = max_pages
+        self._users = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self.hits = dict.fromkeys(KINDS, 0)
+        self.misses = dict.fromkeys(KINDS, 0)
+
+    def _new_entry(self):
+        return {"version": 0, "feed": OrderedDict(), "analysis": {}, "latest": _MISSING}
+
+    def lookup(self, kind, user_id, key=None):
+        """Return (value, token); value is None on a miss. Pass the token to store()"""
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is None:
+                entry = self._new_entry()
+                self._users.set(user_id, entry)
+
+            value = entry["latest"] if kind == "latest" else entry[kind].get(key, _MISSING)
+            if value is _MISSING:
+                self.misses[kind] += 1
+                value = None
+            else:
+                self.hits[kind] += 1
+                if kind == "feed":
+                    entry["feed"].move_to_end(key)
+            return value, (entry, entry["version"])
+
+    def store(self, kind, user_id, key, value, token):
+        """Cache a value read after lookup(), unless the user was written to meanwhile"""
+        entry, version = token
+        with self._lock:
+            if self._users.get(user_id) is not entry or entry["version"] != version:
+                return
+            if kind == "latest":
+                entry["latest"] = value
+            elif kind == "feed":
+                entry["feed"][key] = value
+                while len(entry["feed"]) > self.max_pages:
+                    entry["feed"].popitem(last=False)
+            else:
+                entry[kind][key] = value
+
+    def invalidate(self, user_id, kinds=KINDS):
+        """Drop cached reads of these kinds for a user"""
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is None:
+                return
+            entry["version"] += 1
+            for kind in kinds:
+                if kind == "latest":
+                    entry["latest"] = _MISSING
+                else:
+                    entry[kind].clear()
+
+    def update_analysis(self, user_id, analysis_id, changes):
+        """Write-through: apply changes to a cached analysis and drop the user's feed pages"""
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is None:
+                return
+            entry["version"] += 1
+            analysis = entry["analysis"].get(analysis_id)
+            if analysis is not None:
+                entry["analysis"][analysis_id] = {**analysis, **changes}
+            entry["feed"].clear()
+
+    def clear(self):
+        self._users.clear()
+
+    def stats(self):
+        """Entry count and hit rates, overall and per kind"""
+        with self._lock:
+            kinds = {}
+            for kind in KINDS:
+                total = self.hits[kind] + self.misses[kind]
+                kinds[kind] = {
+                    "hits": self.hits[kind],
+                    "misses": self.misses[kind],
+                    "hit_rate": (self.hits[kind] / total) if total else 0.0
+                }
+            hits = sum(self.hits.values())
+            total = hits + sum(self.misses.values())
+        return {
+            "users": len(self._users),
+            "maxsize": self._users.maxsize,
+            "hit_rate": (hits / total) if total else 0.0,
+            "kinds": kinds
+        }
@@ -1,15 +1,20 @@
 import json
-from openai import OpenAI
 from dotenv import load_dotenv
+from src.services.clients import get_openai_client
+from src.services.cv_parser import get_structured_cv
 from src.services.file_parser import parse_file
 from src.services.database import save_analysis
+from src.utils.metrics import llm_call
 
 load_dotenv()
-client = OpenAI()
+
+# CV parts the match analysis looks at (contact details don't affect the score)
+ANALYSIS_FIELDS = ("summary", "experience", "education", "skills", "other")
 
 
 def build_prompt(cv_text, job_description):
     """Build the prompt to send to OpenAI"""
+    cv_text = get_structured_cv(cv_text).to_prompt(ANALYSIS_FIELDS)
     prompt = f"""
 You are a professional CV/Resume analyzer. Analyze how well this CV matches the job description.
 
@@ -42,10 +47,12 @@ Return ONLY valid JSON, no other text.
 
 def call_openai(prompt):
     """Send prompt to OpenAI and get response"""
-    response = client.responses.create(
-        model="gpt-5-nano-2025-08-07",
-        input=prompt
-    )
+    model = "gpt-5-nano-2025-08-07"
+    with llm_call(model, "analyze") as call:
+        response = call.record(get_openai_client().responses.create(
+            model=model,
+            input=prompt
+        ))
     return response.output_text
 
 
@@ -1,18 +1,23 @@
 import os
-from supabase import create_client
+import time
 from dotenv import load_dotenv
+from src.models.user import TokenUser
+from src.services.clients import get_auth_client
+from src.services.token_verifier import verify_access_token, get_token_expiry
+from src.utils.cache import TTLCache
 
 load_dotenv()
 
-url = os.getenv("SUPABASE_URL")
-key = os.getenv("SUPABASE_KEY")
-supabase = create_client(url, key)
+# Verified users keyed by access token, so repeat requests skip verification
+USER_CACHE_TTL = int(os.getenv("AUTH_USER_CACHE_TTL", "60"))
+USER_CACHE_SIZE = int(os.getenv("AUTH_USER_CACHE_SIZE", "4096"))
+_user_cache = TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
 
 
 def signup_user(email, password, name):
     """Create a new user account"""
     try:
-        response = supabase.auth.sign_up({
+        response = get_auth_client().auth.sign_up({
             "email": email,
             "password": password,
             "options": {
@@ -29,7 +34,7 @@ def signup_user(email, password, name):
 def login_user(email, password):
     """Login user and get session"""
     try:
-        response = supabase.auth.sign_in_with_password({
+        response = get_auth_client().auth.sign_in_with_password({
             "email": email,
             "password": password
         })
@@ -39,18 +44,47 @@ def login_user(email, password):
 
 
 def get_user_from_token(access_token):
-    """Get user info from access token"""
-    try:
-        response = supabase.auth.get_user(access_token)
-        return {"success": True, "user": response.user}
-    except Exception as e:
-        return {"success": False, "error": str(e)}
+    """Get user info from access token.
+
+    The token is verified locally when possible; Supabase is only asked
+    when the token can't be checked here. Results are cached briefly.
+    """
+    user = _user_cache.get(access_token)
+    if user is not None:
+        return {"success": True, "user": user}
+
+    verified = verify_access_token(access_token)
+    if verified["success"]:
+        user = TokenUser.from_claims(verified["claims"])
+    elif verified.get("unverifiable"):
+        try:
+            response = get_auth_client().auth.get_user(access_token)
+            user = response.user
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+    else:
+        return {"success": False, "error": verified["error"]}
+
+    if user is not None:
+        ttl = USER_CACHE_TTL
+        expiry = get_token_expiry(access_token)
+        if expiry is not None:
+            ttl = min(ttl, expiry - time.time())
+        _user_cache.set(access_token, user, ttl=ttl)
+
+    return {"success": True, "user": user}
+
+
+def forget_token(access_token):
+    """Drop a token from the user cache (e.g. on logout)"""
+    if access_token:
+        _user_cache.pop(access_token)
 
 
 def logout_user(access_token):
     """Logout user"""
     try:
-        supabase.auth.sign_out()
+        get_auth_client().auth.sign_out()
         return {"success": True}
     except Exception as e:
         return {"success": False, "error": str(e)}
\ No newline at end of file
@@ -0,0 +1,109 @@
+"""Lazily created, shared service clients.
+
+Nothing here connects or imports the client libraries until first use, so
+importing the app is fast and works without credentials.
+"""
+import os
+import threading
+import time
+from dotenv import load_dotenv
+from src.services.token_verifier import get_token_expiry
+from src.utils.cache import TTLCache
+
+load_dotenv()
+
+url = os.getenv("SUPABASE_URL")
+key = os.getenv("SUPABASE_KEY")
+
+# Per-user clients are reused until their token expires or they fall out of the LRU
+USER_CLIENT_POOL_SIZE = int(os.getenv("SUPABASE_CLIENT_POOL_SIZE", "64"))
+USER_CLIENT_TTL = int(os.getenv("SUPABASE_CLIENT_TTL", "3600"))
+
+_singletons = {}
+_singleton_lock = threading.Lock()
+_user_clients = TTLCache(maxsize=USER_CLIENT_POOL_SIZE, ttl=USER_CLIENT_TTL)
+_user_lock = threading.Lock()
+
+
+def _singleton(name, factory):
+    """Return the shared instance called name, creating it with factory() on first use"""
+    instance = _singletons.get(name)
+    if instance is None:
+        with _singleton_lock:
+            instance = _singletons.get(name)
+            if instance is None:
+                instance = _singletons[name] = factory()
+    return instance
+
+
+def _create_supabase_client():
+    from supabase import create_client
+    return create_client(url, key)
+
+
+def get_anon_client():
+    """Return the shared anon-key client for data queries"""
+    return _singleton("supabase", _create_supabase_client)
+
+
+def get_auth_client():
+    """Return the client used for sign-up/sign-in.
+
+    Kept apart from the anon client because signing in stores the session
+    on the client, which must not leak into other users' data queries.
+    """
+    return _singleton("supabase-auth", _create_supabase_client)
+
+
+def get_openai_client():
+    """Return the shared OpenAI client"""
+    def create():
+        from openai import OpenAI
+        return OpenAI()
+    return _singleton("openai", create)
+
+
+def get_user_client(access_token):
+    """Return a pooled client authenticated as the token's user.
+
+    Reusing the client keeps its underlying HTTP connections alive, so
+    repeated storage calls skip client setup and the TCP/TLS handshake.
+    """
+    client = _user_clients.get(access_token)
+    if client is not None:
+        return client
+
+    with _user_lock:
+        client = _user_clients.get(access_token)
+        if client is not None:
+            return client
+
+        client = _create_supabase_client()
+        client.auth.set_session(access_token, "")
+
+        ttl = USER_CLIENT_TTL
+        expiry = get_token_expiry(access_token)
+        if expiry is not None:
+            ttl = min(ttl, expiry - time.time())
+        _user_clients.set(access_token, client, ttl=ttl)
+
+    return client
+
+
+def get_supabase_client(access_token=None):
+    """Get Supabase client with optional user token"""
+    if access_token:
+        return get_user_client(access_token)
+    return get_anon_client()
+
+
+def get_http_client():
+    """Shared keep-alive HTTP client for talking to storage directly"""
+    def create():
+        import httpx
+        return httpx.Client(timeout=30.0, follow_redirects=True)
+    return _singleton("http", create)
+
+
+def client_pool_stats():
+    return _user_clients.stats()
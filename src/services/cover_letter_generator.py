@@ -1,17 +1,38 @@
-from openai import OpenAI
+import hashlib
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from docx import Document
-from docx.shared import Pt, Inches
-from docx.enum.text import WD_ALIGN_PARAGRAPH
+from src.services.clients import get_openai_client
+from src.services.cv_parser import get_structured_cv
+from src.services.docx_renderer import DocumentFrame, new_document, text_paragraph_xml
+from src.utils.cache import TTLCache
+from src.utils.metrics import llm_call
 import datetime
 
 load_dotenv()
-client = OpenAI()
 
+# Multi-target mode: one base letter per resume and job description, reused for every company
+MAX_TARGETS = int(os.getenv("COVER_LETTER_MAX_TARGETS", "25"))
+TAILOR_MODEL = os.getenv("COVER_LETTER_TAILOR_MODEL", "gpt-4o-mini")
+TAILOR_CONCURRENCY = int(os.getenv("COVER_LETTER_TAILOR_CONCURRENCY", "6"))
+_base_letters = TTLCache(
+    maxsize=int(os.getenv("BASE_LETTER_CACHE_SIZE", "256")),
+    ttl=int(os.getenv("BASE_LETTER_CACHE_TTL", "3600"))
+)
+
+# CV parts a cover letter draws on; a few bullets per role are plenty
+COVER_LETTER_FIELDS = ("summary", "experience", "education", "skills")
+COVER_LETTER_MAX_BULLETS = 3
+
+DEFAULT_HIRING_MANAGER = "Hiring Manager"
+PLACEHOLDER_RE = re.compile(r"\[(DATE|COMPANY_NAME|HIRING_MANAGER|POSITION)\]")
+_FRAME_MARKER = "[[COVER_LETTER_BODY]]"
 
-def generate_cover_letter(resume_text, job_description, user_info):
-    """Generate a personalized cover letter using AI"""
 
+def build_cover_letter_prompt(resume_text, job_description, user_info, multi_target=False):
+    """Build the cover letter prompt; multi_target asks for a company-neutral letter"""
+    resume_text = get_structured_cv(resume_text).to_prompt(COVER_LETTER_FIELDS, max_bullets=COVER_LETTER_MAX_BULLETS)
     prompt = f"""
 You are a professional career coach and expert cover letter writer. Create a compelling, personalized cover letter based on the following information:
 
@@ -45,28 +66,62 @@ Format the letter with these markers:
 - Use [COMPANY_NAME] as placeholder for company name
 - Use [HIRING_MANAGER] as placeholder for hiring manager's name
 - Use [POSITION] for the job title
-
+"""
+    if multi_target:
+        prompt += """
+This letter will be sent to several companies hiring for this kind of role. Never name a
+specific company, product or hiring manager: always use the placeholders above. Keep
+everything about why the candidate wants to join the company in ONE paragraph that
+mentions [COMPANY_NAME], so it can be tailored per company later.
+"""
+    prompt += """
 Create a compelling cover letter that will make the hiring manager want to interview this candidate.
 """
+    return prompt
 
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",  # Use gpt-4o-mini which supports chat format
-        messages=[
-            {"role": "user", "content": prompt}
-        ]
-    )
+
+def generate_cover_letter(resume_text, job_description, user_info, multi_target=False):
+    """Generate a personalized cover letter using AI"""
+    prompt = build_cover_letter_prompt(resume_text, job_description, user_info, multi_target)
+
+    with llm_call("gpt-4o-mini", "cover_letter") as call:
+        response = call.record(get_openai_client().chat.completions.create(
+            model="gpt-4o-mini",  # Use gpt-4o-mini which supports chat format
+            messages=[
+                {"role": "user", "content": prompt}
+            ]
+        ))
 
     return response.choices[0].message.content
 
 
+def fill_placeholders(text, values):
+    """Replace [DATE], [COMPANY_NAME], [HIRING_MANAGER] and [POSITION] found in values; leave the rest"""
+    return PLACEHOLDER_RE.sub(lambda match: values.get(match.group(1)) or match.group(0), text)
+
+
 def create_cover_letter_docx(cover_letter_text, user_info, filename="cover_letter.docx"):
     """Create a formatted DOCX file from cover letter text"""
+    today = datetime.datetime.now().strftime("%B %d, %Y")
+    data = render_cover_letters([fill_placeholders(cover_letter_text, {"DATE": today})], user_info)[0]
+
+    # Save document
+    output_path = f"/tmp/{filename}"
+    with open(output_path, "wb") as f:
+        f.write(data)
 
-    doc = Document()
+    return output_path  # THIS IS CRITICAL - MUST RETURN THE PATH
+
+
+def _letter_frame(user_info):
+    """Letterhead, date and margins for the user's letters, with a slot for the body"""
+    from docx.shared import Pt, Inches
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+
+    doc = new_document()
 
     # Set margins
-    sections = doc.sections
-    for section in sections:
+    for section in doc.sections:
         section.top_margin = Inches(1)
         section.bottom_margin = Inches(1)
         section.left_margin = Inches(1)
@@ -89,35 +144,133 @@ def create_cover_letter_docx(cover_letter_text, user_info, filename="cover_lette
     if user_info.get('linkedin'):
         header_info.add_run(f"{user_info['linkedin']}\n")
 
-    # Add space
     doc.add_paragraph()
+    doc.add_paragraph().add_run(datetime.datetime.now().strftime("%B %d, %Y"))
+    doc.add_paragraph()
+    doc.add_paragraph(_FRAME_MARKER)
 
-    # Add date
-    date_para = doc.add_paragraph()
-    date_para.add_run(datetime.datetime.now().strftime("%B %d, %Y"))
+    return DocumentFrame(doc, _FRAME_MARKER)
 
-    # Add space
-    doc.add_paragraph()
 
-    # Replace placeholders in cover letter text
-    today = datetime.datetime.now().strftime("%B %d, %Y")
-    cover_letter_text = cover_letter_text.replace('[DATE]', today)
+def render_cover_letters(letter_texts, user_info):
+    """Render cover letters for one user to DOCX bytes; the letterhead is built once for all"""
+    frame = _letter_frame(user_info)
+    rendered = []
+    for text in letter_texts:
+        paragraphs = [
+            text_paragraph_xml(para_text.strip(), space_after_pt=12, align="left")
+            for para_text in text.split('\n\n') if para_text.strip()
+        ]
+        rendered.append(frame.render(paragraphs))
+    return rendered
 
-    # Add cover letter body
-    paragraphs = cover_letter_text.split('\n\n')
 
-    for para_text in paragraphs:
-        if para_text.strip():
-            para = doc.add_paragraph()
-            para.alignment = WD_ALIGN_PARAGRAPH.LEFT
-            para.add_run(para_text.strip())
-            para_format = para.paragraph_format
-            para_format.space_after = Pt(12)
+# ==================== MULTI-TARGET ====================
 
-    # Save document
-    output_path = f"/tmp/{filename}"
-    doc.save(output_path)
+def parse_targets(text, default_position=""):
+    """Parse one target per line: Company | Position | Hiring manager | Notes (all but company optional)"""
+    targets = []
+    for line in (text or "").splitlines():
+        fields = [field.strip() for field in line.split("|")]
+        if not fields[0]:
+            continue
+        fields += [""] * (4 - len(fields))
+        targets.append({
+            "company_name": fields[0],
+            "position": fields[1] or default_position,
+            "hiring_manager": fields[2],
+            "notes": " | ".join(field for field in fields[3:] if field)
+        })
+    return targets[:MAX_TARGETS]
+
+
+def get_base_letter(resume_text, job_description, user_info):
+    """One company-neutral letter per resume and job description, cached"""
+    key = hashlib.sha256("\0".join([
+        resume_text, job_description,
+        user_info.get("name", ""), user_info.get("email", ""), user_info.get("phone", "")
+    ]).encode("utf-8")).hexdigest()
+
+    letter = _base_letters.get(key)
+    if letter is None:
+        letter = generate_cover_letter(resume_text, job_description, user_info, multi_target=True)
+        _base_letters.set(key, letter)
+    return letter
+
+
+def tailorable_paragraph(paragraphs):
+    """Index of the body paragraph that talks most about the company, or None"""
+    best, best_count = None, 0
+    for index, paragraph in enumerate(paragraphs[1:-1], start=1):
+        count = paragraph.count("[COMPANY_NAME]")
+        if count > best_count:
+            best, best_count = index, count
+    return best
+
+
+def tailor_paragraph(paragraph, target):
+    """Rewrite one paragraph for a specific company with a small model; falls back to the input"""
+    notes = f"\nWhat the candidate knows about the company: {target['notes']}" if target.get("notes") else ""
+    prompt = f"""
+Rewrite this cover letter paragraph so it is specific to {target['company_name']} and the {target['position']} role.{notes}
+
+PARAGRAPH:
+{paragraph}
+
+Keep the candidate's facts, the tone and roughly the same length. Do not invent achievements.
+Return only the rewritten paragraph.
+"""
+    try:
+        with llm_call(TAILOR_MODEL, "tailor_paragraph") as call:
+            response = call.record(get_openai_client().chat.completions.create(
+                model=TAILOR_MODEL,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=300
+            ))
+        return response.choices[0].message.content.strip() or paragraph
+    except Exception as e:
+        print(f"Cover letter tailoring error: {str(e)}")
+        return paragraph
+
+
+def generate_cover_letters(resume_text, job_description, user_info, targets, tailor=False):
+    """Cover letters for many companies from one base letter.
+
+    Each target gets the base letter with its placeholders filled in and,
+    with tailor=True, its company paragraph rewritten by a small model call
+    (run concurrently). All DOCX files are rendered in one batch.
+    Returns [{"target", "text", "filename", "data"}].
+    """
+    base_letter = get_base_letter(resume_text, job_description, user_info)
+    today = datetime.datetime.now().strftime("%B %d, %Y")
+
+    letters = []
+    for target in targets:
+        values = {
+            "DATE": today,
+            "COMPANY_NAME": target["company_name"],
+            "POSITION": target.get("position"),
+            "HIRING_MANAGER": target.get("hiring_manager") or DEFAULT_HIRING_MANAGER
+        }
+        letters.append([fill_placeholders(paragraph, values) for paragraph in base_letter.split('\n\n')])
+
+    tailor_index = tailorable_paragraph(base_letter.split('\n\n')) if tailor else None
+    if tailor_index is not None and targets:
+        workers = max(1, min(TAILOR_CONCURRENCY, len(targets)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tailor") as executor:
+            tailored = list(executor.map(
+                tailor_paragraph, [paragraphs[tailor_index] for paragraphs in letters], targets
+            ))
+        for paragraphs, paragraph in zip(letters, tailored):
+            paragraphs[tailor_index] = paragraph
 
-    print(f"Saved cover letter to: {output_path}")  # Debug
+    texts = ['\n\n'.join(paragraphs) for paragraphs in letters]
+    documents = render_cover_letters(texts, user_info)
 
-    return output_path  # THIS IS CRITICAL - MUST RETURN THE PATH
\ No newline at end of file
+    name = user_info.get("name", "").replace(' ', '_')
+    return [{
+        "target": target,
+        "text": text,
+        "filename": f"{name}_cover_letter_{target['company_name'].replace(' ', '_')}.docx",
+        "data": data
+    } for target, text, data in zip(targets, texts, documents)]
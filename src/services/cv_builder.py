@@ -1,12 +1,10 @@
 import json
-from openai import OpenAI
 from dotenv import load_dotenv
-from docx import Document
-from docx.shared import Pt
-import re
+from src.services.clients import get_openai_client
+from src.services.docx_renderer import save_markup
+from src.utils.metrics import llm_call
 
 load_dotenv()
-client = OpenAI()
 
 
 def build_cv_from_info(cv_data):
@@ -59,60 +57,18 @@ Format the resume professionally using these markers:
 Create a complete, professional resume. If there is no work experience or education provided, focus on skills, summary, and potential. Make it compelling for entry-level positions.
 """
 
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",  # Use gpt-4o-mini which supports chat format
-        messages=[
-            {"role": "user", "content": prompt}
-        ]
-    )
+    with llm_call("gpt-4o-mini", "build_cv") as call:
+        response = call.record(get_openai_client().chat.completions.create(
+            model="gpt-4o-mini",  # Use gpt-4o-mini which supports chat format
+            messages=[
+                {"role": "user", "content": prompt}
+            ]
+        ))
 
     return response.choices[0].message.content
 
 
 def generate_cv_file(cv_text, filename):
     """Create a DOCX file from CV text with formatting"""
-    doc = Document()
-
-    lines = cv_text.split('\n')
-
-    for line in lines:
-        line = line.strip()
-
-        if not line:
-            continue
-
-        # Heading
-        if line.startswith('**HEADING:'):
-            heading_text = line.replace('**HEADING:', '').replace('**', '').strip()
-            paragraph = doc.add_heading(heading_text, level=1)
-            paragraph.runs[0].font.size = Pt(16)
-            paragraph.runs[0].font.bold = True
-
-        # Bullet point
-        elif line.startswith('• '):
-            text_content = line[2:]
-            paragraph = doc.add_paragraph(style='List Bullet')
-
-            parts = re.split(r'(\*\*.*?\*\*)', text_content)
-            for part in parts:
-                if part.startswith('**') and part.endswith('**'):
-                    run = paragraph.add_run(part[2:-2])
-                    run.bold = True
-                elif part:
-                    paragraph.add_run(part)
-
-        # Regular paragraph
-        else:
-            paragraph = doc.add_paragraph()
-
-            parts = re.split(r'(\*\*.*?\*\*)', line)
-            for part in parts:
-                if part.startswith('**') and part.endswith('**'):
-                    run = paragraph.add_run(part[2:-2])
-                    run.bold = True
-                elif part:
-                    paragraph.add_run(part)
-
     output_path = f"/tmp/{filename}"
-    doc.save(output_path)
-    return output_path
\ No newline at end of file
+    return save_markup(cv_text, output_path)
@@ -1,17 +1,15 @@
 import json
-import re
-from openai import OpenAI
 from dotenv import load_dotenv
-from docx import Document
-from docx.shared import Pt, RGBColor
-from docx.enum.text import WD_ALIGN_PARAGRAPH
+from src.services.clients import get_openai_client
+from src.services.docx_renderer import save_markup
+from src.utils.metrics import llm_call
 
 load_dotenv()
-client = OpenAI()
 
 
 def build_modification_prompt(cv_text, selected_suggestions):
     """Build prompt to rewrite CV with selected improvements"""
+    # The rewrite gets the CV as uploaded: the structured view is for prompts that only need parts of it
     suggestions_list = "\n".join([f"- {s}" for s in selected_suggestions])
 
     prompt = f"""
@@ -60,63 +58,19 @@ def modify_cv_with_ai(cv_text, selected_suggestions):
     """Send CV to OpenAI for modification"""
     prompt = build_modification_prompt(cv_text, selected_suggestions)
 
-    response = client.responses.create(
-        model="gpt-5-nano-2025-08-07",
-        input=prompt
-    )
+    model = "gpt-5-nano-2025-08-07"
+    with llm_call(model, "modify_cv") as call:
+        response = call.record(get_openai_client().responses.create(
+            model=model,
+            input=prompt
+        ))
 
     return response.output_text
 
 
 def create_docx_from_text(text, output_path):
     """Create a DOCX file from formatted text"""
-    doc = Document()
-
-    lines = text.split('\n')
-
-    for line in lines:
-        line = line.strip()
-
-        if not line:
-            continue
-
-        # Check if it's a heading
-        if line.startswith('**HEADING:'):
-            heading_text = line.replace('**HEADING:', '').replace('**', '').strip()
-            paragraph = doc.add_heading(heading_text, level=1)
-            paragraph.runs[0].font.size = Pt(16)
-            paragraph.runs[0].font.bold = True
-            paragraph.runs[0].font.color.rgb = RGBColor(0, 0, 0)
-
-        # Check if it's a bullet point
-        elif line.startswith('• '):
-            text_content = line[2:]  # Remove bullet
-            paragraph = doc.add_paragraph(style='List Bullet')
-
-            # Handle bold text within bullet points
-            parts = re.split(r'(\*\*.*?\*\*)', text_content)
-            for part in parts:
-                if part.startswith('**') and part.endswith('**'):
-                    run = paragraph.add_run(part[2:-2])
-                    run.bold = True
-                elif part:
-                    paragraph.add_run(part)
-
-        # Regular paragraph with potential bold text
-        else:
-            paragraph = doc.add_paragraph()
-
-            # Split by bold markers
-            parts = re.split(r'(\*\*.*?\*\*)', line)
-            for part in parts:
-                if part.startswith('**') and part.endswith('**'):
-                    run = paragraph.add_run(part[2:-2])
-                    run.bold = True
-                elif part:
-                    paragraph.add_run(part)
-
-    doc.save(output_path)
-    return output_path
+    return save_markup(text, output_path, heading_color="000000")
 
 
 def modify_cv(cv_text, selected_suggestions, output_filename="improved_resume.docx"):
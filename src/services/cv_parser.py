@@ -0,0 +1,205 @@
+"""Parse CV text (from PDF/DOCX extraction or our own markup) into a StructuredCV.
+
+Parsing is rule-based and cached by a hash of the text, so the analyzer,
+modifier and cover letter generator share one parse per uploaded CV.
+"""
+import hashlib
+import os
+import re
+from src.models.cv import Contact, Role, Section, StructuredCV
+from src.utils.cache import TTLCache
+
+_structured_cvs = TTLCache(
+    maxsize=int(os.getenv("STRUCTURED_CV_CACHE_SIZE", "256")),
+    ttl=int(os.getenv("STRUCTURED_CV_CACHE_TTL", "3600"))
+)
+
+SECTION_KINDS = {
+    "summary": "summary", "professional summary": "summary", "profile": "summary",
+    "professional profile": "summary", "about": "summary", "about me": "summary",
+    "objective": "summary", "career objective": "summary", "personal statement": "summary",
+    "experience": "experience", "work experience": "experience", "professional experience": "experience",
+    "employment": "experience", "employment history": "experience", "work history": "experience",
+    "career history": "experience", "relevant experience": "experience",
+    "education": "education", "academic background": "education", "qualifications": "education",
+    "skills": "skills", "technical skills": "skills", "core skills": "skills", "key skills": "skills",
+    "competencies": "skills", "core competencies": "skills", "technologies": "skills",
+    "tech stack": "skills", "tools": "skills",
+    "projects": "other", "certifications": "other", "certificates": "other", "awards": "other",
+    "publications": "other", "volunteering": "other", "languages": "other", "interests": "other",
+    "references": "other", "achievements": "other",
+}
+
+# Lower-cased alias -> canonical skill name
+SKILL_ALIASES = {
+    "js": "JavaScript", "javascript": "JavaScript", "ts": "TypeScript", "typescript": "TypeScript",
+    "postgres": "PostgreSQL", "postgresql": "PostgreSQL", "k8s": "Kubernetes", "kubernetes": "Kubernetes",
+    "aws": "AWS", "gcp": "GCP", "azure": "Azure", "sql": "SQL", "nosql": "NoSQL", "python": "Python",
+    "golang": "Go", "node": "Node.js", "nodejs": "Node.js", "node.js": "Node.js", "react.js": "React",
+    "reactjs": "React", "ml": "Machine Learning", "ci/cd": "CI/CD", "docker": "Docker", "git": "Git",
+}
+
+HEADING_MARKUP = "**HEADING:"
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+_PHONE_RE = re.compile(r"\+?\d[\d\s().-]{7,}\d")
+_LINK_RE = re.compile(r"(?:https?://)?(?:www\.)?(?:linkedin\.com|github\.com|gitlab\.com)/\S+", re.IGNORECASE)
+_BULLET_RE = re.compile(r"^[•\-*▪●◦‣–]\s+")
+_YEAR_RE = re.compile(r"\b(?:19|20)\d{2}\b|\b(?:present|current)\b", re.IGNORECASE)
+# "Lead at Foo Inc. (2 years)", "Intern, Bar (6 months)"
+_DURATION_RE = re.compile(r"\(\s*\d+\+?\s*(?:years?|yrs?|months?|mos?)\b[^)]*\)", re.IGNORECASE)
+_HEADER_SPLIT_RE = re.compile(r"\s*[|•·]\s*")
+_SKILL_SPLIT_RE = re.compile(r"\s*[,;|•·]\s*")
+MAX_SKILL_WORDS = 5
+
+
+def content_hash(text):
+    """Hash of the text ignoring line endings and trailing spaces (form posts turn \n into \r\n)"""
+    normalized = "\n".join(line.rstrip() for line in (text or "").splitlines()).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def _clean(line):
+    return line.replace("**", "").strip()
+
+
+def _heading(line):
+    """(title, kind) if the line is a section heading, else None"""
+    if line.startswith(HEADING_MARKUP):
+        title = _clean(line[len(HEADING_MARKUP):])
+        return title, SECTION_KINDS.get(title.lower().rstrip(":"), "other")
+
+    title = _clean(line).rstrip(":").strip()
+    if not title or len(title.split()) > 4:
+        return None
+    kind = SECTION_KINDS.get(title.lower())
+    if kind:
+        return title, kind
+    if title.isupper() and not _YEAR_RE.search(title) and not _EMAIL_RE.search(title):
+        return title, "other"
+    return None
+
+
+def normalize_skill(skill):
+    skill = skill.strip(" .")
+    return SKILL_ALIASES.get(skill.lower(), skill)
+
+
+def _parse_skills(lines):
+    """Normalize skill list lines ("Tools: docker, k8s" -> "Tools: Docker, Kubernetes").
+
+    Returns (skills, rewritten lines); lines that aren't lists are kept as they are.
+    """
+    skills, rewritten = [], []
+    for line in lines:
+        label, items = line.split(":", 1) if ":" in line else ("", line)
+        parts = [part for part in _SKILL_SPLIT_RE.split(items) if part.strip(" .")]
+        if parts and all(len(part.split()) <= MAX_SKILL_WORDS for part in parts):
+            line_skills = list(dict.fromkeys(normalize_skill(part) for part in parts))
+            skills.extend(line_skills)
+            line = ", ".join(line_skills)
+            if label.strip():
+                line = f"{label.strip()}: {line}"
+        rewritten.append(line)
+    return skills, rewritten
+
+
+def _is_role_line(line):
+    return len(line) <= 120 and (bool(_YEAR_RE.search(line) or _DURATION_RE.search(line)) or " | " in line)
+
+
+def _parse_header(lines):
+    """Contact details from the lines above the first heading; the rest becomes a headline.
+
+    Whatever else shares a line with the email, phone or links (a location,
+    a personal site) is kept in contact.details so nothing is lost.
+    """
+    contact = Contact()
+    links, details, rest = [], [], []
+    for line in lines:
+        found = False
+        remaining = line
+        email = _EMAIL_RE.search(remaining)
+        if email and not contact.email:
+            contact.email, found = email.group(0), True
+            remaining = remaining.replace(contact.email, " ", 1)
+        phone = _PHONE_RE.search(_EMAIL_RE.sub("", remaining))
+        if phone and not contact.phone:
+            contact.phone, found = phone.group(0).strip(), True
+            remaining = remaining.replace(contact.phone, " ", 1)
+        for link in _LINK_RE.findall(remaining):
+            links.append(link)
+            remaining = remaining.replace(link, " ", 1)
+            found = True
+        if found:
+            details.extend(piece for piece in (part.strip(" ,;") for part in _HEADER_SPLIT_RE.split(remaining))
+                           if piece)
+        elif not contact.name and len(line.split()) <= 5:
+            contact.name = line
+        else:
+            rest.append(line)
+    contact.links = tuple(links)
+    contact.details = tuple(details)
+    return contact, rest
+
+
+def parse_cv_text(text):
+    """Parse CV text into a StructuredCV (uncached)"""
+    text = text or ""
+    header, sections = [], []
+    section = None
+
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if not line:
+            continue
+        heading = _heading(line)
+        # Above the first section only known section names count; an all-caps name or
+        # title there (or a markup heading on the very first line) is part of the header
+        if heading and section is None and heading[1] == "other":
+            if not header or not line.startswith(HEADING_MARKUP):
+                heading = None
+                if line.startswith(HEADING_MARKUP):
+                    line = line[len(HEADING_MARKUP):]
+        if heading:
+            section = Section(heading[0], heading[1])
+            sections.append(section)
+            continue
+
+        line = _clean(line)
+        if section is None:
+            header.append(line)
+            continue
+
+        bullet = _BULLET_RE.match(line)
+        content = line[bullet.end():] if bullet else line
+        if section.kind in ("experience", "education", "other") and not bullet and _is_role_line(line):
+            section.roles.append(Role(line))
+        elif section.roles and section.kind != "skills":
+            section.roles[-1].bullets.append(content)
+        else:
+            section.lines.append(content)
+
+    contact, headline = _parse_header(header)
+    if headline:
+        sections.insert(0, Section("Headline", "summary", headline))
+
+    skills = []
+    for section in sections:
+        if section.kind == "skills":
+            section_skills, section.lines = _parse_skills(section.lines)
+            skills.extend(section_skills)
+
+    unique_skills = {}
+    for skill in skills:
+        unique_skills.setdefault(skill.lower(), skill)
+    return StructuredCV(content_hash(text), text, contact, sections, list(unique_skills.values()))
+
+
+def get_structured_cv(text):
+    """The StructuredCV for this text, parsed once and cached by content hash"""
+    key = content_hash(text)
+    cv = _structured_cvs.get(key)
+    if cv is None:
+        cv = parse_cv_text(text)
+        _structured_cvs.set(key, cv)
+    return cv
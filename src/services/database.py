@@ -1,71 +1,249 @@
 import json
 import os
-from supabase import create_client
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from dotenv import load_dotenv
+from src.services.activity_cache import UserActivityCache
+from src.services.job_index import JobIndex, META_COLUMNS
+from src.services.repository import get_repository
+from src.services import skill_analytics
+from src.services.write_buffer import WriteBuffer
+from src.utils.metrics import timed
+from src.utils.pagination import decode_cursor, merge_feed_pages
+from src.utils.search import highlight_snippet
 
 load_dotenv()
 
-url = os.getenv("SUPABASE_URL")
-key = os.getenv("SUPABASE_KEY")
-supabase = create_client(url, key)
+# cv_analyses columns stored as jsonb arrays
+ANALYSIS_LIST_COLUMNS = ("matching_skills", "missing_skills", "suggestions", "cover_letter_points")
+
+
+# Inserts go through a write-behind buffer so they don't block the request
+WRITE_BEHIND = os.getenv("WRITE_BEHIND", "1") == "1"
+
+
+# Per-user read cache for the feed, single analyses and latest-analysis lookups
+# (ACTIVITY_CACHE_TTL=0 turns it off)
+_activity_cache = UserActivityCache(
+    maxsize=int(os.getenv("ACTIVITY_CACHE_USERS", "2048")),
+    ttl=float(os.getenv("ACTIVITY_CACHE_TTL", "120"))
+)
+
+
+def _load_job_rows(user_id):
+    return get_repository().list_user_rows("cv_analyses", user_id, META_COLUMNS)
+
+
+# Similar-job / duplicate-posting index over each user's analyzed job descriptions
+_job_index = JobIndex(
+    _load_job_rows,
+    dims=int(os.getenv("JOB_INDEX_DIMS", "2048")),
+    max_users=int(os.getenv("JOB_INDEX_USERS", "256"))
+)
+# Cosine similarity at which a posting counts as the same job
+JOB_DUPLICATE_THRESHOLD = float(os.getenv("JOB_DUPLICATE_THRESHOLD", "0.9"))
+
+
+@timed("db_write")
+def _insert_rows(table, rows):
+    inserted = get_repository().insert_rows(table, rows)
+    for user_id in {row["user_id"] for row in rows}:
+        _activity_cache.invalidate(user_id, ("feed", "latest"))
+    if table == "cv_analyses":
+        _record_skill_stats(rows)
+        _index_jobs(rows, inserted)
+    return inserted
+
+
+def _index_jobs(rows, inserted):
+    """Add freshly written analyses to the job index.
+
+    Runs after the insert has succeeded, so a failure is only logged (raising
+    would make the write buffer insert the rows again) and the users' indexes
+    are dropped to be reloaded from the database on next use.
+    """
+    try:
+        _job_index.append([{**row, **(written or {})} for row, written in zip(rows, inserted or [])])
+    except Exception as e:
+        print(f"Error indexing job descriptions: {str(e)}")
+        for user_id in {row["user_id"] for row in rows}:
+            _job_index.invalidate(user_id)
+
+
+_write_buffer = WriteBuffer(
+    _insert_rows,
+    spool_dir=os.getenv("WRITE_BEHIND_SPOOL_DIR", "write_spool"),
+    max_batch=int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "50")),
+    flush_interval=float(os.getenv("WRITE_BEHIND_FLUSH_INTERVAL", "1.0"))
+)
+
+
+def _insert_record(table, data):
+    """Insert a row (or queue it when write-behind is on) and return it.
+
+    created_at is set here so queued rows sort correctly and can be matched
+    up with their database copy once written. Queued rows carry a
+    "pending-..." id and pending=True.
+    """
+    data.setdefault("created_at", datetime.now(timezone.utc).isoformat())
+    if WRITE_BEHIND:
+        pending_id = _write_buffer.enqueue(table, data)
+        return {**data, "id": pending_id, "pending": True}
+
+    rows = _insert_rows(table, [data])
+    return rows[0] if rows else data
+
+
+def _parse_created_at(value):
+    """created_at as an aware datetime; PostgREST drops trailing zeros from the fraction (.120000 -> .12)"""
+    text = str(value).replace("Z", "+00:00")
+    match = re.match(r"(.*?\.)(\d+)(.*)$", text)
+    if match:
+        text = f"{match.group(1)}{match.group(2)[:6].ljust(6, '0')}{match.group(3)}"
+    try:
+        moment = datetime.fromisoformat(text)
+    except ValueError:
+        return value
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+def _merge_pending(pending, rows):
+    """Put the user's queued rows in front of rows read from the database.
+
+    `pending` must be read before the query: a row flushed in between then
+    shows up in both lists and is dropped here by its created_at.
+    """
+    written = {_parse_created_at(row.get("created_at")) for row in rows}
+    return [row for row in pending if _parse_created_at(row["created_at"]) not in written] + rows
+
+
+def flush_pending_writes():
+    """Write out everything still queued (call on shutdown)"""
+    _write_buffer.stop()
+
+
+def write_buffer_stats():
+    """Queue depth and flush counters of the write-behind buffer"""
+    return _write_buffer.stats()
+
+
+def activity_cache_stats():
+    """Hit rates of the per-user activity cache"""
+    return _activity_cache.stats()
+
+
+def _as_list(value):
+    """Return a list column value, decoding rows written before the jsonb migration"""
+    if isinstance(value, list):
+        return value
+    if isinstance(value, str):
+        try:
+            decoded = json.loads(value)
+            return decoded if isinstance(decoded, list) else []
+        except json.JSONDecodeError:
+            return []
+    return []
 
 
 def save_analysis(user_id, job_description, analysis_result, original_cv_path=None, improved_cv_path=None):
-    """Save CV analysis to Supabase with file paths"""
+    """Save CV analysis with file paths"""
     data = {
         "user_id": user_id,
         "job_description": job_description,
         "match_score": analysis_result.get("match_score", 0),
-        "matching_skills": json.dumps(analysis_result.get("matching_skills", [])),
-        "missing_skills": json.dumps(analysis_result.get("missing_skills", [])),
-        "suggestions": json.dumps(analysis_result.get("suggestions", [])),
-        "cover_letter_points": json.dumps(analysis_result.get("cover_letter_points", [])),
+        "matching_skills": analysis_result.get("matching_skills", []),
+        "missing_skills": analysis_result.get("missing_skills", []),
+        "suggestions": analysis_result.get("suggestions", []),
+        "cover_letter_points": analysis_result.get("cover_letter_points", []),
         "original_cv_path": original_cv_path,
         "improved_cv_path": improved_cv_path
     }
 
-    response = supabase.table("cv_analyses").insert(data).execute()
-    return response
+    record = _insert_record("cv_analyses", data)
+    return {"success": True, "data": [record]}
 
 
 def get_user_analyses(user_id):
     """Get all analyses for a specific user"""
-    response = supabase.table("cv_analyses").select("*").eq("user_id", user_id).order("created_at", desc=True).execute()
-    return response.data
+    pending = _write_buffer.pending_rows("cv_analyses", user_id=user_id)
+    rows = get_repository().list_user_rows("cv_analyses", user_id)
+    return _merge_pending(pending, rows)
 
 
 def get_analysis_by_id(analysis_id, user_id):
     """Get specific analysis by ID (with user verification)"""
-    response = supabase.table("cv_analyses").select("*").eq("id", analysis_id).eq("user_id", user_id).execute()
-    if response.data and len(response.data) > 0:
-        analysis = response.data[0]
-        # Parse JSON strings back to lists
-        analysis["matching_skills"] = json.loads(analysis.get("matching_skills", "[]"))
-        analysis["missing_skills"] = json.loads(analysis.get("missing_skills", "[]"))
-        analysis["suggestions"] = json.loads(analysis.get("suggestions", "[]"))
-        analysis["cover_letter_points"] = json.loads(analysis.get("cover_letter_points", "[]"))
-        return analysis
+    analysis, token = _activity_cache.lookup("analysis", user_id, analysis_id)
+    if analysis is not None:
+        return dict(analysis)
+
+    analysis = get_repository().get_user_row("cv_analyses", analysis_id, user_id)
+    if analysis:
+        for column in ANALYSIS_LIST_COLUMNS:
+            analysis[column] = _as_list(analysis.get(column))
+        _activity_cache.store("analysis", user_id, analysis_id, analysis, token)
+        return dict(analysis)
     return None
 
 
+def get_analyses_with_skill(user_id, skill, column="missing_skills"):
+    """Get the user's analyses whose skill list contains `skill`, filtered in the database"""
+    if column not in ("missing_skills", "matching_skills"):
+        raise ValueError("column must be missing_skills or matching_skills")
+
+    try:
+        return get_repository().rows_with_skill(user_id, skill, column, (
+            "id", "created_at", "match_score", "job_description_preview", "matching_skills", "missing_skills"
+        ))
+    except Exception as e:
+        print(f"Error getting analyses with skill: {str(e)}")
+        return []
+
+
 def get_all_analyses():
     """Get all saved analyses (for testing)"""
-    response = supabase.table("cv_analyses").select("*").execute()
-    return response.data
+    return get_repository().list_all_rows("cv_analyses")
 
 
-def update_analysis_improved_cv(analysis_id, improved_cv_path):
-    """Update analysis with improved CV path"""
+def update_analysis_improved_cv(analysis_id, improved_cv_path, user_id=None):
+    """Update analysis with improved CV path (pass user_id to update that user's cache in place)"""
+    if str(analysis_id).startswith("pending-"):
+        if _write_buffer.update_pending(analysis_id, {"improved_cv_path": improved_cv_path}):
+            return {"success": True}
+        return {"success": False, "error": "Analysis was written meanwhile; look it up again"}
+
     try:
-        supabase.table("cv_analyses").update({
-            "improved_cv_path": improved_cv_path
-        }).eq("id", analysis_id).execute()
+        changes = {"improved_cv_path": improved_cv_path}
+        get_repository().update_row("cv_analyses", analysis_id, changes)
+        if user_id is not None:
+            _activity_cache.update_analysis(user_id, analysis_id, changes)
+        else:
+            _activity_cache.clear()
         return {"success": True}
     except Exception as e:
         print(f"Error updating analysis: {str(e)}")
         return {"success": False, "error": str(e)}
 
 
+def update_latest_analysis_improved_cv(user_id, improved_cv_path):
+    """Attach an improved CV to the user's most recent analysis"""
+    pending = _write_buffer.pending_rows("cv_analyses", user_id=user_id)
+    if pending and _write_buffer.update_pending(pending[0]["id"], {"improved_cv_path": improved_cv_path}):
+        return {"success": True}
+
+    try:
+        analysis_id, token = _activity_cache.lookup("latest", user_id)
+        if analysis_id is None:
+            analysis_id = get_repository().latest_row_id("cv_analyses", user_id)
+            if analysis_id is None:
+                return {"success": False, "error": "No analysis found"}
+            _activity_cache.store("latest", user_id, None, analysis_id, token)
+        return update_analysis_improved_cv(analysis_id, improved_cv_path, user_id)
+    except Exception as e:
+        print(f"Error updating latest analysis: {str(e)}")
+        return {"success": False, "error": str(e)}
+
+
 # ==================== NEW FUNCTIONS ====================
 
 def save_generated_cv(user_id, name, email, cv_file_path, has_experience=False, has_education=False, job_title=None,
@@ -82,8 +260,8 @@ def save_generated_cv(user_id, name, email, cv_file_path, has_experience=False,
             "job_title": job_title,
             "company_name": company_name
         }
-        response = supabase.table("generated_cvs").insert(data).execute()
-        return {"success": True, "data": response.data}
+        record = _insert_record("generated_cvs", data)
+        return {"success": True, "data": [record]}
     except Exception as e:
         print(f"Error saving generated CV: {str(e)}")
         return {"success": False, "error": str(e)}
@@ -99,19 +277,47 @@ def save_cover_letter(user_id, name, job_title, company_name, cover_letter_file_
             "company_name": company_name,
             "cover_letter_file_path": cover_letter_file_path
         }
-        response = supabase.table("cover_letters").insert(data).execute()
-        return {"success": True, "data": response.data}
+        record = _insert_record("cover_letters", data)
+        return {"success": True, "data": [record]}
     except Exception as e:
         print(f"Error saving cover letter: {str(e)}")
         return {"success": False, "error": str(e)}
 
 
+def save_cover_letters(user_id, name, letters):
+    """Save several cover letter records at once.
+
+    letters: [{"job_title", "company_name", "cover_letter_file_path"}]
+    """
+    try:
+        rows = [{
+            "user_id": user_id,
+            "name": name,
+            "job_title": letter.get("job_title"),
+            "company_name": letter.get("company_name"),
+            "cover_letter_file_path": letter["cover_letter_file_path"]
+        } for letter in letters]
+        if not rows:
+            return {"success": True, "data": []}
+
+        if WRITE_BEHIND:
+            records = [_insert_record("cover_letters", row) for row in rows]
+        else:
+            for row in rows:
+                row["created_at"] = datetime.now(timezone.utc).isoformat()
+            records = _insert_rows("cover_letters", rows)
+        return {"success": True, "data": records}
+    except Exception as e:
+        print(f"Error saving cover letters: {str(e)}")
+        return {"success": False, "error": str(e)}
+
+
 def get_user_generated_cvs(user_id):
     """Get all generated CVs for a user"""
     try:
-        response = supabase.table("generated_cvs").select("*").eq("user_id", user_id).order("created_at",
-                                                                                            desc=True).execute()
-        return response.data
+        pending = _write_buffer.pending_rows("generated_cvs", user_id=user_id)
+        rows = get_repository().list_user_rows("generated_cvs", user_id)
+        return _merge_pending(pending, rows)
     except Exception as e:
         print(f"Error getting generated CVs: {str(e)}")
         return []
@@ -120,9 +326,9 @@ def get_user_generated_cvs(user_id):
 def get_user_cover_letters(user_id):
     """Get all cover letters for a user"""
     try:
-        response = supabase.table("cover_letters").select("*").eq("user_id", user_id).order("created_at",
-                                                                                            desc=True).execute()
-        return response.data
+        pending = _write_buffer.pending_rows("cover_letters", user_id=user_id)
+        rows = get_repository().list_user_rows("cover_letters", user_id)
+        return _merge_pending(pending, rows)
     except Exception as e:
         print(f"Error getting cover letters: {str(e)}")
         return []
@@ -146,4 +352,219 @@ def get_user_all_activities(user_id):
     all_activities = analyses + cvs + letters
     all_activities.sort(key=lambda x: x['created_at'], reverse=True)
 
-    return all_activities
\ No newline at end of file
+    return all_activities
+
+
+# ==================== ACTIVITY FEED ====================
+
+# Feed sources: activity type -> (table, columns). Ranks break created_at ties.
+# Large text columns (full job descriptions, skill lists) are left out.
+FEED_SOURCES = [
+    ("analysis", "cv_analyses",
+     ("id", "created_at", "match_score", "job_description_preview", "original_cv_path", "improved_cv_path")),
+    ("generated_cv", "generated_cvs",
+     ("id", "created_at", "name", "job_title", "company_name", "has_experience", "has_education", "cv_file_path")),
+    ("cover_letter", "cover_letters",
+     ("id", "created_at", "name", "job_title", "company_name", "cover_letter_file_path")),
+]
+
+_feed_executor = ThreadPoolExecutor(max_workers=len(FEED_SOURCES), thread_name_prefix="feed")
+
+
+def _fetch_feed_source(source_rank, user_id, cursor, limit):
+    activity_type, table, columns = FEED_SOURCES[source_rank]
+    rows = get_repository().feed_page(table, columns, user_id, cursor, source_rank, limit)
+
+    for item in rows:
+        item['activity_type'] = activity_type
+        item['source_rank'] = source_rank
+    return rows
+
+
+def get_user_activity_feed(user_id, before=None, limit=20):
+    """Get one page of the user's activities, newest first.
+
+    The three sources are queried concurrently (each with keyset pagination
+    and only the columns the dashboard needs) and k-way merged.
+    Pass the returned next_cursor as `before` to get the following page.
+    """
+    cursor = decode_cursor(before)
+
+    # The first page also shows rows still waiting in the write-behind buffer
+    pending_pages = [[] for _ in FEED_SOURCES]
+    if cursor is None:
+        for source_rank, (activity_type, table, _) in enumerate(FEED_SOURCES):
+            for row in _write_buffer.pending_rows(table, user_id=user_id):
+                row['activity_type'] = activity_type
+                row['source_rank'] = source_rank
+                row['job_description_preview'] = (row.get('job_description') or '')[:120]
+                pending_pages[source_rank].append(row)
+
+    pages, token = _activity_cache.lookup("feed", user_id, (cursor, limit))
+    if pages is None:
+        try:
+            futures = [
+                _feed_executor.submit(_fetch_feed_source, source_rank, user_id, cursor, limit + 1)
+                for source_rank in range(len(FEED_SOURCES))
+            ]
+            pages = [future.result() for future in futures]
+        except Exception as e:
+            print(f"Error getting activity feed: {str(e)}")
+            return {"items": [], "next_cursor": None}
+        _activity_cache.store("feed", user_id, (cursor, limit), pages, token)
+
+    # Pending rows are the newest, so they go on top of the first page
+    pages = [_merge_pending(pending, page) for pending, page in zip(pending_pages, pages)]
+    pending_count = sum(len(pending) for pending in pending_pages)
+    items, next_cursor = merge_feed_pages(pages, limit + pending_count)
+    return {"items": items, "next_cursor": next_cursor}
+
+
+# ==================== STORAGE OBJECTS ====================
+
+def find_stored_object(user_id, content_hash):
+    """Get the storage path of a file this user already uploaded with the same content"""
+    try:
+        return get_repository().find_stored_object(user_id, content_hash)
+    except Exception as e:
+        print(f"Error finding stored object: {str(e)}")
+        return None
+
+
+def acquire_stored_object(user_id, content_hash, storage_path, size_bytes):
+    """Take a reference on a stored file, registering it if new. Returns the canonical path"""
+    return get_repository().acquire_stored_object(user_id, content_hash, storage_path, size_bytes)
+
+
+def release_stored_object(user_id, storage_path):
+    """Drop a reference on a stored file. Returns how many references remain"""
+    return get_repository().release_stored_object(user_id, storage_path)
+
+
+# ==================== SKILL ANALYTICS ====================
+
+def _record_skill_stats(analyses):
+    """Count freshly written analyses into their users' skill stats.
+
+    Runs after the insert has succeeded. A failure here is only logged (the
+    analyses are saved either way); rebuild_skill_analytics() repairs drift.
+    """
+    by_user = {}
+    for analysis in analyses:
+        by_user.setdefault(analysis["user_id"], []).append(analysis)
+
+    for user_id, user_analyses in by_user.items():
+        try:
+            updated = get_repository().update_skill_stats(
+                user_id, lambda stats: skill_analytics.apply_analyses(stats, user_analyses))
+            if not updated:
+                print(f"Skill stats for {user_id} kept changing; skipped {len(user_analyses)} analyses")
+        except Exception as e:
+            print(f"Error updating skill stats: {str(e)}")
+
+
+def get_skill_analytics(user_id, top_n=10):
+    """Get the user's skill-gap summary from the aggregate store (no history scan)"""
+    try:
+        stats, _ = get_repository().get_skill_stats(user_id)
+    except Exception as e:
+        print(f"Error getting skill analytics: {str(e)}")
+        stats = None
+    return skill_analytics.summarize(stats, top_n)
+
+
+def count_skill_stats(user_id=None, batch_size=1000):
+    """{user_id: stats} recounted from every analysis (one user's, or everyone's).
+
+    Analyses are read a page at a time by id and folded into each user's
+    stats as they come, so only the stats are held in memory.
+    """
+    stats_by_user = {}
+    for batch in get_repository().iter_rows(
+            "cv_analyses", ("user_id", "created_at", "match_score", "missing_skills", "matching_skills"),
+            user_id=user_id, batch_size=batch_size):
+        by_user = {}
+        for analysis in batch:
+            analysis["missing_skills"] = _as_list(analysis.get("missing_skills"))
+            analysis["matching_skills"] = _as_list(analysis.get("matching_skills"))
+            by_user.setdefault(analysis["user_id"], []).append(analysis)
+        for batch_user_id, analyses in by_user.items():
+            stats_by_user[batch_user_id] = skill_analytics.apply_analyses(stats_by_user.get(batch_user_id), analyses)
+    return stats_by_user
+
+
+def rebuild_skill_analytics(user_id, stats=None):
+    """Replace the user's stats with a recount of their full history (or with `stats` from count_skill_stats)"""
+    if stats is None:
+        stats = count_skill_stats(user_id).get(user_id) or skill_analytics.empty_stats()
+    return get_repository().update_skill_stats(user_id, lambda _: stats)
+
+
+# ==================== SEARCH ====================
+
+def search_analyses(user_id, query, page=1, per_page=20):
+    """Full-text search over the user's analyses (job description, skills, suggestions).
+
+    Results are ranked, carry an HTML-safe `snippet` with matches in <mark>,
+    and come one page at a time. Rows still in the write-behind buffer are
+    searchable once flushed (within WRITE_BEHIND_FLUSH_INTERVAL).
+    """
+    query = (query or "").strip()
+    page = max(1, page)
+    if not query:
+        return {"success": True, "results": [], "page": page, "has_more": False}
+
+    try:
+        rows = get_repository().search_analyses(user_id, query, per_page + 1, (page - 1) * per_page)
+    except Exception as e:
+        print(f"Error searching analyses: {str(e)}")
+        return {"success": False, "error": str(e), "results": [], "page": page, "has_more": False}
+
+    for row in rows:
+        row["snippet"] = highlight_snippet(row.get("snippet"))
+    return {"success": True, "results": rows[:per_page], "page": page, "has_more": len(rows) > per_page}
+
+
+# ==================== SIMILAR JOBS ====================
+
+def _analysis_from_index(similarity, row):
+    analysis = dict(row)
+    for column in ANALYSIS_LIST_COLUMNS:
+        analysis[column] = _as_list(analysis.get(column))
+    analysis["similarity"] = round(similarity, 3)
+    return analysis
+
+
+def find_similar_analyses(user_id, job_descriptions, k=5, min_similarity=0.5):
+    """For each job description, the user's past analyses of similar postings, most similar first.
+
+    Analyses appear here once written to the database (within
+    WRITE_BEHIND_FLUSH_INTERVAL of saving).
+    """
+    try:
+        matches = _job_index.search(user_id, job_descriptions, k, min_similarity)
+    except Exception as e:
+        print(f"Error searching similar jobs: {str(e)}")
+        return [[] for _ in job_descriptions]
+    return [[_analysis_from_index(score, row) for score, row in found] for found in matches]
+
+
+def find_duplicate_analysis(user_id, job_description, original_cv_path, similar=None):
+    """A past analysis of the same CV file against a near-identical posting, or None.
+
+    CV storage paths are content-addressed, so an equal path means the same CV.
+    Pass `similar` (this posting's find_similar_analyses() result, k >= 5) to
+    filter it instead of searching the index again.
+    """
+    if not original_cv_path:
+        return None
+    if similar is None:
+        similar = find_similar_analyses(user_id, [job_description], k=5, min_similarity=JOB_DUPLICATE_THRESHOLD)[0]
+    for analysis in similar[:5]:
+        if analysis["similarity"] >= JOB_DUPLICATE_THRESHOLD and analysis.get("original_cv_path") == original_cv_path:
+            return analysis
+    return None
+
+
+def job_index_stats():
+    return _job_index.stats()
@@ -0,0 +1,249 @@
+"""One DOCX renderer for the CV markup the AI prompts ask for:
+
+    **HEADING: Section title**     -> Heading 1 paragraph
+    • bullet text                  -> List Bullet paragraph
+    anything else                  -> normal paragraph
+    **bold** inside any line       -> bold run
+
+The blank template is loaded once. Every render writes only a new
+word/document.xml and copies the template's other (already compressed) zip
+entries byte for byte, so the ~800 KB of styles are never re-parsed or
+re-compressed. The result is built in memory.
+
+DocumentFrame does the same for any python-docx document: the fixed parts
+(letterhead, margins) are built once and only the body is swapped per render.
+"""
+import copy
+import io
+import re
+import struct
+import threading
+import zipfile
+import zlib
+from xml.sax.saxutils import escape
+
+HEADING_PREFIX = "**HEADING:"
+BULLET_PREFIX = "• "
+HEADING_SIZE_PT = 16
+
+_BOLD_RE = re.compile(r"\*\*(.*?)\*\*")
+# Characters XML 1.0 can't hold; the model occasionally emits them
+_INVALID_XML_RE = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+DOCUMENT_PART = "word/document.xml"
+
+
+# ==================== TOKENIZER ====================
+
+def tokenize_line(line):
+    """Split one line into [(text, bold)] runs"""
+    runs = []
+    position = 0
+    for match in _BOLD_RE.finditer(line):
+        if match.start() > position:
+            runs.append((line[position:match.start()], False))
+        if match.group(1):
+            runs.append((match.group(1), True))
+        position = match.end()
+    if position < len(line):
+        runs.append((line[position:], False))
+    return runs
+
+
+def tokenize(text):
+    """Parse markup into [(kind, runs)] blocks; kind is "heading", "bullet" or "paragraph" """
+    blocks = []
+    for line in _INVALID_XML_RE.sub("", text or "").split("\n"):
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith(HEADING_PREFIX):
+            heading = line.replace(HEADING_PREFIX, "").replace("**", "").strip()
+            blocks.append(("heading", [(heading, True)] if heading else []))
+        elif line.startswith(BULLET_PREFIX):
+            blocks.append(("bullet", tokenize_line(line[len(BULLET_PREFIX):])))
+        else:
+            blocks.append(("paragraph", tokenize_line(line)))
+    return blocks
+
+
+# ==================== TEMPLATE ====================
+
+class _Template:
+    """The blank python-docx template, split up for fast rendering"""
+
+    def __init__(self):
+        from docx import Document
+
+        self.document = Document()
+        self.heading_style = self.document.styles["Heading 1"].style_id
+        self.bullet_style = self.document.styles["List Bullet"].style_id
+
+        self.entries, document_xml = _split_document(self.document)
+        split_at = document_xml.rindex("<w:sectPr")
+        self.document_head = document_xml[:split_at].encode("utf-8")
+        self.document_tail = document_xml[split_at:].encode("utf-8")
+
+
+_template = None
+_template_lock = threading.Lock()
+
+
+def _get_template():
+    global _template
+    if _template is None:
+        with _template_lock:
+            if _template is None:
+                _template = _Template()
+    return _template
+
+
+def new_document():
+    """A fresh python-docx Document copied from the in-memory blank template"""
+    return copy.deepcopy(_get_template().document)
+
+
+def _split_document(document):
+    """Save a python-docx document; return its zip entries and document.xml text"""
+    buffer = io.BytesIO()
+    document.save(buffer)
+    data = buffer.getvalue()
+
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        document_xml = archive.read(DOCUMENT_PART).decode("utf-8")
+        # (name, info, raw compressed bytes) in archive order
+        entries = [(info.filename, info, _raw_entry(data, info)) for info in archive.infolist()]
+    return entries, document_xml
+
+
+class DocumentFrame:
+    """A saved python-docx document with one paragraph left as a slot.
+
+    Build the document once with a paragraph whose text is `marker`; each
+    render() replaces that paragraph with the given paragraph XML.
+    """
+
+    def __init__(self, document, marker):
+        self.entries, document_xml = _split_document(document)
+        at = document_xml.index(escape(marker))
+        start = max(document_xml.rfind("<w:p>", 0, at), document_xml.rfind("<w:p ", 0, at))
+        end = document_xml.index("</w:p>", at) + len("</w:p>")
+        self.document_head = document_xml[:start].encode("utf-8")
+        self.document_tail = document_xml[end:].encode("utf-8")
+
+    def render(self, paragraphs):
+        """DOCX bytes with the slot replaced by `paragraphs` (a list of paragraph XML strings)"""
+        document_xml = self.document_head + "".join(paragraphs).encode("utf-8") + self.document_tail
+        return _build_archive(self.entries, {DOCUMENT_PART: document_xml})
+
+
+# ==================== RENDERING ====================
+
+def _run_xml(text, bold, size_pt=None, color=None):
+    properties = ""
+    if bold:
+        properties += "<w:b/>"
+    if color:
+        properties += f'<w:color w:val="{color}"/>'
+    if size_pt:
+        properties += f'<w:sz w:val="{size_pt * 2}"/>'
+    if properties:
+        properties = f"<w:rPr>{properties}</w:rPr>"
+    return f'<w:r>{properties}<w:t xml:space="preserve">{escape(text)}</w:t></w:r>'
+
+
+def _paragraph_xml(style, runs):
+    properties = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ""
+    return f"<w:p>{properties}{''.join(runs)}</w:p>"
+
+
+def text_paragraph_xml(text, space_after_pt=None, align=None):
+    """A plain paragraph for DocumentFrame.render; newlines become line breaks"""
+    properties = ""
+    if space_after_pt:
+        properties += f'<w:spacing w:after="{space_after_pt * 20}"/>'
+    if align:
+        properties += f'<w:jc w:val="{align}"/>'
+    if properties:
+        properties = f"<w:pPr>{properties}</w:pPr>"
+    lines = _INVALID_XML_RE.sub("", text).split("\n")
+    run = "<w:br/>".join(f'<w:t xml:space="preserve">{escape(line)}</w:t>' for line in lines)
+    return f"<w:p>{properties}<w:r>{run}</w:r></w:p>"
+
+
+def _body_xml(blocks, template, heading_color=None):
+    parts = []
+    for kind, runs in blocks:
+        if kind == "heading":
+            xml_runs = [_run_xml(text, True, HEADING_SIZE_PT, heading_color) for text, _ in runs]
+            parts.append(_paragraph_xml(template.heading_style, xml_runs))
+        else:
+            xml_runs = [_run_xml(text, bold) for text, bold in runs]
+            style = template.bullet_style if kind == "bullet" else None
+            parts.append(_paragraph_xml(style, xml_runs))
+    return "".join(parts).encode("utf-8")
+
+
+def render_markup(text, heading_color=None):
+    """Render CV markup to DOCX bytes. heading_color is an RGB hex string like "000000" """
+    template = _get_template()
+    document_xml = template.document_head + _body_xml(tokenize(text), template, heading_color) + template.document_tail
+    return _build_archive(template.entries, {DOCUMENT_PART: document_xml})
+
+
+def save_markup(text, output_path, heading_color=None):
+    """Render CV markup straight to a .docx file and return its path"""
+    data = render_markup(text, heading_color)
+    with open(output_path, "wb") as f:
+        f.write(data)
+    return output_path
+
+
+# ==================== ZIP ASSEMBLY ====================
+
+_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+_CENTRAL_HEADER = struct.Struct("<4s4B4HL2L5H2L")
+_END_OF_DIRECTORY = struct.Struct("<4s4H2LH")
+_DOS_DATE = (1 << 5) | 1  # 1980-01-01, so identical input gives identical bytes
+
+
+def _raw_entry(data, info):
+    """The compressed bytes of one entry, as stored in the archive"""
+    header = _LOCAL_HEADER.unpack_from(data, info.header_offset)
+    start = info.header_offset + _LOCAL_HEADER.size + header[10] + header[11]
+    return data[start:start + info.compress_size]
+
+
+def _build_archive(entries, replacements):
+    """Write a zip from template entries, deflating only the replaced parts"""
+    output = io.BytesIO()
+    directory = []
+
+    for name, info, raw in entries:
+        if name in replacements:
+            content = replacements[name]
+            compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+            raw = compressor.compress(content) + compressor.flush()
+            crc, size, compress_type = zlib.crc32(content), len(content), zipfile.ZIP_DEFLATED
+        else:
+            crc, size, compress_type = info.CRC, info.file_size, info.compress_type
+
+        encoded_name = name.encode("utf-8")
+        offset = output.tell()
+        output.write(_LOCAL_HEADER.pack(
+            b"PK\x03\x04", 20, 0, 0, compress_type, 0, _DOS_DATE, crc, len(raw), size, len(encoded_name), 0
+        ))
+        output.write(encoded_name)
+        output.write(raw)
+        directory.append(_CENTRAL_HEADER.pack(
+            b"PK\x01\x02", 20, 0, 20, 0, 0, compress_type, 0, _DOS_DATE, crc, len(raw), size,
+            len(encoded_name), 0, 0, 0, 0, 0, offset
+        ) + encoded_name)
+
+    directory_offset = output.tell()
+    for record in directory:
+        output.write(record)
+    output.write(_END_OF_DIRECTORY.pack(
+        b"PK\x05\x06", 0, 0, len(directory), len(directory), output.tell() - directory_offset, directory_offset, 0
+    ))
+    return output.getvalue()
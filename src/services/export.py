@@ -0,0 +1,167 @@
+"""Zip export of everything a user has: stored files plus their analysis history.
+
+The archive is produced as a stream of byte chunks. Stored objects are
+fetched by a small thread pool with at most EXPORT_CONCURRENCY downloads in
+flight, and each one is written to the zip as soon as it arrives, so memory
+holds a few objects at a time and nothing is written to disk.
+"""
+import csv
+import io
+import json
+import os
+import posixpath
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+from src.services.database import get_user_analyses, get_user_generated_cvs, get_user_cover_letters
+from src.services.storage_backends import get_storage_backend
+
+EXPORT_CONCURRENCY = int(os.getenv("EXPORT_CONCURRENCY", "4"))
+# Buffered zip output is handed to the client once it reaches this size
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+ANALYSIS_CSV_COLUMNS = (
+    "id", "created_at", "match_score", "job_description", "matching_skills", "missing_skills",
+    "suggestions", "cover_letter_points", "original_cv_path", "improved_cv_path"
+)
+
+
+class _ChunkSink:
+    """Write-only, unseekable file for ZipFile; the written bytes are collected with take()"""
+
+    def __init__(self):
+        self._chunks = []
+        self.size = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        self.size = 0
+        return data
+
+
+def _zip_time(created_at):
+    """ZipInfo date_time from an ISO timestamp (zip dates start in 1980)"""
+    try:
+        moment = datetime.fromisoformat(str(created_at).replace("Z", "+00:00"))
+        return max(moment.timetuple()[:6], (1980, 1, 1, 0, 0, 0))
+    except ValueError:
+        return (1980, 1, 1, 0, 0, 0)
+
+
+def _zip_info(name, created_at=None):
+    info = zipfile.ZipInfo(name, date_time=_zip_time(created_at))
+    info.compress_type = zipfile.ZIP_DEFLATED
+    info.external_attr = 0o644 << 16
+    return info
+
+
+def export_files(user_id, analyses):
+    """[(archive name, storage path, created_at)] for the user's stored files, each path once"""
+    sources = [
+        ("cvs", get_user_generated_cvs(user_id), ("cv_file_path",)),
+        ("cover_letters", get_user_cover_letters(user_id), ("cover_letter_file_path",)),
+        ("analyses/original", analyses, ("original_cv_path",)),
+        ("analyses/improved", analyses, ("improved_cv_path",)),
+    ]
+
+    files = []
+    seen_paths = set()
+    used_names = set()
+    for folder, rows, columns in sources:
+        for row in rows:
+            for column in columns:
+                storage_path = row.get(column)
+                # Only the user's own objects; the same content-addressed path may appear in several rows
+                if not storage_path or not storage_path.startswith(f"{user_id}/") or storage_path in seen_paths:
+                    continue
+                seen_paths.add(storage_path)
+
+                stem, extension = posixpath.splitext(posixpath.basename(storage_path))
+                name = f"{folder}/{stem}{extension}"
+                counter = 1
+                while name in used_names:
+                    counter += 1
+                    name = f"{folder}/{stem}-{counter}{extension}"
+                used_names.add(name)
+                files.append((name, storage_path, row.get("created_at")))
+    return files
+
+
+def _csv_value(value):
+    if isinstance(value, list):
+        return "; ".join(str(item) for item in value)
+    if isinstance(value, dict):
+        return json.dumps(value)
+    return "" if value is None else value
+
+
+def iter_user_export(user_id, access_token=None):
+    """Yield the user's export zip in chunks"""
+    backend = get_storage_backend(access_token)
+    analyses = get_user_analyses(user_id)
+    files = export_files(user_id, analyses)
+
+    sink = _ChunkSink()
+    archive = zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED)
+    failed = []
+
+    with ThreadPoolExecutor(max_workers=max(1, EXPORT_CONCURRENCY), thread_name_prefix="export") as executor:
+        queued = iter(files)
+        in_flight = {}
+
+        def fill_window():
+            for name, storage_path, created_at in queued:
+                in_flight[executor.submit(backend.download, storage_path)] = (name, storage_path, created_at)
+                if len(in_flight) >= EXPORT_CONCURRENCY:
+                    return
+
+        # Downloads start first and run while the history is written
+        fill_window()
+
+        with archive.open(_zip_info("analyses.ndjson"), "w") as entry:
+            for row in analyses:
+                entry.write(json.dumps(row, default=str).encode("utf-8") + b"\n")
+                if sink.size >= EXPORT_CHUNK_SIZE:
+                    yield sink.take()
+
+        with archive.open(_zip_info("analyses.csv"), "w") as entry:
+            text = io.TextIOWrapper(entry, encoding="utf-8", newline="")
+            writer = csv.writer(text)
+            writer.writerow(ANALYSIS_CSV_COLUMNS)
+            for row in analyses:
+                writer.writerow([_csv_value(row.get(column)) for column in ANALYSIS_CSV_COLUMNS])
+                if sink.size >= EXPORT_CHUNK_SIZE:
+                    text.flush()
+                    yield sink.take()
+            text.flush()
+            text.detach()
+        yield sink.take()
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, storage_path, created_at = in_flight.pop(future)
+                try:
+                    data = future.result()
+                except Exception as e:
+                    print(f"Export download error for {storage_path}: {str(e)}")
+                    failed.append(storage_path)
+                    continue
+                archive.writestr(_zip_info(name, created_at), data)
+                del data
+            yield sink.take()
+            fill_window()
+
+    if failed:
+        archive.writestr(_zip_info("missing_files.txt"), "\n".join(failed) + "\n")
+    archive.close()
+    yield sink.take()
@@ -1,9 +1,10 @@
-from docx import Document
-import PyPDF2
+from src.utils.metrics import timed
 
 
 def parse_docx(file_path):
     """Extract text from DOCX file"""
+    from docx import Document
+
     doc = Document(file_path)
     full_text = []
     for para in doc.paragraphs:
@@ -13,6 +14,8 @@ def parse_docx(file_path):
 
 def parse_pdf(file_path):
     """Extract text from PDF file"""
+    import PyPDF2
+
     with open(file_path, 'rb') as file:
         reader = PyPDF2.PdfReader(file)
         text = ""
@@ -21,6 +24,7 @@ def parse_pdf(file_path):
     return text
 
 
+@timed("parse")
 def parse_file(file_path):
     """Detect file type and parse accordingly"""
     if file_path.endswith('.pdf'):
@@ -0,0 +1,165 @@
+"""In-process similarity index over each user's analyzed job descriptions.
+
+Job descriptions become hashed word uni/bi-gram vectors (signed feature
+hashing, sublinear term frequency, L2-normalized) in a NumPy float32 matrix
+per user, so cosine similarity is a single matrix product. There is no
+model or external service. Each user's matrix is loaded from the database on
+first use and appended to as new analyses are written; the least recently
+used users are dropped when more than max_users are loaded.
+"""
+import math
+import re
+import threading
+import zlib
+from collections import Counter, OrderedDict
+
+_TOKEN_RE = re.compile(r"[a-z0-9+#]+")
+
+# Row metadata kept alongside each vector (enough to reuse an analysis without a query)
+META_COLUMNS = (
+    "id", "created_at", "job_description", "match_score", "matching_skills", "missing_skills",
+    "suggestions", "cover_letter_points", "original_cv_path"
+)
+
+
+def features(text):
+    """Word unigrams and bigrams of the lower-cased text"""
+    tokens = _TOKEN_RE.findall((text or "").lower())
+    return tokens + [f"{first} {second}" for first, second in zip(tokens, tokens[1:])]
+
+
+def vectorize(texts, dims):
+    """(len(texts), dims) float32 matrix of unit-length hashed feature vectors"""
+    import numpy as np
+
+    matrix = np.zeros((len(texts), dims), dtype=np.float32)
+    for row, text in enumerate(texts):
+        counts = Counter(features(text))
+        if not counts:
+            continue
+        hashes = np.fromiter((zlib.crc32(gram.encode("utf-8")) for gram in counts), dtype=np.uint32, count=len(counts))
+        weights = np.fromiter((1.0 + math.log(count) for count in counts.values()), dtype=np.float32, count=len(counts))
+        # The top hash bit picks the sign so collisions tend to cancel out
+        weights[hashes >> 31 == 1] *= -1
+        np.add.at(matrix[row], hashes % dims, weights)
+
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix /= np.maximum(norms, 1e-12)
+    return matrix
+
+
+class _UserIndex:
+    __slots__ = ("matrix", "size", "meta", "ids")
+
+    def __init__(self, dims, capacity=16):
+        import numpy as np
+
+        self.matrix = np.zeros((capacity, dims), dtype=np.float32)
+        self.size = 0
+        self.meta = []
+        self.ids = set()
+
+    def append(self, vectors, rows):
+        import numpy as np
+
+        needed = self.size + len(rows)
+        if needed > self.matrix.shape[0]:
+            capacity = max(needed, self.matrix.shape[0] * 2)
+            grown = np.zeros((capacity, self.matrix.shape[1]), dtype=np.float32)
+            grown[:self.size] = self.matrix[:self.size]
+            self.matrix = grown
+        self.matrix[self.size:needed] = vectors
+        self.size = needed
+        self.meta.extend(rows)
+        self.ids.update(row.get("id") for row in rows)
+
+
+class JobIndex:
+    """Per-user cosine top-k search over job descriptions.
+
+    load_rows(user_id) returns the user's stored analyses (with META_COLUMNS)
+    and is called the first time a user is searched.
+    """
+
+    def __init__(self, load_rows, dims=2048, max_users=256):
+        self.load_rows = load_rows
+        self.dims = dims
+        self.max_users = max_users
+        self._users = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, user_id):
+        with self._lock:
+            index = self._users.get(user_id)
+            if index is not None:
+                self._users.move_to_end(user_id)
+                return index
+
+        rows = [{column: row.get(column) for column in META_COLUMNS} for row in self.load_rows(user_id)]
+        index = _UserIndex(self.dims, capacity=max(16, len(rows)))
+        if rows:
+            index.append(vectorize([row["job_description"] for row in rows], self.dims), rows)
+
+        with self._lock:
+            # Another request may have loaded it meanwhile; keep that one
+            index = self._users.setdefault(user_id, index)
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+            return index
+
+    def append(self, rows):
+        """Add newly written analyses to the indexes of users that are loaded"""
+        by_user = {}
+        for row in rows:
+            by_user.setdefault(row.get("user_id"), []).append(row)
+
+        for user_id, user_rows in by_user.items():
+            with self._lock:
+                index = self._users.get(user_id)
+            if index is None:
+                continue  # loaded from the database, rows included, on first search
+            user_rows = [
+                {column: row.get(column) for column in META_COLUMNS}
+                for row in user_rows if row.get("id") not in index.ids
+            ]
+            if not user_rows:
+                continue
+            vectors = vectorize([row["job_description"] for row in user_rows], self.dims)
+            with self._lock:
+                index.append(vectors, user_rows)
+
+    def search(self, user_id, texts, k=5, min_score=0.0):
+        """For each text, up to k (similarity, row) pairs from the user's index, best first"""
+        import numpy as np
+
+        index = self._get(user_id)
+        with self._lock:
+            matrix, meta = index.matrix[:index.size], list(index.meta)
+        if not len(meta) or not texts:
+            return [[] for _ in texts]
+
+        scores = vectorize(texts, self.dims) @ matrix.T
+        k = min(k, len(meta))
+        results = []
+        for row_scores in scores:
+            top = np.argpartition(-row_scores, k - 1)[:k] if k < len(meta) else np.arange(len(meta))
+            top = top[np.argsort(-row_scores[top], kind="stable")]
+            results.append([(float(row_scores[i]), meta[i]) for i in top if row_scores[i] >= min_score])
+        return results
+
+    def invalidate(self, user_id=None):
+        """Drop one user's index (or all) so it is reloaded on next use"""
+        with self._lock:
+            if user_id is None:
+                self._users.clear()
+            else:
+                self._users.pop(user_id, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "users": len(self._users),
+                "rows": sum(index.size for index in self._users.values()),
+                "bytes": sum(index.matrix.nbytes for index in self._users.values())
+            }
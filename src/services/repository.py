@@ -0,0 +1,497 @@
+import os
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+
+
+class Repository(ABC):
+    """Data access used by database.py.
+
+    Rows are plain dicts; created_at is always an ISO-8601 string with a UTC
+    offset, whatever the backend stores, so rows from different sources
+    (and from the write-behind buffer) sort and compare the same way.
+    """
+
+    @abstractmethod
+    def insert_rows(self, table, rows):
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_user_rows(self, table, user_id, columns=None):
+        """All of a user's rows in a table, newest first"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def rows_after(self, table, after_id, limit, columns=None, user_id=None):
+        """Up to `limit` rows with id > after_id in id order, optionally only one user's"""
+        raise NotImplementedError
+
+    def iter_rows(self, table, columns=None, user_id=None, batch_size=1000):
+        """Yield every row (or one user's) in id-ordered batches.
+
+        PostgREST silently caps a single select at its max-rows setting, so
+        anything that must see all rows pages through them this way.
+        """
+        if columns and "id" not in columns:
+            columns = ("id", *columns)
+        after_id = 0
+        while True:
+            rows = self.rows_after(table, after_id, batch_size, columns, user_id)
+            if not rows:
+                return
+            yield rows
+            if len(rows) < batch_size:
+                return
+            after_id = rows[-1]["id"]
+
+    def list_all_rows(self, table):
+        return [row for batch in self.iter_rows(table) for row in batch]
+
+    @abstractmethod
+    def get_user_row(self, table, row_id, user_id):
+        raise NotImplementedError
+
+    @abstractmethod
+    def update_row(self, table, row_id, changes):
+        raise NotImplementedError
+
+    @abstractmethod
+    def latest_row_id(self, table, user_id):
+        raise NotImplementedError
+
+    @abstractmethod
+    def feed_page(self, table, columns, user_id, cursor, source_rank, limit):
+        """Keyset page ordered by (created_at, id) descending.
+
+        cursor is (created_at, cursor_rank, id) of the last item already
+        shown, where rank orders sources that share a created_at.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def rows_with_skill(self, user_id, skill, column, columns):
+        """Analyses whose `column` list contains `skill`"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def search_analyses(self, user_id, query, limit, offset):
+        """Full-text search of a user's analyses, best match first.
+
+        Rows carry a `snippet` with matches wrapped in SNIPPET_START/END
+        (see src/utils/search.py) and a `rank` where higher is better.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_skill_stats(self, user_id):
+        """Return (stats, version), or (None, 0) if the user has none yet"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def save_skill_stats(self, user_id, stats, version):
+        """Store stats if the row is still at `version` (0 = not created yet). Returns False on conflict"""
+        raise NotImplementedError
+
+    def update_skill_stats(self, user_id, update, attempts=5):
+        """Read-modify-write the user's stats with update(stats), retrying on concurrent changes"""
+        for _ in range(attempts):
+            stats, version = self.get_skill_stats(user_id)
+            if self.save_skill_stats(user_id, update(stats), version):
+                return True
+        return False
+
+    @abstractmethod
+    def find_stored_object(self, user_id, content_hash):
+        raise NotImplementedError
+
+    @abstractmethod
+    def acquire_stored_object(self, user_id, content_hash, storage_path, size_bytes):
+        raise NotImplementedError
+
+    @abstractmethod
+    def release_stored_object(self, user_id, storage_path):
+        raise NotImplementedError
+
+
+# ==================== SUPABASE ====================
+
+class SupabaseRepository(Repository):
+    """Tables in Supabase, over the PostgREST API"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def _select(self, table, columns):
+        return self.client.table(table).select(", ".join(columns) if columns else "*")
+
+    def insert_rows(self, table, rows):
+        return self.client.table(table).insert(rows).execute().data
+
+    def list_user_rows(self, table, user_id, columns=None):
+        return self._select(table, columns).eq("user_id", user_id).order("created_at", desc=True).execute().data
+
+    def rows_after(self, table, after_id, limit, columns=None, user_id=None):
+        query = self._select(table, columns).gt("id", after_id)
+        if user_id is not None:
+            query = query.eq("user_id", user_id)
+        return query.order("id").limit(limit).execute().data
+
+    def get_user_row(self, table, row_id, user_id):
+        response = self.client.table(table).select("*").eq("id", row_id).eq("user_id", user_id).execute()
+        return response.data[0] if response.data else None
+
+    def update_row(self, table, row_id, changes):
+        self.client.table(table).update(changes).eq("id", row_id).execute()
+
+    def latest_row_id(self, table, user_id):
+        response = self.client.table(table).select("id").eq("user_id", user_id).order(
+            "created_at", desc=True).limit(1).execute()
+        return response.data[0]["id"] if response.data else None
+
+    def feed_page(self, table, columns, user_id, cursor, source_rank, limit):
+        query = self._select(table, columns).eq("user_id", user_id)
+
+        if cursor:
+            created_at, cursor_rank, cursor_id = cursor
+            if source_rank < cursor_rank:
+                query = query.lte("created_at", created_at)
+            elif source_rank == cursor_rank:
+                query = query.or_(f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{cursor_id})')
+            else:
+                query = query.lt("created_at", created_at)
+
+        return query.order("created_at", desc=True).order("id", desc=True).limit(limit).execute().data
+
+    def rows_with_skill(self, user_id, skill, column, columns):
+        return self._select("cv_analyses", columns).eq("user_id", user_id).contains(column, [skill]).order(
+            "created_at", desc=True).execute().data
+
+    def search_analyses(self, user_id, query, limit, offset):
+        return self.client.rpc("search_analyses", {
+            "p_user_id": user_id,
+            "p_query": query,
+            "p_limit": limit,
+            "p_offset": offset
+        }).execute().data or []
+
+    def get_skill_stats(self, user_id):
+        response = self.client.table("skill_analytics").select("stats, version").eq("user_id", user_id).execute()
+        if not response.data:
+            return None, 0
+        return response.data[0]["stats"], response.data[0]["version"]
+
+    def save_skill_stats(self, user_id, stats, version):
+        updated_at = datetime.now(timezone.utc).isoformat()
+        if version == 0:
+            try:
+                self.client.table("skill_analytics").insert({
+                    "user_id": user_id, "stats": stats, "version": 1, "updated_at": updated_at
+                }).execute()
+                return True
+            except Exception as e:
+                if "duplicate key" in str(e) or "23505" in str(e):
+                    return False
+                raise
+        response = self.client.table("skill_analytics").update({
+            "stats": stats, "version": version + 1, "updated_at": updated_at
+        }).eq("user_id", user_id).eq("version", version).execute()
+        return bool(response.data)
+
+    def find_stored_object(self, user_id, content_hash):
+        response = self.client.table("storage_objects").select("storage_path").eq("user_id", user_id).eq(
+            "content_hash", content_hash).limit(1).execute()
+        return response.data[0]["storage_path"] if response.data else None
+
+    def acquire_stored_object(self, user_id, content_hash, storage_path, size_bytes):
+        return self.client.rpc("acquire_storage_object", {
+            "p_user_id": user_id,
+            "p_content_hash": content_hash,
+            "p_storage_path": storage_path,
+            "p_size_bytes": size_bytes
+        }).execute().data
+
+    def release_stored_object(self, user_id, storage_path):
+        return self.client.rpc("release_storage_object", {
+            "p_user_id": user_id,
+            "p_storage_path": storage_path
+        }).execute().data or 0
+
+
+# ==================== SQLALCHEMY ====================
+
+class SqlRepository(Repository):
+    """Direct SQL over SQLAlchemy Core, for Postgres or a local SQLite file.
+
+    Uses a pooled engine and bound parameters, so each statement is compiled
+    once and reused from SQLAlchemy's statement cache. The schema (with
+    (user_id, created_at) indexes) is created if it doesn't exist.
+    """
+
+    def __init__(self, database_url, create_schema=True, **engine_options):
+        from sqlalchemy import create_engine, event
+        from src.services import sql_schema
+
+        self.schema = sql_schema
+        self.tables = sql_schema.TABLES
+
+        if database_url.startswith("sqlite"):
+            engine_options.setdefault("connect_args", {"check_same_thread": False})
+        else:
+            engine_options.setdefault("pool_size", int(os.getenv("DATABASE_POOL_SIZE", "10")))
+            engine_options.setdefault("max_overflow", int(os.getenv("DATABASE_MAX_OVERFLOW", "20")))
+            engine_options.setdefault("pool_recycle", 1800)
+        engine_options.setdefault("pool_pre_ping", True)
+
+        self.engine = create_engine(database_url, **engine_options)
+        self.dialect = self.engine.dialect.name
+
+        if self.dialect == "sqlite":
+            @event.listens_for(self.engine, "connect")
+            def _sqlite_pragmas(dbapi_connection, connection_record):
+                cursor = dbapi_connection.cursor()
+                cursor.execute("PRAGMA journal_mode=WAL")
+                cursor.execute("PRAGMA synchronous=NORMAL")
+                cursor.close()
+
+        if create_schema:
+            sql_schema.metadata.create_all(self.engine)
+            with self.engine.begin() as conn:
+                sql_schema.install_search(conn)
+
+    def _table(self, table):
+        return self.tables[table]
+
+    def _columns(self, table, columns):
+        if not columns:
+            return [table]
+        return [table.c[name] for name in columns]
+
+    def _rows(self, result):
+        return [self.schema.row_to_dict(row) for row in result.mappings()]
+
+    def insert_rows(self, table, rows):
+        from sqlalchemy import insert
+        table = self._table(table)
+        prepared = [self.schema.prepare_row(table, row) for row in rows]
+        with self.engine.begin() as conn:
+            if self.dialect in ("postgresql", "sqlite"):
+                result = conn.execute(insert(table).returning(*table.c), prepared)
+                return self._rows(result)
+            conn.execute(insert(table), prepared)
+        return rows
+
+    def list_user_rows(self, table, user_id, columns=None):
+        from sqlalchemy import select
+        table = self._table(table)
+        query = select(*self._columns(table, columns)).where(table.c.user_id == user_id).order_by(
+            table.c.created_at.desc(), table.c.id.desc())
+        with self.engine.connect() as conn:
+            return self._rows(conn.execute(query))
+
+    def rows_after(self, table, after_id, limit, columns=None, user_id=None):
+        from sqlalchemy import select
+        table = self._table(table)
+        query = select(*self._columns(table, columns)).where(table.c.id > after_id)
+        if user_id is not None:
+            query = query.where(table.c.user_id == user_id)
+        with self.engine.connect() as conn:
+            return self._rows(conn.execute(query.order_by(table.c.id).limit(limit)))
+
+    def get_user_row(self, table, row_id, user_id):
+        from sqlalchemy import select
+        table = self._table(table)
+        query = select(table).where(table.c.id == row_id, table.c.user_id == user_id)
+        with self.engine.connect() as conn:
+            rows = self._rows(conn.execute(query))
+        return rows[0] if rows else None
+
+    def update_row(self, table, row_id, changes):
+        from sqlalchemy import update
+        table = self._table(table)
+        with self.engine.begin() as conn:
+            conn.execute(update(table).where(table.c.id == row_id).values(**changes))
+
+    def latest_row_id(self, table, user_id):
+        from sqlalchemy import select
+        table = self._table(table)
+        query = select(table.c.id).where(table.c.user_id == user_id).order_by(
+            table.c.created_at.desc(), table.c.id.desc()).limit(1)
+        with self.engine.connect() as conn:
+            return conn.execute(query).scalar()
+
+    def feed_page(self, table, columns, user_id, cursor, source_rank, limit):
+        from sqlalchemy import select, and_, or_
+        table = self._table(table)
+        query = select(*self._columns(table, columns)).where(table.c.user_id == user_id)
+
+        if cursor:
+            created_at, cursor_rank, cursor_id = cursor
+            created_at = self.schema.parse_timestamp(created_at)
+            if source_rank < cursor_rank:
+                query = query.where(table.c.created_at <= created_at)
+            elif source_rank == cursor_rank:
+                query = query.where(or_(
+                    table.c.created_at < created_at,
+                    and_(table.c.created_at == created_at, table.c.id < cursor_id)
+                ))
+            else:
+                query = query.where(table.c.created_at < created_at)
+
+        query = query.order_by(table.c.created_at.desc(), table.c.id.desc()).limit(limit)
+        with self.engine.connect() as conn:
+            return self._rows(conn.execute(query))
+
+    def rows_with_skill(self, user_id, skill, column, columns):
+        from sqlalchemy import select, func, literal, Boolean
+        table = self._table("cv_analyses")
+        query = select(*self._columns(table, columns)).where(table.c.user_id == user_id)
+
+        if self.dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import JSONB
+            query = query.where(table.c[column].op("@>", return_type=Boolean)(literal([skill], JSONB)))
+        else:
+            skills = func.json_each(table.c[column]).table_valued("value")
+            query = query.where(select(skills.c.value).where(skills.c.value == skill).exists())
+
+        query = query.order_by(table.c.created_at.desc())
+        with self.engine.connect() as conn:
+            return self._rows(conn.execute(query))
+
+    def search_analyses(self, user_id, query, limit, offset):
+        from sqlalchemy import text, column, Integer, Float, Text
+        from src.utils.search import fts5_query, SNIPPET_START, SNIPPET_END
+
+        result_columns = [
+            column("id", Integer), column("created_at", self.schema.UTCDateTime),
+            column("match_score", Integer), column("job_description_preview", Text),
+            column("matching_skills", self.schema.JsonList), column("missing_skills", self.schema.JsonList),
+            column("snippet", Text), column("rank", Float),
+        ]
+
+        if self.dialect == "sqlite":
+            query = fts5_query(query)
+            if query is None:
+                return []
+            statement = text("""
+                select a.id, a.created_at, a.match_score, a.job_description_preview,
+                       a.matching_skills, a.missing_skills,
+                       snippet(cv_analyses_fts, -1, :start, :end, '…', 16) as snippet,
+                       -bm25(cv_analyses_fts, 0.0, 1.0, 4.0, 2.0) as rank
+                from cv_analyses_fts
+                join cv_analyses a on a.id = cv_analyses_fts.rowid
+                where cv_analyses_fts match :query and cv_analyses_fts.user_id = :user_id
+                order by bm25(cv_analyses_fts, 0.0, 1.0, 4.0, 2.0), a.created_at desc
+                limit :limit offset :offset
+            """)
+            params = {"start": SNIPPET_START, "end": SNIPPET_END}
+        else:
+            statement = text("""
+                select a.id, a.created_at, a.match_score, a.job_description_preview,
+                       a.matching_skills, a.missing_skills,
+                       ts_headline('english', coalesce(a.job_description, ''), q.query, :headline) as snippet,
+                       ts_rank_cd(a.search_vector, q.query) as rank
+                from cv_analyses a, websearch_to_tsquery('english', :query) as q(query)
+                where a.user_id = :user_id and a.search_vector @@ q.query
+                order by rank desc, a.created_at desc
+                limit :limit offset :offset
+            """)
+            params = {"headline": f"StartSel={SNIPPET_START}, StopSel={SNIPPET_END}, "
+                                  "MaxWords=30, MinWords=10, MaxFragments=2"}
+
+        params.update(query=query, user_id=user_id, limit=limit, offset=offset)
+        with self.engine.connect() as conn:
+            return self._rows(conn.execute(statement.columns(*result_columns), params))
+
+    def get_skill_stats(self, user_id):
+        from sqlalchemy import select
+        table = self._table("skill_analytics")
+        query = select(table.c.stats, table.c.version).where(table.c.user_id == user_id)
+        with self.engine.connect() as conn:
+            row = conn.execute(query).first()
+        return (row.stats, row.version) if row else (None, 0)
+
+    def save_skill_stats(self, user_id, stats, version):
+        from sqlalchemy import insert, update
+        from sqlalchemy.exc import IntegrityError
+        table = self._table("skill_analytics")
+        updated_at = datetime.now(timezone.utc)
+
+        with self.engine.begin() as conn:
+            if version == 0:
+                try:
+                    conn.execute(insert(table).values(
+                        user_id=user_id, stats=stats, version=1, updated_at=updated_at))
+                    return True
+                except IntegrityError:
+                    return False
+            result = conn.execute(update(table).where(
+                table.c.user_id == user_id, table.c.version == version
+            ).values(stats=stats, version=version + 1, updated_at=updated_at))
+            return result.rowcount == 1
+
+    def find_stored_object(self, user_id, content_hash):
+        from sqlalchemy import select
+        table = self._table("storage_objects")
+        query = select(table.c.storage_path).where(
+            table.c.user_id == user_id, table.c.content_hash == content_hash)
+        with self.engine.connect() as conn:
+            return conn.execute(query).scalar()
+
+    def acquire_stored_object(self, user_id, content_hash, storage_path, size_bytes):
+        from sqlalchemy import select, update, insert
+        from sqlalchemy.exc import IntegrityError
+        table = self._table("storage_objects")
+        match = (table.c.user_id == user_id) & (table.c.content_hash == content_hash)
+
+        for _ in range(2):
+            with self.engine.begin() as conn:
+                updated = conn.execute(update(table).where(match).values(ref_count=table.c.ref_count + 1))
+                if updated.rowcount:
+                    return conn.execute(select(table.c.storage_path).where(match)).scalar()
+                try:
+                    conn.execute(insert(table).values(
+                        user_id=user_id, content_hash=content_hash, storage_path=storage_path,
+                        size_bytes=size_bytes, ref_count=1, created_at=datetime.now(timezone.utc)
+                    ))
+                    return storage_path
+                except IntegrityError:
+                    pass  # inserted concurrently; take a reference on that row instead
+        raise RuntimeError("Could not register stored object")
+
+    def release_stored_object(self, user_id, storage_path):
+        from sqlalchemy import select, update, delete
+        table = self._table("storage_objects")
+        match = (table.c.user_id == user_id) & (table.c.storage_path == storage_path)
+
+        with self.engine.begin() as conn:
+            conn.execute(update(table).where(match).values(ref_count=table.c.ref_count - 1))
+            remaining = conn.execute(select(table.c.ref_count).where(match)).scalar()
+            if remaining is None or remaining <= 0:
+                conn.execute(delete(table).where(match))
+                return 0
+            return remaining
+
+
+_repository = None
+_repository_lock = threading.Lock()
+
+
+def get_repository():
+    """SqlRepository when DATABASE_URL is set, otherwise Supabase"""
+    global _repository
+    if _repository is None:
+        with _repository_lock:
+            if _repository is None:
+                database_url = os.getenv("DATABASE_URL")
+                if database_url:
+                    _repository = SqlRepository(database_url)
+                else:
+                    from src.services.clients import get_anon_client
+                    _repository = SupabaseRepository(get_anon_client())
+    return _repository
+
+
+def set_repository(repository):
+    """Swap the repository (tests, benchmarks, load tests)"""
+    global _repository
+    _repository = repository
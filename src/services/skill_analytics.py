@@ -0,0 +1,83 @@
+"""Per-user skill-gap aggregates, updated one analysis at a time.
+
+The stats document stored per user looks like:
+
+    {
+        "analyses": 12,
+        "score_sum": 804,
+        "last_analysis_at": "2024-03-02T10:00:00+00:00",
+        "months": {"2024-03": {"sum": 140, "count": 2}, ...},
+        "skills": {"docker": {"name": "Docker", "missing": 5, "matching": 1}, ...}
+    }
+
+Skills are counted case-insensitively under their first spelling seen.
+"""
+import copy
+
+TREND_MONTHS = 12
+
+
+def empty_stats():
+    return {"analyses": 0, "score_sum": 0, "last_analysis_at": None, "months": {}, "skills": {}}
+
+
+def _count_skills(skills, skill_list, field):
+    for skill in skill_list or []:
+        if not isinstance(skill, str) or not skill.strip():
+            continue
+        name = skill.strip()
+        entry = skills.setdefault(name.lower(), {"name": name, "missing": 0, "matching": 0})
+        entry[field] += 1
+
+
+def apply_analyses(stats, analyses):
+    """Return a copy of stats with these analyses counted in"""
+    stats = copy.deepcopy(stats) if stats else empty_stats()
+
+    for analysis in analyses:
+        score = analysis.get("match_score") or 0
+        created_at = analysis.get("created_at") or ""
+
+        stats["analyses"] += 1
+        stats["score_sum"] += score
+        if created_at and (stats["last_analysis_at"] or "") < created_at:
+            stats["last_analysis_at"] = created_at
+
+        if created_at:
+            month = stats["months"].setdefault(created_at[:7], {"sum": 0, "count": 0})
+            month["sum"] += score
+            month["count"] += 1
+
+        _count_skills(stats["skills"], analysis.get("missing_skills"), "missing")
+        _count_skills(stats["skills"], analysis.get("matching_skills"), "matching")
+
+    return stats
+
+
+def _top(skills, field, top_n):
+    ranked = sorted(
+        (entry for entry in skills.values() if entry[field] > 0),
+        key=lambda entry: (-entry[field], entry["name"].lower())
+    )
+    return [{"skill": entry["name"], "count": entry[field]} for entry in ranked[:top_n]]
+
+
+def summarize(stats, top_n=10):
+    """Dashboard/API view of a stats document"""
+    stats = stats or empty_stats()
+    count = stats["analyses"]
+
+    trend = [
+        {"month": month, "average_score": round(bucket["sum"] / bucket["count"], 1), "analyses": bucket["count"]}
+        for month, bucket in sorted(stats["months"].items())[-TREND_MONTHS:]
+        if bucket["count"]
+    ]
+
+    return {
+        "analyses_count": count,
+        "average_score": round(stats["score_sum"] / count, 1) if count else None,
+        "last_analysis_at": stats["last_analysis_at"],
+        "top_missing": _top(stats["skills"], "missing", top_n),
+        "top_matching": _top(stats["skills"], "matching", top_n),
+        "score_trend": trend
+    }
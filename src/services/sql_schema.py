@@ -0,0 +1,199 @@
+"""SQLAlchemy table definitions mirroring the Supabase tables, for SqlRepository"""
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sqlalchemy import (
+    MetaData, Table, Column, Index, UniqueConstraint, Computed,
+    BigInteger, Integer, String, Text, Boolean, JSON, DateTime, text
+)
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.types import TypeDecorator
+
+metadata = MetaData()
+
+# bigint identity on Postgres; SQLite only autoincrements INTEGER PRIMARY KEY
+Id = BigInteger().with_variant(Integer, "sqlite")
+UserId = String(36).with_variant(UUID(as_uuid=False), "postgresql")
+JsonList = JSON().with_variant(JSONB, "postgresql")
+JsonObject = JSON().with_variant(JSONB, "postgresql")
+
+
+def parse_timestamp(value):
+    """ISO string or datetime -> aware UTC datetime"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+class UTCDateTime(TypeDecorator):
+    """timestamptz that reads back as an ISO string with +00:00, like PostgREST"""
+    impl = DateTime(timezone=True)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        value = parse_timestamp(value)
+        if dialect.name == "sqlite":
+            return value.replace(tzinfo=None)
+        return value
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return parse_timestamp(value).isoformat()
+
+
+def _created_at():
+    return datetime.now(timezone.utc)
+
+
+cv_analyses = Table(
+    "cv_analyses", metadata,
+    Column("id", Id, primary_key=True, autoincrement=True),
+    Column("user_id", UserId, nullable=False),
+    Column("job_description", Text),
+    Column("job_description_preview", Text, Computed("substr(job_description, 1, 120)", persisted=True)),
+    Column("match_score", Integer, default=0),
+    Column("matching_skills", JsonList, default=list),
+    Column("missing_skills", JsonList, default=list),
+    Column("suggestions", JsonList, default=list),
+    Column("cover_letter_points", JsonList, default=list),
+    Column("original_cv_path", Text),
+    Column("improved_cv_path", Text),
+    Column("created_at", UTCDateTime, nullable=False, default=_created_at),
+    Index("cv_analyses_user_created_idx", "user_id", "created_at", "id"),
+)
+
+generated_cvs = Table(
+    "generated_cvs", metadata,
+    Column("id", Id, primary_key=True, autoincrement=True),
+    Column("user_id", UserId, nullable=False),
+    Column("name", Text),
+    Column("email", Text),
+    Column("cv_file_path", Text),
+    Column("has_experience", Boolean, default=False),
+    Column("has_education", Boolean, default=False),
+    Column("job_title", Text),
+    Column("company_name", Text),
+    Column("created_at", UTCDateTime, nullable=False, default=_created_at),
+    Index("generated_cvs_user_created_idx", "user_id", "created_at", "id"),
+)
+
+cover_letters = Table(
+    "cover_letters", metadata,
+    Column("id", Id, primary_key=True, autoincrement=True),
+    Column("user_id", UserId, nullable=False),
+    Column("name", Text),
+    Column("job_title", Text),
+    Column("company_name", Text),
+    Column("cover_letter_file_path", Text),
+    Column("created_at", UTCDateTime, nullable=False, default=_created_at),
+    Index("cover_letters_user_created_idx", "user_id", "created_at", "id"),
+)
+
+storage_objects = Table(
+    "storage_objects", metadata,
+    Column("id", Id, primary_key=True, autoincrement=True),
+    Column("user_id", UserId, nullable=False),
+    Column("content_hash", Text, nullable=False),
+    Column("storage_path", Text, nullable=False),
+    Column("size_bytes", BigInteger, nullable=False, default=0),
+    Column("ref_count", Integer, nullable=False, default=1),
+    Column("created_at", UTCDateTime, nullable=False, default=_created_at),
+    UniqueConstraint("user_id", "content_hash"),
+    Index("storage_objects_user_path_idx", "user_id", "storage_path"),
+)
+
+skill_analytics = Table(
+    "skill_analytics", metadata,
+    Column("user_id", UserId, primary_key=True),
+    Column("stats", JsonObject, nullable=False),
+    Column("version", Integer, nullable=False, default=1),
+    Column("updated_at", UTCDateTime, nullable=False, default=_created_at),
+)
+
+TABLES = {
+    table.name: table
+    for table in (cv_analyses, generated_cvs, cover_letters, storage_objects, skill_analytics)
+}
+
+
+# Full-text search on cv_analyses. Postgres gets the generated tsvector, GIN
+# index and search_analyses() from migrations/004_analysis_search.sql, run as
+# is so the migration stays the only definition; SQLite gets an FTS5 table
+# kept in sync by triggers. Either way new rows are indexed as part of their insert.
+POSTGRES_SEARCH_MIGRATION = Path(__file__).resolve().parents[2] / "migrations" / "004_analysis_search.sql"
+
+_SQLITE_FTS_VALUES = """
+    new.id,
+    new.user_id,
+    new.job_description,
+    (select group_concat(value, ', ') from (
+        select value from json_each(new.matching_skills)
+        union all
+        select value from json_each(new.missing_skills))),
+    (select group_concat(value, ' ') from json_each(new.suggestions))
+"""
+
+SQLITE_SEARCH_DDL = [
+    """
+    create virtual table if not exists cv_analyses_fts using fts5(
+        user_id unindexed, job_description, skills, suggestions, tokenize = 'porter unicode61'
+    )
+    """,
+    f"""
+    create trigger if not exists cv_analyses_fts_insert after insert on cv_analyses begin
+        insert into cv_analyses_fts (rowid, user_id, job_description, skills, suggestions)
+        values ({_SQLITE_FTS_VALUES});
+    end
+    """,
+    f"""
+    create trigger if not exists cv_analyses_fts_update
+    after update of job_description, matching_skills, missing_skills, suggestions on cv_analyses begin
+        delete from cv_analyses_fts where rowid = old.id;
+        insert into cv_analyses_fts (rowid, user_id, job_description, skills, suggestions)
+        values ({_SQLITE_FTS_VALUES});
+    end
+    """,
+    """
+    create trigger if not exists cv_analyses_fts_delete after delete on cv_analyses begin
+        delete from cv_analyses_fts where rowid = old.id;
+    end
+    """,
+]
+
+# Index rows that were there before the FTS table existed
+SQLITE_SEARCH_BACKFILL = _SQLITE_FTS_VALUES.replace("new.", "a.")
+
+
+def install_search(conn):
+    if conn.dialect.name == "postgresql":
+        # exec_driver_sql: the function body has semicolons and no bind parameters
+        conn.exec_driver_sql(POSTGRES_SEARCH_MIGRATION.read_text())
+    elif conn.dialect.name == "sqlite":
+        existed = conn.execute(text(
+            "select 1 from sqlite_master where type = 'table' and name = 'cv_analyses_fts'"
+        )).scalar()
+        for statement in SQLITE_SEARCH_DDL:
+            conn.execute(text(statement))
+        if not existed:
+            conn.execute(text(
+                "insert into cv_analyses_fts (rowid, user_id, job_description, skills, suggestions) "
+                f"select {SQLITE_SEARCH_BACKFILL} from cv_analyses a"
+            ))
+
+
+def prepare_row(table, row):
+    """Keep only the columns we can insert (drops pending markers and generated columns)"""
+    return {
+        name: value for name, value in row.items()
+        if name in table.c and table.c[name].computed is None
+        and not (name == "id" and not isinstance(value, int))
+    }
+
+
+def row_to_dict(row):
+    return dict(row)
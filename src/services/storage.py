@@ -1,12 +1,54 @@
+import hashlib
+import io
+import mimetypes
 import os
 import re
-from supabase import create_client, Client
-from dotenv import load_dotenv
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from src.services.database import find_stored_object, acquire_stored_object, release_stored_object
+from src.services.storage_backends import get_storage_backend, DEFAULT_CONTENT_TYPE
+from src.utils.cache import TTLCache
+from src.utils.metrics import stage_timer, timed
 
-load_dotenv()
+# Signed URLs are reused until shortly before they stop working
+SIGNED_URL_EXPIRES_IN = 3600
+SIGNED_URL_SAFETY_MARGIN = int(os.getenv("SIGNED_URL_SAFETY_MARGIN", "300"))
+_signed_url_cache = TTLCache(
+    maxsize=int(os.getenv("SIGNED_URL_CACHE_SIZE", "4096")),
+    ttl=SIGNED_URL_EXPIRES_IN - SIGNED_URL_SAFETY_MARGIN
+)
 
-url = os.getenv("SUPABASE_URL")
-key = os.getenv("SUPABASE_KEY")
+# Small files are kept in memory after the first download so hot files skip storage.
+# Worst case memory is HOT_FILE_CACHE_ENTRIES * HOT_FILE_MAX_BYTES.
+HOT_FILE_MAX_BYTES = int(os.getenv("HOT_FILE_MAX_BYTES", str(512 * 1024)))
+_hot_files = TTLCache(
+    maxsize=int(os.getenv("HOT_FILE_CACHE_ENTRIES", "128")),
+    ttl=int(os.getenv("HOT_FILE_CACHE_TTL", "300"))
+)
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Uploads in flight at once for upload_many
+UPLOAD_CONCURRENCY = int(os.getenv("UPLOAD_CONCURRENCY", "8"))
+
+# (user_id, sha256) -> storage path of an object we know is already stored, and the reverse
+CONTENT_INDEX_CACHE_SIZE = int(os.getenv("CONTENT_INDEX_CACHE_SIZE", "4096"))
+_content_index = TTLCache(maxsize=CONTENT_INDEX_CACHE_SIZE, ttl=600)
+_content_index_keys = TTLCache(maxsize=CONTENT_INDEX_CACHE_SIZE, ttl=600)
+
+# Zip uploads expanding to more than this are hashed as raw bytes (bounds memory and CPU per upload)
+CONTENT_DIGEST_MAX_UNZIPPED = int(os.getenv("CONTENT_DIGEST_MAX_UNZIPPED", str(32 * 1024 * 1024)))
+
+
+def _remember_content(index_key, storage_path):
+    _content_index.set(index_key, storage_path)
+    _content_index_keys.set(storage_path, index_key)
+
+
+def _forget_content(storage_path):
+    index_key = _content_index_keys.pop(storage_path)
+    if index_key is not None:
+        _content_index.pop(index_key)
 
 
 def sanitize_filename(filename):
@@ -16,49 +58,117 @@ def sanitize_filename(filename):
     return filename
 
 
-def get_supabase_client(access_token=None):
-    """Get Supabase client with optional user token"""
-    if access_token:
-        # Create client and set the auth token
-        client = create_client(url, key)
-        client.auth.set_session(access_token, "")  # Set user's token
-        return client
-    else:
-        # Use anon key
-        return create_client(url, key)
+def content_digest(file_data):
+    """SHA-256 identifying a file's content.
+
+    DOCX files are zip archives whose entries carry the time they were
+    written, so two renders of the same document differ byte-wise. For zip
+    data we hash the entry names and uncompressed contents instead, reading
+    each entry in chunks. Archives that expand past CONTENT_DIGEST_MAX_UNZIPPED
+    bytes (or don't unzip) get the plain hash of their bytes.
+    """
+    if file_data[:4] == b"PK\x03\x04":
+        try:
+            return _zip_digest(file_data)
+        except Exception:
+            pass
+    return hashlib.sha256(file_data).hexdigest()
+
+
+class _TooLarge(Exception):
+    pass
+
+
+def _zip_digest(file_data):
+    digest = hashlib.sha256(b"zip:")
+    remaining = CONTENT_DIGEST_MAX_UNZIPPED
+    with zipfile.ZipFile(io.BytesIO(file_data)) as archive:
+        # Declared sizes can lie (zip bombs), so the bytes actually read are counted too
+        if sum(info.file_size for info in archive.infolist()) > remaining:
+            raise _TooLarge()
+        for name in sorted(archive.namelist()):
+            digest.update(name.encode("utf-8") + b"\0")
+            with archive.open(name) as entry:
+                while True:
+                    chunk = entry.read(DOWNLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    if remaining < 0:
+                        raise _TooLarge()
+                    digest.update(chunk)
+    return digest.hexdigest()
 
 
 def upload_file(file_path, file_name, user_id, access_token=None):
-    """Upload file to Supabase Storage"""
+    """Upload file to storage, reusing an identical file the user already has"""
+    try:
+        with open(file_path, 'rb') as f:
+            file_data = f.read()
+    except Exception as e:
+        print(f"Upload error: {str(e)}")
+        return {"success": False, "error": str(e)}
+
+    return upload_bytes(file_data, file_name, user_id, access_token)
+
+
+@timed("storage_upload")
+def upload_bytes(file_data, file_name, user_id, access_token=None):
+    """Upload in-memory file content to storage.
+
+    Files are content-addressed: the path includes the content digest and
+    each upload takes a reference on the stored object, so repeated
+    uploads of the same bytes cost one lookup instead of a transfer.
+    """
     try:
-        supabase = get_supabase_client(access_token)
+        content_hash = content_digest(file_data)
+        index_key = (user_id, content_hash)
+
+        existing_path = _content_index.get(index_key) or find_stored_object(user_id, content_hash)
+        if existing_path:
+            storage_path = acquire_stored_object(user_id, content_hash, existing_path, len(file_data))
+            _remember_content(index_key, storage_path)
+            return {"success": True, "path": storage_path, "deduplicated": True}
+
+        backend = get_storage_backend(access_token)
 
         clean_filename = sanitize_filename(file_name)
-        storage_path = f"{user_id}/{clean_filename}"
+        storage_path = f"{user_id}/{content_hash[:16]}/{clean_filename}"
+        content_type = mimetypes.guess_type(clean_filename)[0] or DEFAULT_CONTENT_TYPE
 
-        with open(file_path, 'rb') as f:
-            file_data = f.read()
+        backend.upload(storage_path, file_data, content_type)
 
-        supabase.storage.from_("cv-files").upload(
-            path=storage_path,
-            file=file_data,
-            file_options={
-                "content-type": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                "upsert": "true"
-            }
-        )
+        canonical_path = acquire_stored_object(user_id, content_hash, storage_path, len(file_data))
+        if canonical_path and canonical_path != storage_path:
+            # Someone stored the same bytes under another name meanwhile; keep theirs
+            backend.delete(storage_path)
+            storage_path = canonical_path
 
-        return {"success": True, "path": storage_path}
+        _remember_content(index_key, storage_path)
+        _hot_files.pop(storage_path)
+        return {"success": True, "path": storage_path, "deduplicated": False}
     except Exception as e:
         print(f"Upload error: {str(e)}")
         return {"success": False, "error": str(e)}
 
 
+def upload_many(files, user_id, access_token=None):
+    """Upload [(file_data, file_name)] concurrently; results come back in the same order"""
+    if not files:
+        return []
+    workers = max(1, min(UPLOAD_CONCURRENCY, len(files)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="upload") as executor:
+        futures = [
+            executor.submit(upload_bytes, file_data, file_name, user_id, access_token)
+            for file_data, file_name in files
+        ]
+        return [future.result() for future in futures]
+
+
 def download_file(storage_path, local_path, access_token=None):
-    """Download file from Supabase Storage"""
+    """Download file from storage"""
     try:
-        supabase = get_supabase_client(access_token)
-        data = supabase.storage.from_("cv-files").download(storage_path)
+        data = get_storage_backend(access_token).download(storage_path)
 
         with open(local_path, 'wb') as f:
             f.write(data)
@@ -69,32 +179,114 @@ def download_file(storage_path, local_path, access_token=None):
         return {"success": False, "error": str(e)}
 
 
+def _signed_url_key(storage_path, access_token):
+    return (access_token or "", storage_path)
+
+
 def get_file_url(storage_path, access_token=None):
-    """Get signed URL for file download"""
+    """Get signed URL for file download (cached until shortly before expiry)"""
+    cache_key = _signed_url_key(storage_path, access_token)
+    cached_url = _signed_url_cache.get(cache_key)
+    if cached_url:
+        return {"success": True, "url": cached_url}
+
     try:
-        supabase = get_supabase_client(access_token)
+        with stage_timer("signed_url"):
+            signed_url = get_storage_backend(access_token).signed_url(storage_path, SIGNED_URL_EXPIRES_IN)
+        _signed_url_cache.set(cache_key, signed_url)
+        return {"success": True, "url": signed_url}
+    except Exception as e:
+        print(f"Get URL error: {str(e)}")
+        return {"success": False, "error": str(e)}
 
-        response = supabase.storage.from_("cv-files").create_signed_url(
-            path=storage_path,
-            expires_in=3600
-        )
 
-        if isinstance(response, dict) and 'signedURL' in response:
-            return {"success": True, "url": response['signedURL']}
+def get_file_urls(storage_paths, access_token=None):
+    """Get signed URLs for many files, signing all uncached ones in one request"""
+    urls = {}
+    missing = []
+    for storage_path in dict.fromkeys(p for p in storage_paths if p):
+        cached_url = _signed_url_cache.get(_signed_url_key(storage_path, access_token))
+        if cached_url:
+            urls[storage_path] = cached_url
         else:
-            print(f"Unexpected response format: {response}")
-            return {"success": False, "error": f"Invalid response: {response}"}
+            missing.append(storage_path)
+
+    if not missing:
+        return {"success": True, "urls": urls}
+
+    try:
+        with stage_timer("signed_url"):
+            signed = get_storage_backend(access_token).signed_urls(missing, SIGNED_URL_EXPIRES_IN)
+        for storage_path, signed_url in signed.items():
+            urls[storage_path] = signed_url
+            _signed_url_cache.set(_signed_url_key(storage_path, access_token), signed_url)
+
+        return {"success": True, "urls": urls}
     except Exception as e:
-        print(f"Get URL error: {str(e)}")
+        print(f"Get URLs error: {str(e)}")
+        return {"success": False, "error": str(e), "urls": urls}
+
+
+def get_file_info(storage_path, access_token=None):
+    """Get size, ETag and content type of a stored file without downloading it"""
+    cached = _hot_files.get(storage_path)
+    if cached is not None:
+        return {"success": True, **cached["info"]}
+
+    try:
+        return {"success": True, **get_storage_backend(access_token).stat(storage_path)}
+    except Exception as e:
+        print(f"File info error: {str(e)}")
         return {"success": False, "error": str(e)}
 
 
+def iter_file(storage_path, info, access_token=None, start=0, end=None):
+    """Yield bytes start..end (inclusive) of a stored file in chunks.
+
+    Files up to HOT_FILE_MAX_BYTES are fetched whole once and served from
+    memory afterwards; larger files are streamed from storage with a range
+    read so they never sit in memory or on disk.
+    """
+    if end is None:
+        end = info["size"] - 1
+
+    cached = _hot_files.get(storage_path)
+    if cached is None and info["size"] <= HOT_FILE_MAX_BYTES:
+        data = get_storage_backend(access_token).download(storage_path)
+        cached = {
+            "info": {"size": len(data), "etag": info["etag"], "content_type": info["content_type"]},
+            "data": data
+        }
+        _hot_files.set(storage_path, cached)
+
+    if cached is not None:
+        data = cached["data"]
+        stop = min(end + 1, len(data))
+        for offset in range(start, stop, DOWNLOAD_CHUNK_SIZE):
+            yield data[offset:min(offset + DOWNLOAD_CHUNK_SIZE, stop)]
+        return
+
+    yield from get_storage_backend(access_token).iter_range(storage_path, start, end, DOWNLOAD_CHUNK_SIZE)
+
+
 def delete_file(storage_path, access_token=None):
-    """Delete file from Supabase Storage"""
+    """Release a reference to a stored file, deleting it once nothing points at it.
+
+    No route deletes files yet, so references are only ever taken; this is
+    the call a delete feature must use, since one object can back several
+    uploads.
+    """
     try:
-        supabase = get_supabase_client(access_token)
-        supabase.storage.from_("cv-files").remove([storage_path])
-        return {"success": True}
+        user_id = storage_path.split('/')[0]
+        if release_stored_object(user_id, storage_path) > 0:
+            return {"success": True, "deleted": False}
+
+        get_storage_backend(access_token).delete(storage_path)
+        _signed_url_cache.pop(_signed_url_key(storage_path, access_token))
+        _hot_files.pop(storage_path)
+        _forget_content(storage_path)
+        return {"success": True, "deleted": True}
     except Exception as e:
         print(f"Delete error: {str(e)}")
-        return {"success": False, "error": str(e)}
\ No newline at end of file
+        return {"success": False, "error": str(e)}
+
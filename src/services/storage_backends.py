@@ -0,0 +1,240 @@
+import hashlib
+import hmac
+import mimetypes
+import os
+import secrets
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from urllib.parse import quote
+
+BUCKET = "cv-files"
+CHUNK_SIZE = 64 * 1024
+DEFAULT_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+class StorageBackend(ABC):
+    """Interface for where uploaded and generated files live.
+
+    Methods raise on failure; the functions in storage.py turn errors into
+    the usual {"success": False, "error": ...} results.
+    """
+
+    @abstractmethod
+    def upload(self, storage_path, data, content_type=DEFAULT_CONTENT_TYPE):
+        raise NotImplementedError
+
+    def upload_stream(self, storage_path, chunks, content_type=DEFAULT_CONTENT_TYPE):
+        """Upload from an iterable of byte chunks"""
+        self.upload(storage_path, b"".join(chunks), content_type)
+
+    @abstractmethod
+    def download(self, storage_path):
+        """Return the whole object as bytes"""
+        raise NotImplementedError
+
+    def iter_range(self, storage_path, start, end, chunk_size=CHUNK_SIZE):
+        """Yield bytes start..end (inclusive) in chunks"""
+        data = self.download(storage_path)
+        for offset in range(start, end + 1, chunk_size):
+            yield data[offset:min(offset + chunk_size, end + 1)]
+
+    @abstractmethod
+    def stat(self, storage_path):
+        """Return {"size", "etag", "content_type"} without reading the object"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def signed_url(self, storage_path, expires_in):
+        raise NotImplementedError
+
+    def signed_urls(self, storage_paths, expires_in):
+        """Return {storage_path: url}; backends override this to batch"""
+        return {path: self.signed_url(path, expires_in) for path in storage_paths}
+
+    @abstractmethod
+    def delete(self, storage_path):
+        raise NotImplementedError
+
+
+class SupabaseStorageBackend(StorageBackend):
+    """The Supabase Storage cv-files bucket, accessed as the token's user"""
+
+    def __init__(self, access_token=None):
+        from src.services.clients import get_supabase_client, get_http_client, url, key
+        self.access_token = access_token
+        self.client = get_supabase_client(access_token)
+        self.http = get_http_client()
+        self.object_url = f"{url.rstrip('/')}/storage/v1/object"
+        self.headers = {"apikey": key, "Authorization": f"Bearer {access_token or key}"}
+
+    def _object_url(self, storage_path, authenticated=True):
+        prefix = f"{self.object_url}/authenticated" if authenticated else self.object_url
+        return f"{prefix}/{BUCKET}/{quote(storage_path)}"
+
+    def upload(self, storage_path, data, content_type=DEFAULT_CONTENT_TYPE):
+        self.client.storage.from_(BUCKET).upload(
+            path=storage_path,
+            file=data,
+            file_options={"content-type": content_type, "upsert": "true"}
+        )
+
+    def upload_stream(self, storage_path, chunks, content_type=DEFAULT_CONTENT_TYPE):
+        headers = {**self.headers, "content-type": content_type, "x-upsert": "true"}
+        response = self.http.post(self._object_url(storage_path, authenticated=False), content=chunks, headers=headers)
+        response.raise_for_status()
+
+    def download(self, storage_path):
+        return self.client.storage.from_(BUCKET).download(storage_path)
+
+    def iter_range(self, storage_path, start, end, chunk_size=CHUNK_SIZE):
+        headers = {**self.headers, "Range": f"bytes={start}-{end}"}
+        with self.http.stream("GET", self._object_url(storage_path), headers=headers) as response:
+            response.raise_for_status()
+            for chunk in response.iter_bytes(chunk_size):
+                yield chunk
+
+    def stat(self, storage_path):
+        response = self.http.head(self._object_url(storage_path), headers=self.headers)
+        response.raise_for_status()
+        size = int(response.headers.get("content-length", 0))
+        return {
+            "size": size,
+            "etag": response.headers.get("etag") or f'W/"{size}-{response.headers.get("last-modified", "")}"',
+            "content_type": response.headers.get("content-type", DEFAULT_CONTENT_TYPE)
+        }
+
+    def signed_url(self, storage_path, expires_in):
+        response = self.client.storage.from_(BUCKET).create_signed_url(path=storage_path, expires_in=expires_in)
+        signed_url = _extract_signed_url(response)
+        if not signed_url:
+            raise ValueError(f"Invalid response: {response}")
+        return signed_url
+
+    def signed_urls(self, storage_paths, expires_in):
+        response = self.client.storage.from_(BUCKET).create_signed_urls(list(storage_paths), expires_in)
+        urls = {}
+        for item in response or []:
+            signed_url = _extract_signed_url(item)
+            if signed_url and item.get("path"):
+                urls[item["path"]] = signed_url
+        return urls
+
+    def delete(self, storage_path):
+        self.client.storage.from_(BUCKET).remove([storage_path])
+
+
+class LocalStorageBackend(StorageBackend):
+    """Files on local disk, for offline development, load tests and benchmarks.
+
+    Objects are sharded into root/ab/cd/ directories by a hash of their
+    storage path, written atomically (temp file + rename) and served via
+    HMAC-signed /local-files URLs.
+    """
+
+    def __init__(self, root, secret, url_prefix="/local-files"):
+        self.root = os.path.abspath(root)
+        self.secret = secret.encode("utf-8")
+        self.url_prefix = url_prefix
+        os.makedirs(self.root, exist_ok=True)
+
+    def _object_path(self, storage_path):
+        digest = hashlib.sha1(storage_path.encode("utf-8")).hexdigest()
+        return os.path.join(self.root, digest[:2], digest[2:4], quote(storage_path, safe=""))
+
+    def upload(self, storage_path, data, content_type=DEFAULT_CONTENT_TYPE):
+        self.upload_stream(storage_path, [data], content_type)
+
+    def upload_stream(self, storage_path, chunks, content_type=DEFAULT_CONTENT_TYPE):
+        object_path = self._object_path(storage_path)
+        directory = os.path.dirname(object_path)
+        os.makedirs(directory, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, object_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def download(self, storage_path):
+        with open(self._object_path(storage_path), "rb") as f:
+            return f.read()
+
+    def iter_range(self, storage_path, start, end, chunk_size=CHUNK_SIZE):
+        with open(self._object_path(storage_path), "rb") as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = f.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    def stat(self, storage_path):
+        stat_result = os.stat(self._object_path(storage_path))
+        return {
+            "size": stat_result.st_size,
+            "etag": f'"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"',
+            "content_type": mimetypes.guess_type(storage_path)[0] or DEFAULT_CONTENT_TYPE
+        }
+
+    def _signature(self, storage_path, expires):
+        message = f"{storage_path}:{expires}".encode("utf-8")
+        return hmac.new(self.secret, message, hashlib.sha256).hexdigest()
+
+    def signed_url(self, storage_path, expires_in):
+        expires = int(time.time()) + expires_in
+        signature = self._signature(storage_path, expires)
+        return f"{self.url_prefix}/{quote(storage_path)}?expires={expires}&signature={signature}"
+
+    def verify_signature(self, storage_path, expires, signature):
+        """Check a /local-files URL's signature and expiry"""
+        try:
+            expires = int(expires)
+        except (TypeError, ValueError):
+            return False
+        if expires < time.time():
+            return False
+        return hmac.compare_digest(self._signature(storage_path, expires), signature or "")
+
+    def delete(self, storage_path):
+        os.remove(self._object_path(storage_path))
+
+
+def _extract_signed_url(item):
+    if isinstance(item, dict):
+        return item.get("signedURL") or item.get("signedUrl")
+    return None
+
+
+_local_backend = None
+_local_lock = threading.Lock()
+
+
+def get_local_backend():
+    global _local_backend
+    if _local_backend is None:
+        with _local_lock:
+            if _local_backend is None:
+                secret = os.getenv("LOCAL_STORAGE_SECRET")
+                if not secret:
+                    print("⚠️ LOCAL_STORAGE_SECRET not set - signed URLs only work in this process")
+                    secret = secrets.token_hex(32)
+                _local_backend = LocalStorageBackend(os.getenv("LOCAL_STORAGE_DIR", "local_storage"), secret)
+    return _local_backend
+
+
+def get_storage_backend(access_token=None):
+    """Pick the backend from STORAGE_BACKEND ("supabase" by default, or "local")"""
+    if os.getenv("STORAGE_BACKEND", "supabase").lower() == "local":
+        return get_local_backend()
+    return SupabaseStorageBackend(access_token)
@@ -0,0 +1,171 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+import urllib.request
+
+# Seconds of clock skew tolerated when checking exp / nbf
+LEEWAY_SECONDS = 30
+
+# How long a fetched JWKS is trusted before it is refreshed
+JWKS_TTL_SECONDS = 600
+
+# Minimum gap between forced refreshes when an unknown key id shows up
+JWKS_MIN_REFRESH_SECONDS = 30
+
+_jwks_lock = threading.Lock()
+_jwks = {"keys": {}, "fetched_at": 0.0}
+
+# DigestInfo prefix for SHA-256 in PKCS#1 v1.5 signatures (RFC 8017, 9.2)
+_SHA256_DIGEST_INFO = bytes.fromhex("3031300d060960864801650304020105000420")
+
+
+def _b64url_decode(segment):
+    padding = "=" * (-len(segment) % 4)
+    return base64.urlsafe_b64decode(segment + padding)
+
+
+def _b64url_to_int(segment):
+    return int.from_bytes(_b64url_decode(segment), "big")
+
+
+def decode_unverified(token):
+    """Split a JWT and decode its header and payload without verifying it"""
+    try:
+        header_b64, payload_b64, signature_b64 = token.split(".")
+        header = json.loads(_b64url_decode(header_b64))
+        payload = json.loads(_b64url_decode(payload_b64))
+        signature = _b64url_decode(signature_b64)
+    except Exception:
+        return None
+
+    signing_input = f"{header_b64}.{payload_b64}".encode("ascii")
+    return header, payload, signature, signing_input
+
+
+def get_jwks_url():
+    supabase_url = os.getenv("SUPABASE_URL")
+    if not supabase_url:
+        return None
+    return f"{supabase_url.rstrip('/')}/auth/v1/.well-known/jwks.json"
+
+
+def _fetch_jwks():
+    """Download the project's JSON Web Key Set"""
+    jwks_url = get_jwks_url()
+    if not jwks_url:
+        return {}
+
+    with urllib.request.urlopen(jwks_url, timeout=5) as response:
+        body = json.loads(response.read())
+
+    return {jwk.get("kid"): jwk for jwk in body.get("keys", [])}
+
+
+def get_signing_key(kid):
+    """Return the JWK for a key id, refreshing the cached JWKS when needed"""
+    now = time.monotonic()
+    with _jwks_lock:
+        keys = _jwks["keys"]
+        age = now - _jwks["fetched_at"]
+        stale = age > JWKS_TTL_SECONDS
+        unknown = kid not in keys and age > JWKS_MIN_REFRESH_SECONDS
+
+        if stale or unknown:
+            try:
+                _jwks["keys"] = _fetch_jwks()
+            except Exception as e:
+                print(f"JWKS refresh error: {str(e)}")
+            _jwks["fetched_at"] = now
+
+        return _jwks["keys"].get(kid)
+
+
+def _verify_hs256(signing_input, signature, secret):
+    expected = hmac.new(secret.encode("utf-8"), signing_input, hashlib.sha256).digest()
+    return hmac.compare_digest(expected, signature)
+
+
+def _verify_rs256(signing_input, signature, jwk):
+    """RSASSA-PKCS1-v1_5 with SHA-256, using only integer arithmetic"""
+    n = _b64url_to_int(jwk["n"])
+    e = _b64url_to_int(jwk["e"])
+    key_length = (n.bit_length() + 7) // 8
+    if len(signature) != key_length:
+        return False
+
+    signature_int = int.from_bytes(signature, "big")
+    if signature_int >= n:
+        return False
+    decrypted = pow(signature_int, e, n).to_bytes(key_length, "big")
+
+    digest_info = _SHA256_DIGEST_INFO + hashlib.sha256(signing_input).digest()
+    padding_length = key_length - len(digest_info) - 3
+    if padding_length < 8:
+        return False
+    expected = b"\x00\x01" + b"\xff" * padding_length + b"\x00" + digest_info
+    return hmac.compare_digest(expected, decrypted)
+
+
+def _check_claims(payload, now):
+    if not payload.get("sub"):
+        return "Token has no subject"
+    exp = payload.get("exp")
+    if exp is None or now > exp + LEEWAY_SECONDS:
+        return "Token expired"
+    nbf = payload.get("nbf")
+    if nbf is not None and now + LEEWAY_SECONDS < nbf:
+        return "Token not yet valid"
+    aud = payload.get("aud")
+    if aud is not None and "authenticated" not in (aud if isinstance(aud, list) else [aud]):
+        return "Token audience is not 'authenticated'"
+    return None
+
+
+def verify_access_token(access_token, secret=None):
+    """Verify a Supabase access token locally.
+
+    HS256 tokens are checked against SUPABASE_JWT_SECRET and RS256 tokens
+    against the project's JWKS. Anything we cannot check here (unknown
+    algorithm, missing key material) is flagged with "unverifiable" so the
+    caller can fall back to asking Supabase.
+    """
+    decoded = decode_unverified(access_token or "")
+    if decoded is None:
+        return {"success": False, "error": "Malformed token"}
+
+    header, payload, signature, signing_input = decoded
+    algorithm = header.get("alg")
+
+    if algorithm == "HS256":
+        secret = secret or os.getenv("SUPABASE_JWT_SECRET")
+        if not secret:
+            return {"success": False, "unverifiable": True, "error": "No JWT secret configured"}
+        valid = _verify_hs256(signing_input, signature, secret)
+    elif algorithm == "RS256":
+        jwk = get_signing_key(header.get("kid"))
+        if not jwk or jwk.get("kty") != "RSA":
+            return {"success": False, "unverifiable": True, "error": "Signing key not found"}
+        valid = _verify_rs256(signing_input, signature, jwk)
+    else:
+        return {"success": False, "unverifiable": True, "error": f"Unsupported algorithm: {algorithm}"}
+
+    if not valid:
+        return {"success": False, "error": "Invalid token signature"}
+
+    claim_error = _check_claims(payload, time.time())
+    if claim_error:
+        return {"success": False, "error": claim_error}
+
+    return {"success": True, "claims": payload}
+
+
+def get_token_expiry(access_token):
+    """Return the token's exp claim (unverified), or None"""
+    decoded = decode_unverified(access_token or "")
+    if decoded is None:
+        return None
+    return decoded[1].get("exp")
@@ -0,0 +1,240 @@
+import fcntl
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+
+class WriteBuffer:
+    """In-process write-behind queue for insert-only records.
+
+    Records are appended to a local spool file, then inserted in batches
+    (one multi-row insert per table) when max_batch records are waiting or
+    flush_interval seconds have passed. Failed inserts are retried with
+    backoff; nothing is dropped. On start-up, records left in spool files
+    by a previous process are picked up again.
+
+    Spool writes reach the OS at once, so they survive the process dying.
+    The fsync that makes them survive a machine crash is batched on the
+    flush thread (once per cycle, before inserting), off the request path.
+
+    insert_rows(table, rows) does the actual insert and must raise on failure.
+    """
+
+    def __init__(self, insert_rows, spool_dir, max_batch=50, flush_interval=1.0, max_backoff=60.0):
+        self.insert_rows = insert_rows
+        self.spool_dir = spool_dir
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_backoff = max_backoff
+
+        self._pending = OrderedDict()  # pending_id -> {"table", "row", "attempts", "retry_at"}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._stopping = False
+        self._spool = None
+        self._spool_dirty = False
+        self.flushed = 0
+        self.failures = 0
+
+    # ---------- lifecycle ----------
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            os.makedirs(self.spool_dir, exist_ok=True)
+            recovered_spools = self._recover_spools()
+            spool_path = os.path.join(self.spool_dir, f"spool-{os.getpid()}-{uuid.uuid4().hex[:8]}.jsonl")
+            self._spool = open(spool_path, "a", encoding="utf-8")
+            fcntl.flock(self._spool.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            for pending_id, record in self._pending.items():
+                self._spool_write({"op": "add", "id": pending_id, "table": record["table"], "row": record["row"]})
+            # Only drop the old spools once their records are safe in ours
+            for path, f in recovered_spools:
+                os.remove(path)
+                f.close()
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="write-buffer", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Flush what we can and stop the background thread"""
+        with self._lock:
+            if self._thread is None:
+                return
+            self._stopping = True
+            self._wakeup.notify()
+            thread = self._thread
+        thread.join(timeout=10)
+        self.flush(force=True)
+        self._sync_spool()
+        with self._lock:
+            self._thread = None
+            if self._spool:
+                self._spool.close()
+                if not self._pending:
+                    os.remove(self._spool.name)
+                self._spool = None
+
+    # ---------- public API ----------
+
+    def enqueue(self, table, row):
+        """Queue a row for insertion and return its pending id"""
+        if self._thread is None:
+            self.start()
+
+        pending_id = f"pending-{uuid.uuid4().hex}"
+        with self._lock:
+            self._pending[pending_id] = {"table": table, "row": row, "attempts": 0, "retry_at": 0.0}
+            self._spool_write({"op": "add", "id": pending_id, "table": table, "row": row})
+            if len(self._pending) >= self.max_batch:
+                self._wakeup.notify()
+        return pending_id
+
+    def update_pending(self, pending_id, changes):
+        """Apply changes to a row that hasn't been written yet. Returns False if it already was"""
+        with self._lock:
+            record = self._pending.get(pending_id)
+            if record is None:
+                return False
+            record["row"].update(changes)
+            self._spool_write({"op": "update", "id": pending_id, "changes": changes})
+            return True
+
+    def pending_rows(self, table, **filters):
+        """Rows still waiting to be written, newest first, each tagged with its pending id"""
+        with self._lock:
+            rows = [
+                {**record["row"], "id": pending_id, "pending": True}
+                for pending_id, record in self._pending.items()
+                if record["table"] == table and all(record["row"].get(k) == v for k, v in filters.items())
+            ]
+        rows.reverse()
+        return rows
+
+    def stats(self):
+        with self._lock:
+            return {"pending": len(self._pending), "flushed": self.flushed, "failures": self.failures}
+
+    def flush(self, force=False):
+        """Insert every due record, one batch per table"""
+        with self._flush_lock:
+            now = time.monotonic()
+            with self._lock:
+                due = [
+                    (pending_id, record) for pending_id, record in self._pending.items()
+                    if force or record["retry_at"] <= now
+                ]
+
+            by_table = OrderedDict()
+            for pending_id, record in due:
+                by_table.setdefault(record["table"], []).append((pending_id, record))
+
+            for table, records in by_table.items():
+                for start in range(0, len(records), self.max_batch):
+                    self._flush_batch(table, records[start:start + self.max_batch])
+
+    # ---------- internals ----------
+
+    def _flush_batch(self, table, records):
+        try:
+            self.insert_rows(table, [dict(record["row"]) for _, record in records])
+            self._mark_done([pending_id for pending_id, _ in records])
+            return
+        except Exception as e:
+            print(f"Write-behind batch insert into {table} failed: {str(e)}")
+
+        # Retry one by one so a single bad row can't hold back the rest
+        for pending_id, record in records:
+            try:
+                self.insert_rows(table, [dict(record["row"])])
+                self._mark_done([pending_id])
+            except Exception as e:
+                print(f"Write-behind insert into {table} failed: {str(e)}")
+                with self._lock:
+                    self.failures += 1
+                    record["attempts"] += 1
+                    backoff = min(self.max_backoff, self.flush_interval * (2 ** record["attempts"]))
+                    record["retry_at"] = time.monotonic() + backoff
+
+    def _mark_done(self, pending_ids):
+        with self._lock:
+            for pending_id in pending_ids:
+                self._pending.pop(pending_id, None)
+            self.flushed += len(pending_ids)
+            self._spool_write({"op": "done", "ids": pending_ids})
+            if not self._pending and self._spool:
+                # Everything is written; start the spool over
+                self._spool.seek(0)
+                self._spool.truncate()
+
+    def _spool_write(self, entry):
+        if self._spool is None:
+            return
+        self._spool.write(json.dumps(entry, default=str) + "\n")
+        self._spool.flush()
+        self._spool_dirty = True
+
+    def _sync_spool(self):
+        """fsync spool writes made since the last call (group commit, outside the lock)"""
+        with self._lock:
+            spool = self._spool if self._spool_dirty else None
+            self._spool_dirty = False
+        if spool is not None:
+            os.fsync(spool.fileno())
+
+    def _recover_spools(self):
+        """Load records from spool files left behind by processes that have exited.
+
+        A live buffer holds an exclusive lock on its spool, so spools we can
+        lock belong to nobody. They stay locked (and are returned) until the
+        caller has copied their records into its own spool.
+        """
+        claimed = []
+        for name in sorted(os.listdir(self.spool_dir)):
+            if not name.startswith("spool-") or not name.endswith(".jsonl"):
+                continue
+            path = os.path.join(self.spool_dir, name)
+            f = open(path, encoding="utf-8")
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                f.close()
+                continue
+            claimed.append((path, f))
+
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn final line from a crash
+                if entry["op"] == "add":
+                    self._pending[entry["id"]] = {
+                        "table": entry["table"], "row": entry["row"], "attempts": 0, "retry_at": 0.0
+                    }
+                elif entry["op"] == "update" and entry["id"] in self._pending:
+                    self._pending[entry["id"]]["row"].update(entry["changes"])
+                elif entry["op"] == "done":
+                    for pending_id in entry["ids"]:
+                        self._pending.pop(pending_id, None)
+        return claimed
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if self._stopping:
+                    return
+                if len(self._pending) < self.max_batch:
+                    self._wakeup.wait(self.flush_interval)
+                if self._stopping:
+                    return
+            try:
+                self._sync_spool()
+                self.flush()
+            except Exception as e:
+                print(f"Write-behind flush error: {str(e)}")
@@ -0,0 +1,176 @@
+"""Admission control for the expensive (LLM) routes.
+
+A request is admitted when the user is under their concurrency limit and
+rate quota (a token bucket) and a global in-flight slot is free. Otherwise it
+waits in a bounded FIFO queue, and finishing requests hand their slot straight
+to the oldest waiter. A request is shed, rather than queued, when the queue is
+full or the expected wait (queue position x recent service time / slots) is
+past the deadline, and a queued request that hits the deadline is shed too.
+Shed requests get a Retry-After estimate.
+
+All state lives on the event loop, so the limits are per worker process.
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+from src.utils.cache import TTLCache
+
+# Weight of the newest request in the moving average of service time
+SERVICE_TIME_ALPHA = 0.2
+
+
+class Rejected(Exception):
+    """Not admitted; reason is rate, user_concurrency, queue_full or deadline"""
+
+    def __init__(self, reason, retry_after):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+class AdmissionController:
+    """Global and per-user limits with a bounded, deadline-aware wait queue.
+
+    max_in_flight <= 0 disables admission control; per_user_in_flight <= 0 or
+    user_rate <= 0 (requests per minute, with bursts of user_burst) turn off
+    that limit.
+    """
+
+    def __init__(self, max_in_flight=8, per_user_in_flight=2, user_rate=10.0, user_burst=5,
+                 max_queue=32, queue_timeout=20.0, initial_service_time=5.0):
+        self.max_in_flight = max_in_flight
+        self.per_user_in_flight = per_user_in_flight
+        self.user_rate = user_rate / 60.0
+        self.user_burst = user_burst
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.service_time = initial_service_time
+        self.in_flight = 0
+        self.admitted = 0
+        self._queue = deque()  # futures of waiting requests, oldest first
+        self._user_active = {}  # user_id -> running + queued requests
+        # An idle bucket is full again after burst / rate seconds, so dropping it then loses nothing
+        refill_seconds = user_burst / self.user_rate if self.user_rate > 0 else 60
+        self._buckets = TTLCache(maxsize=65536, ttl=refill_seconds)
+
+    @property
+    def enabled(self):
+        return self.max_in_flight > 0
+
+    def _take_token(self, user_id):
+        """0 if a request token was taken, else seconds until one is available"""
+        if self.user_rate <= 0:
+            return 0
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(user_id, (self.user_burst, now))
+        tokens = min(self.user_burst, tokens + (now - updated) * self.user_rate)
+        if tokens < 1:
+            self._buckets.set(user_id, (tokens, now))
+            return (1 - tokens) / self.user_rate
+        self._buckets.set(user_id, (tokens - 1, now))
+        return 0
+
+    def _refund_token(self, user_id):
+        if self.user_rate <= 0:
+            return
+        tokens, updated = self._buckets.get(user_id, (self.user_burst, time.monotonic()))
+        self._buckets.set(user_id, (min(self.user_burst, tokens + 1), updated))
+
+    def expected_wait(self, position):
+        """Seconds until the request at this queue position (1 = next) would start"""
+        return position * self.service_time / self.max_in_flight
+
+    def _leave(self, user_id):
+        remaining = self._user_active.get(user_id, 1) - 1
+        if remaining > 0:
+            self._user_active[user_id] = remaining
+        else:
+            self._user_active.pop(user_id, None)
+
+    async def acquire(self, user_id):
+        """Wait for a slot; returns the seconds spent queued or raises Rejected"""
+        if not self.enabled:
+            return 0.0
+        if self.per_user_in_flight > 0 and self._user_active.get(user_id, 0) >= self.per_user_in_flight:
+            raise Rejected("user_concurrency", self.service_time)
+        wait = self._take_token(user_id)
+        if wait:
+            raise Rejected("rate", wait)
+
+        if self.in_flight < self.max_in_flight and not self._queue:
+            self.in_flight += 1
+            self.admitted += 1
+            self._user_active[user_id] = self._user_active.get(user_id, 0) + 1
+            return 0.0
+
+        position = len(self._queue) + 1
+        if position > self.max_queue:
+            self._refund_token(user_id)
+            raise Rejected("queue_full", self.expected_wait(position))
+        if self.expected_wait(position) > self.queue_timeout:
+            self._refund_token(user_id)
+            raise Rejected("deadline", self.expected_wait(position))
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.append(future)
+        self._user_active[user_id] = self._user_active.get(user_id, 0) + 1
+        start = time.monotonic()
+        try:
+            await asyncio.wait({future}, timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(user_id)  # handed a slot just as the client went away
+            else:
+                self._abandon(future, user_id)
+            raise
+
+        if not future.done():
+            self._abandon(future, user_id)
+            raise Rejected("deadline", self.expected_wait(len(self._queue) + 1))
+        self.admitted += 1
+        return time.monotonic() - start
+
+    def _abandon(self, future, user_id):
+        future.cancel()
+        try:
+            self._queue.remove(future)
+        except ValueError:
+            pass
+        self._leave(user_id)
+        self._refund_token(user_id)
+
+    def release(self, user_id, service_seconds=None):
+        """Finish a request, handing its slot to the oldest live waiter"""
+        if service_seconds is not None:
+            self.service_time += SERVICE_TIME_ALPHA * (service_seconds - self.service_time)
+        self._leave(user_id)
+        while self._queue:
+            future = self._queue.popleft()
+            if not future.done():
+                future.set_result(True)
+                return
+        self.in_flight -= 1
+
+    @asynccontextmanager
+    async def slot(self, user_id):
+        """async with controller.slot(user_id): ... (raises Rejected instead of entering)"""
+        await self.acquire(user_id)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(user_id, time.monotonic() - start)
+
+    def stats(self):
+        return {
+            "in_flight": self.in_flight,
+            "queued": len(self._queue),
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "active_users": len(self._user_active),
+            "admitted": self.admitted,
+            "service_seconds": round(self.service_time, 3)
+        }
@@ -0,0 +1,52 @@
+def parse_range_header(range_header, size):
+    """Parse a single-range 'bytes=' header into an inclusive (start, end).
+
+    Returns None when the header is absent or not something we serve as a
+    partial response (multiple ranges, other units, bad syntax) - the caller
+    then sends the whole file, which RFC 9110 allows. Raises ValueError when
+    the range can't be satisfied for a file of this size.
+    """
+    if not range_header:
+        return None
+
+    unit, _, ranges = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in ranges:
+        return None
+
+    first, _, last = ranges.partition("-")
+    first, last = first.strip(), last.strip()
+    if not (first == "" or first.isdigit()) or not (last == "" or last.isdigit()):
+        return None
+
+    if first == "":
+        # Suffix range: the last N bytes
+        if last == "":
+            return None
+        suffix_length = int(last)
+        if suffix_length == 0 or size == 0:
+            raise ValueError("Range not satisfiable")
+        return max(size - suffix_length, 0), size - 1
+
+    start = int(first)
+    end = int(last) if last else size - 1
+    if last and end < start:
+        return None
+    if start >= size:
+        raise ValueError("Range not satisfiable")
+
+    return start, min(end, size - 1)
+
+
+def _strip_weak(etag):
+    etag = etag.strip()
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def etag_matches(header_value, etag):
+    """Weak ETag comparison for If-None-Match / If-Range"""
+    if not header_value or not etag:
+        return False
+    if header_value.strip() == "*":
+        return True
+    target = _strip_weak(etag)
+    return any(_strip_weak(candidate) == target for candidate in header_value.split(","))
@@ -0,0 +1,119 @@
+"""Collapse duplicate submissions of expensive POSTs by idempotency key.
+
+Each rendered form carries a fresh key. The first request with a key runs;
+requests with the same key that arrive while it runs wait for it and get
+the same response, and later ones get the stored response replayed until the
+TTL passes. A request only counts as a duplicate if its body matches too, so
+a form restored by the back button and edited before resubmitting runs
+again. Only successful pages are stored: error pages, 4xx/5xx and very large
+bodies are shared with concurrent duplicates but not replayed, so a later
+retry runs again. If the first request fails, one waiting duplicate runs in
+its place and the others wait for that one.
+"""
+import asyncio
+import hashlib
+import re
+import secrets
+
+from src.utils.cache import TTLCache
+
+
+_BOUNDARY_RE = re.compile(r'boundary="?([^";]+)"?', re.IGNORECASE)
+
+
+def new_key():
+    """A fresh one-time key for a form"""
+    return secrets.token_urlsafe(16)
+
+
+def body_fingerprint(body, content_type=""):
+    """Hash of a request body that is equal for equal form submissions.
+
+    Browsers pick a new multipart boundary for every submission, so it is
+    left out of the hash.
+    """
+    boundary = _BOUNDARY_RE.search(content_type or "")
+    if boundary:
+        body = body.replace(boundary.group(1).encode("latin-1"), b"")
+    return hashlib.sha256(body).hexdigest()
+
+
+class StoredResponse:
+    __slots__ = ("status_code", "headers", "body")
+
+    def __init__(self, status_code, headers, body):
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+
+    @classmethod
+    async def capture(cls, response):
+        """Read a (possibly streaming) response into memory"""
+        if hasattr(response, "body_iterator"):
+            body = b"".join([chunk async for chunk in response.body_iterator])
+        else:
+            body = response.body
+        headers = [(name, value) for name, value in response.headers.items() if name.lower() != "content-length"]
+        return cls(response.status_code, headers, body)
+
+    def is_error(self):
+        # Routes report failures as 200 "<p>Error: ...</p>" fragments
+        return self.status_code >= 400 or self.body.lstrip()[:8] == b"<p>Error"
+
+    def to_response(self, replayed=False):
+        from starlette.responses import Response
+
+        response = Response(content=self.body, status_code=self.status_code)
+        for name, value in self.headers:
+            response.headers.append(name, value)
+        if replayed:
+            response.headers["Idempotent-Replayed"] = "true"
+        return response
+
+
+class IdempotencyCache:
+    def __init__(self, ttl=600, maxsize=1024, max_body=1024 * 1024):
+        self.max_body = max_body
+        self._completed = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._in_flight = {}  # key -> future of the StoredResponse
+
+    async def run(self, key, execute):
+        """(response, outcome) for this key, where outcome is executed, joined or replayed.
+
+        execute() is awaited for the first request with the key and must
+        return a Starlette response.
+        """
+        while True:
+            stored = self._completed.get(key)
+            if stored is not None:
+                return stored.to_response(replayed=True), "replayed"
+
+            pending = self._in_flight.get(key)
+            if pending is None:
+                break
+            try:
+                stored = await asyncio.shield(pending)
+                return stored.to_response(replayed=True), "joined"
+            except Exception:
+                # The running request failed or was cancelled. The first waiter to get
+                # here finds no request in flight and runs in its place; the rest join it.
+                continue
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            stored = await StoredResponse.capture(await execute())
+        except BaseException as e:
+            future.set_exception(e if isinstance(e, Exception) else RuntimeError("Request cancelled"))
+            future.exception()  # retrieved, so an exception nobody waited on isn't logged
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+
+        if not stored.is_error() and len(stored.body) <= self.max_body:
+            self._completed.set(key, stored)
+        future.set_result(stored)
+        return stored.to_response(), "executed"
+
+    def stats(self):
+        return {"in_flight": len(self._in_flight), **self._completed.stats()}
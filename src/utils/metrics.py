@@ -0,0 +1,262 @@
+"""In-process metrics rendered in the Prometheus text format.
+
+Counters and histograms are plain dicts behind a lock, so recording costs
+about a microsecond. Stats that other modules already keep (cache hit rates,
+write buffer depth) are registered as callbacks and read only when /metrics
+is scraped.
+"""
+import bisect
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        with self._lock:
+            return self._values.get(labels, 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # labels -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def count(self, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            return sum(series[:-1]) if series else 0
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series_items = sorted((labels, list(series)) for labels, series in self._series.items())
+        for labels, series in series_items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(series[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._stats = []  # (prefix, help, callback)
+        self._lock = threading.Lock()
+
+    def counter(self, name, help_text, labelnames=()):
+        metric = Counter(name, help_text, labelnames)
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        metric = Histogram(name, help_text, labelnames, buckets)
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def register_stats(self, prefix, help_text, callback):
+        """Expose callback()'s numbers as gauges named prefix_<key>.
+
+        A nested {"kinds": {"feed": {"hits": 3}}} becomes prefix_hits{kind="feed"} 3.
+        """
+        with self._lock:
+            self._stats = [entry for entry in self._stats if entry[0] != prefix]
+            self._stats.append((prefix, help_text, callback))
+
+    def _render_stats(self, prefix, help_text, callback):
+        try:
+            stats = callback()
+        except Exception as e:
+            print(f"Metrics callback {prefix} failed: {str(e)}")
+            return []
+
+        gauges = {}
+        for key, value in stats.items():
+            if isinstance(value, bool) or value is None:
+                continue
+            if isinstance(value, (int, float)):
+                gauges.setdefault(f"{prefix}_{key}", []).append(("", value))
+            elif isinstance(value, dict):
+                label = key[:-1] if key.endswith("s") else key
+                for label_value, nested in value.items():
+                    if not isinstance(nested, dict):
+                        continue
+                    for nested_key, number in nested.items():
+                        if isinstance(number, (int, float)) and not isinstance(number, bool):
+                            labels = f'{{{label}="{_escape(label_value)}"}}'
+                            gauges.setdefault(f"{prefix}_{nested_key}", []).append((labels, number))
+
+        lines = []
+        for name, samples in gauges.items():
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+            lines += [f"{name}{labels} {_number(number)}" for labels, number in samples]
+        return lines
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            metrics, stats = list(self._metrics), list(self._stats)
+        lines = []
+        for metric in metrics:
+            lines += metric.render()
+        for prefix, help_text, callback in stats:
+            lines += self._render_stats(prefix, help_text, callback)
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "jobfit_stage_seconds", "Time spent in each request stage", ("stage",))
+LLM_SECONDS = REGISTRY.histogram(
+    "jobfit_llm_request_seconds", "LLM request latency", ("model", "operation"))
+LLM_REQUESTS = REGISTRY.counter(
+    "jobfit_llm_requests_total", "LLM requests by outcome", ("model", "operation", "outcome"))
+LLM_TOKENS = REGISTRY.counter(
+    "jobfit_llm_tokens_total", "LLM tokens; kind is prompt, completion or cached (cached prompt tokens)",
+    ("model", "operation", "kind"))
+HTTP_SECONDS = REGISTRY.histogram(
+    "jobfit_http_request_seconds", "HTTP request latency by route", ("method", "route", "status"))
+ADMISSION_WAIT = REGISTRY.histogram(
+    "jobfit_admission_wait_seconds", "Time admitted requests spent queued", ("route",))
+ADMISSION_REJECTED = REGISTRY.counter(
+    "jobfit_admission_rejected_total", "Requests shed with 429 by admission control", ("route", "reason"))
+IDEMPOTENT_REQUESTS = REGISTRY.counter(
+    "jobfit_idempotent_requests_total",
+    "POSTs with an idempotency key; outcome is executed, joined (shared a running request) or replayed",
+    ("route", "outcome"))
+
+
+@contextmanager
+def stage_timer(stage):
+    """Time the block as one `stage` (parse, storage_upload, signed_url, llm, db_write, render)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage)
+
+
+def timed(stage):
+    """Decorator form of stage_timer"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage_timer(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def usage_tokens(usage):
+    """(prompt, completion, cached) token counts from a Chat Completions or Responses API usage object"""
+    if usage is None:
+        return 0, 0, 0
+    prompt = getattr(usage, "prompt_tokens", None)
+    if prompt is None:
+        prompt = getattr(usage, "input_tokens", 0)
+    completion = getattr(usage, "completion_tokens", None)
+    if completion is None:
+        completion = getattr(usage, "output_tokens", 0)
+    details = getattr(usage, "prompt_tokens_details", None) or getattr(usage, "input_tokens_details", None)
+    cached = getattr(details, "cached_tokens", 0) if details is not None else 0
+    return prompt or 0, completion or 0, cached or 0
+
+
+class _LLMCall:
+    __slots__ = ("response",)
+
+    def __init__(self):
+        self.response = None
+
+    def record(self, response):
+        self.response = response
+        return response
+
+
+@contextmanager
+def llm_call(model, operation):
+    """Time an LLM request and count its tokens; pass the response to .record()"""
+    call = _LLMCall()
+    outcome = "error"
+    start = time.perf_counter()
+    try:
+        yield call
+        outcome = "ok"
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, "llm")
+        LLM_SECONDS.observe(elapsed, model, operation)
+        LLM_REQUESTS.inc(model, operation, outcome)
+        if call.response is not None:
+            prompt, completion, cached = usage_tokens(getattr(call.response, "usage", None))
+            LLM_TOKENS.inc(model, operation, "prompt", amount=prompt)
+            LLM_TOKENS.inc(model, operation, "completion", amount=completion)
+            if cached:
+                LLM_TOKENS.inc(model, operation, "cached", amount=cached)
+
+
+def register_stats(prefix, help_text, callback):
+    REGISTRY.register_stats(prefix, help_text, callback)
+
+
+def render():
+    return REGISTRY.render()
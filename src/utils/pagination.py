@@ -0,0 +1,35 @@
+import heapq
+
+
+def encode_cursor(item):
+    """Cursor pointing just after this feed item"""
+    return f"{item['created_at']}|{item['source_rank']}|{item['id']}"
+
+
+def decode_cursor(cursor):
+    """Parse a feed cursor into (created_at, source_rank, id), or None if invalid"""
+    if not cursor:
+        return None
+    try:
+        created_at, source_rank, item_id = cursor.rsplit("|", 2)
+        return created_at, int(source_rank), int(item_id)
+    except ValueError:
+        return None
+
+
+def feed_sort_key(item):
+    return item["created_at"], item["source_rank"], item["id"]
+
+
+def merge_feed_pages(pages, limit):
+    """K-way merge of per-source pages (each newest first) into one page.
+
+    Returns (items, next_cursor); next_cursor is None on the last page.
+    """
+    merged = heapq.merge(*pages, key=feed_sort_key, reverse=True)
+    items = []
+    for item in merged:
+        if len(items) == limit:
+            return items, encode_cursor(items[-1])
+        items.append(item)
+    return items, None
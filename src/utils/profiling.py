@@ -0,0 +1,170 @@
+"""Opt-in cProfile sampling of requests, keeping the slowest profiles for flamegraphs.
+
+A fraction of requests (or ones an admin flags) run under cProfile. The N
+slowest are kept in memory and rendered as collapsed stacks
+("root;caller;callee <microseconds>" per line), the input format of
+flamegraph.pl and speedscope.
+
+On Python 3.11 cProfile only sees the thread it runs on, so sync routes (which
+FastAPI runs on its thread pool) are wrapped with run_in_thread(): while a
+request is being profiled, its route gets a second profile on the worker
+thread, merged into the request's stats. Other requests interleaved on the
+event loop while the profiled one awaits are included too. Only one request
+is profiled at a time. cProfile records caller -> callee edges rather than
+whole stacks, so deeper stacks are reconstructed by splitting each function's
+time across its callers in proportion. That is the usual approximation for
+cProfile flamegraphs.
+"""
+import contextvars
+import cProfile
+import heapq
+import itertools
+import pstats
+import random
+import threading
+import time
+from collections import defaultdict
+
+MAX_STACK_DEPTH = 64
+# Edges below this share of the root's time are folded into their parent
+MIN_EDGE_FRACTION = 0.001
+
+
+class RequestProfiler:
+    def __init__(self, sample_rate=0.0, keep=20):
+        self.sample_rate = sample_rate
+        self.keep = keep
+        self._slowest = []  # min-heap of (seconds, id, entry)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._active = threading.Lock()
+        # The profile of the request this context belongs to; thread pool calls inherit it
+        self._current = contextvars.ContextVar("request_profile", default=None)
+        self.profiled = 0
+
+    def should_profile(self, forced=False):
+        return forced or (self.sample_rate > 0 and random.random() < self.sample_rate)
+
+    def start(self):
+        """A running cProfile.Profile, or None if another request is being profiled"""
+        if not self._active.acquire(blocking=False):
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler (a debugger, coverage) owns the hook
+            self._active.release()
+            return None
+        profile.thread_profiles = []
+        self._current.set(profile)
+        return profile
+
+    def run_in_thread(self, func, *args, **kwargs):
+        """Call func, profiling it on this thread if the calling request is being profiled"""
+        parent = self._current.get()
+        if parent is None:
+            return func(*args, **kwargs)
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+: the request's profile already covers every thread
+            return func(*args, **kwargs)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.disable()
+            parent.thread_profiles.append(profile)
+
+    def finish(self, profile, seconds, method, path, status_code):
+        """Stop the profile and keep it if it is among the slowest"""
+        profile.disable()
+        self._current.set(None)
+        self._active.release()
+        stats = pstats.Stats(profile)
+        for thread_profile in profile.thread_profiles:
+            stats.add(thread_profile)
+        entry = {
+            "id": next(self._ids),
+            "method": method,
+            "path": path,
+            "status": status_code,
+            "seconds": round(seconds, 6),
+            "started_at": time.time() - seconds,
+            "stats": stats.stats
+        }
+        with self._lock:
+            self.profiled += 1
+            item = (seconds, entry["id"], entry)
+            if len(self._slowest) < self.keep:
+                heapq.heappush(self._slowest, item)
+            elif seconds > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, item)
+
+    def profiles(self):
+        """Kept profiles without their stats, slowest first"""
+        with self._lock:
+            entries = [entry for _, _, entry in sorted(self._slowest, reverse=True)]
+        return [{key: value for key, value in entry.items() if key != "stats"} for entry in entries]
+
+    def collapsed(self, profile_id=None):
+        """Collapsed stacks of one kept profile, or of all of them merged; None if unknown"""
+        with self._lock:
+            entries = [entry for _, _, entry in self._slowest if profile_id is None or entry["id"] == profile_id]
+        if profile_id is not None and not entries:
+            return None
+
+        totals = defaultdict(float)
+        for entry in entries:
+            for stack, seconds in collapsed_stacks(entry["stats"]).items():
+                totals[stack] += seconds
+        return "".join(
+            f"{stack} {int(seconds * 1_000_000)}\n"
+            for stack, seconds in sorted(totals.items()) if seconds * 1_000_000 >= 1
+        )
+
+    def clear(self):
+        with self._lock:
+            self._slowest = []
+
+
+def _label(func):
+    filename, line, name = func
+    if filename == "~":
+        return name  # built-ins such as <built-in method time.sleep>
+    module = filename.rsplit("/site-packages/", 1)[-1].rsplit("/src/", 1)[-1]
+    return f"{name} ({module}:{line})"
+
+
+def collapsed_stacks(stats):
+    """{"a;b;c": seconds} from a pstats stats dict"""
+    children = defaultdict(list)
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            children[caller].append((func, edge[3]))
+
+    roots = [func for func, data in stats.items() if not data[4]]
+    total = sum(stats[root][3] for root in roots) or 1.0
+    stacks = defaultdict(float)
+
+    def walk(func, stack, seconds, on_stack):
+        stack = stack + (_label(func),)
+        _, _, own_time, cumulative_time, _ = stats[func]
+        scale = seconds / cumulative_time if cumulative_time else 0.0
+        self_seconds = own_time * scale
+
+        if func in on_stack or len(stack) >= MAX_STACK_DEPTH:
+            stacks[";".join(stack)] += seconds
+            return
+        for child, edge_cumulative in children.get(func, ()):
+            child_seconds = edge_cumulative * scale
+            if child_seconds < total * MIN_EDGE_FRACTION:
+                self_seconds += child_seconds
+            else:
+                walk(child, stack, child_seconds, on_stack | {func})
+        stacks[";".join(stack)] += self_seconds
+
+    for root in roots:
+        walk(root, (), stats[root][3], frozenset())
+    return dict(stacks)
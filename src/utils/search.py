@@ -0,0 +1,38 @@
+import re
+
+from markupsafe import Markup, escape
+
+# Control characters the databases wrap matched terms in. They can't come from
+# the HTML forms, so the snippet can be escaped first and marked up after.
+SNIPPET_START = "\x02"
+SNIPPET_END = "\x03"
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def search_terms(text):
+    """Split a search box value into words"""
+    return _WORD_RE.findall(text or "")
+
+
+def fts5_query(text):
+    """Turn free text into an FTS5 MATCH expression.
+
+    Every word is quoted (so FTS5 operators typed by the user are just
+    words) and all must match; the last one also matches as a prefix.
+    Returns None if there is nothing to search for.
+    """
+    terms = search_terms(text)
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def highlight_snippet(snippet):
+    """HTML-escape a database snippet and turn its match markers into <mark> tags"""
+    if not snippet:
+        return Markup("")
+    html = str(escape(snippet))
+    return Markup(html.replace(SNIPPET_START, "<mark>").replace(SNIPPET_END, "</mark>"))
@@ -0,0 +1,57 @@
+from src.services.activity_cache import UserActivityCache
+
+
+def test_lookup_store_and_hit_rate():
+    """Test a miss, a fill and a hit"""
+    cache = UserActivityCache()
+    value, token = cache.lookup("analysis", "u1", 7)
+    assert value is None
+    cache.store("analysis", "u1", 7, {"id": 7}, token)
+
+    assert cache.lookup("analysis", "u1", 7)[0] == {"id": 7}
+    stats = cache.stats()
+    assert stats["kinds"]["analysis"] == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+def test_invalidate_drops_only_that_user():
+    """Test that a write for one user leaves other users cached"""
+    cache = UserActivityCache()
+    for user_id in ("u1", "u2"):
+        _, token = cache.lookup("latest", user_id)
+        cache.store("latest", user_id, None, 42, token)
+
+    cache.invalidate("u1", ("latest",))
+    assert cache.lookup("latest", "u1")[0] is None
+    assert cache.lookup("latest", "u2")[0] == 42
+
+
+def test_read_racing_a_write_is_not_stored():
+    """Test that data fetched before an invalidation is not cached"""
+    cache = UserActivityCache()
+    _, token = cache.lookup("feed", "u1", (None, 20))
+    cache.invalidate("u1")
+    cache.store("feed", "u1", (None, 20), [["stale"]], token)
+    assert cache.lookup("feed", "u1", (None, 20))[0] is None
+
+
+def test_update_analysis_writes_through():
+    """Test that an update changes the cached analysis and drops feed pages"""
+    cache = UserActivityCache()
+    _, token = cache.lookup("analysis", "u1", 7)
+    cache.store("analysis", "u1", 7, {"id": 7, "improved_cv_path": None}, token)
+    _, token = cache.lookup("feed", "u1", (None, 20))
+    cache.store("feed", "u1", (None, 20), [[]], token)
+
+    cache.update_analysis("u1", 7, {"improved_cv_path": "u1/improved.docx"})
+    assert cache.lookup("analysis", "u1", 7)[0]["improved_cv_path"] == "u1/improved.docx"
+    assert cache.lookup("feed", "u1", (None, 20))[0] is None
+
+
+def test_feed_pages_are_bounded_per_user():
+    """Test that only the most recent feed pages are kept"""
+    cache = UserActivityCache(max_pages=2)
+    for page in range(3):
+        _, token = cache.lookup("feed", "u1", page)
+        cache.store("feed", "u1", page, [[page]], token)
+    assert cache.lookup("feed", "u1", 0)[0] is None
+    assert cache.lookup("feed", "u1", 2)[0] == [[2]]
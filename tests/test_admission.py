@@ -0,0 +1,146 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.models.user import TokenUser
+from src.utils.admission import AdmissionController, Rejected
+
+
+def test_queued_requests_get_slots_in_order():
+    """Test the global limit queues requests FIFO and sheds when the queue is full"""
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, per_user_in_flight=0, user_rate=0, max_queue=2,
+                                         queue_timeout=5, initial_service_time=0.1)
+        await controller.acquire("a")
+        order = []
+
+        async def request(user_id):
+            await controller.acquire(user_id)
+            order.append(user_id)
+
+        waiters = [asyncio.create_task(request(user_id)) for user_id in ("b", "c")]
+        await asyncio.sleep(0)
+        assert controller.stats()["queued"] == 2
+        with pytest.raises(Rejected) as rejected:
+            await controller.acquire("d")
+        assert rejected.value.reason == "queue_full"
+
+        controller.release("a", 0.1)
+        await waiters[0]
+        controller.release("b", 0.1)
+        await waiters[1]
+        controller.release("c", 0.1)
+        assert order == ["b", "c"]
+        assert (controller.in_flight, controller.stats()["queued"], controller.admitted) == (0, 0, 3)
+
+    asyncio.run(scenario())
+
+
+def test_deadline_shedding():
+    """Test queued requests are shed at the deadline, or up front when the expected wait is too long"""
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, per_user_in_flight=0, user_rate=0, max_queue=10,
+                                         queue_timeout=0.05, initial_service_time=0.01)
+        await controller.acquire("a")
+        with pytest.raises(Rejected) as rejected:
+            await controller.acquire("b")
+        assert rejected.value.reason == "deadline" and rejected.value.retry_after >= 1
+        assert controller.stats()["queued"] == 0
+
+        controller.service_time = 1.0  # slow requests: a queued one could not start in time
+        with pytest.raises(Rejected) as rejected:
+            await controller.acquire("c")
+        assert rejected.value.reason == "deadline"
+
+        controller.release("a")
+        assert controller.in_flight == 0 and controller.stats()["active_users"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_per_user_limits():
+    """Test one user's concurrency and rate quota don't affect other users"""
+    async def scenario():
+        controller = AdmissionController(max_in_flight=10, per_user_in_flight=1, user_rate=2, user_burst=2)
+        await controller.acquire("greedy")
+        with pytest.raises(Rejected) as rejected:
+            await controller.acquire("greedy")
+        assert rejected.value.reason == "user_concurrency"
+        controller.release("greedy")
+
+        await controller.acquire("greedy")
+        controller.release("greedy")
+        with pytest.raises(Rejected) as rejected:
+            await controller.acquire("greedy")
+        assert rejected.value.reason == "rate" and 25 <= rejected.value.retry_after <= 30
+
+        await controller.acquire("other")
+        controller.release("other")
+
+    asyncio.run(scenario())
+
+
+def test_shed_requests_get_429_with_retry_after(monkeypatch):
+    """Test the middleware answers over-quota LLM requests with 429, Retry-After and a metric"""
+    from src import main
+    from src.utils.metrics import ADMISSION_REJECTED
+
+    user = TokenUser("user-1", "user@example.com")
+    controller = AdmissionController(max_in_flight=4, user_rate=1, user_burst=1)
+    asyncio.run(controller.acquire(user.id))
+    controller.release(user.id)
+    monkeypatch.setattr(main, "_admission", controller)
+    monkeypatch.setattr(main, "get_current_user", lambda token: user if token else None)
+
+    before = ADMISSION_REJECTED.value("/generate-cv", "rate")
+    client = TestClient(main.app)
+    response = client.post("/generate-cv", data={"name": "A"}, cookies={"access_token": "token"})
+    assert response.status_code == 429
+    assert 55 <= int(response.headers["retry-after"]) <= 60
+    assert "try again" in response.text
+    assert ADMISSION_REJECTED.value("/generate-cv", "rate") == before + 1
+
+    # Requests that aren't LLM-heavy are not limited
+    assert client.get("/login").status_code == 200
+
+
+def test_admitted_routes_run_concurrently(monkeypatch, tmp_path):
+    """Test slow LLM calls in admitted routes overlap instead of blocking the event loop"""
+    import time
+
+    import httpx
+
+    from src import main
+
+    llm_seconds = 0.3
+
+    def slow_modify_cv(cv_text, suggestions, filename):
+        time.sleep(llm_seconds)  # a blocking OpenAI call
+        path = tmp_path / f"{time.perf_counter_ns()}.docx"
+        path.write_bytes(b"docx")
+        return str(path), "improved"
+
+    controller = AdmissionController(max_in_flight=4, per_user_in_flight=0, user_rate=0,
+                                     initial_service_time=llm_seconds)
+    monkeypatch.setattr(main, "_admission", controller)
+    monkeypatch.setattr(main, "get_current_user", lambda token: TokenUser("user-1", "user@example.com"))
+    monkeypatch.setattr(main, "modify_cv", slow_modify_cv)
+    monkeypatch.setattr(main, "upload_file", lambda *args: {"success": True, "path": "user-1/improved.docx"})
+    monkeypatch.setattr(main, "get_file_url", lambda *args: {"success": True, "url": "http://files/improved.docx"})
+    monkeypatch.setattr(main, "update_latest_analysis_improved_cv", lambda *args: {"success": True})
+
+    async def scenario():
+        form = {"cv_text": "CV", "filename": "cv.docx", "original_cv_path": "p", "suggestions": ["Add metrics"]}
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test",
+                                     cookies={"access_token": "token"}) as client:
+            start = time.perf_counter()
+            responses = await asyncio.gather(*(client.post("/process-changes", data=form) for _ in range(4)))
+            return time.perf_counter() - start, responses
+
+    elapsed, responses = asyncio.run(scenario())
+    assert all(response.status_code == 200 and "improved" in response.text for response in responses)
+    assert elapsed < 2 * llm_seconds
+    assert controller.service_time < 2 * llm_seconds
+    assert controller.in_flight == 0
@@ -0,0 +1,25 @@
+import pytest
+
+from scripts.backfill_analysis_jsonb import decode_value
+from src.services.database import _as_list
+
+
+def test_as_list_reads_legacy_and_native_values():
+    """Test list columns read the same from native arrays, JSON strings and bad legacy values"""
+    assert _as_list(["Python", "SQL"]) == ["Python", "SQL"]
+    assert _as_list('["Python", "SQL"]') == ["Python", "SQL"]
+    assert _as_list("Python, SQL") == []
+    assert _as_list('{"skill": "Python"}') == []
+    assert _as_list(None) == []
+
+
+def test_backfill_decodes_json_strings_and_keeps_the_rest():
+    """Test the backfill converts JSON strings, skips native lists and refuses to blank bad values"""
+    assert decode_value('["Python", "SQL"]') == ["Python", "SQL"]
+    assert decode_value("") == []
+    assert decode_value(["Python"]) is None
+    assert decode_value(None) is None
+
+    for legacy in ("Python, SQL", '{"skill": "Python"}'):
+        with pytest.raises(ValueError):
+            decode_value(legacy)
@@ -0,0 +1,24 @@
+from benchmarks.bench_hot_paths import compare
+from benchmarks.corpus import build_corpus, cv_markup
+from src.services.file_parser import parse_file
+
+
+def test_corpus_documents_parse_back_to_the_cv(tmp_path):
+    """Test the generated PDF and DOCX extract to the CV's text and sizes grow"""
+    corpus = build_corpus(str(tmp_path), ("small", "large"))
+    for entry in corpus.values():
+        expected = [line.lstrip("• ") for line in entry["text"].splitlines() if line]
+        for path in (entry["pdf"], entry["docx"]):
+            # Word bullets are list formatting, not a character in the text
+            assert [line.strip().lstrip("• ") for line in parse_file(path).splitlines() if line.strip()] == expected
+    assert len(corpus["large"]["markup"]) > 5 * len(corpus["small"]["markup"])
+    assert cv_markup("medium", seed=3) == cv_markup("medium", seed=3) != cv_markup("medium", seed=4)
+
+
+def test_compare_flags_regressions():
+    """Test slower or bigger cases beyond the threshold are flagged"""
+    baseline = {"a[small]": {"median_ms": 10.0, "peak_kb": 100.0}, "b[small]": {"median_ms": 10.0, "peak_kb": 100.0}}
+    current = {"a[small]": {"median_ms": 10.5, "peak_kb": 100.0}, "b[small]": {"median_ms": 9.0, "peak_kb": 130.0},
+               "c[small]": {"median_ms": 1.0, "peak_kb": 1.0}}
+    rows = {key: regressed for key, _, _, regressed in compare(current, baseline, threshold=0.10)}
+    assert rows == {"a[small]": False, "b[small]": True}
@@ -0,0 +1,64 @@
+import io
+
+from docx import Document
+
+from src.services import cover_letter_generator as generator
+from src.services.cover_letter_generator import fill_placeholders, parse_targets, tailorable_paragraph
+
+BASE_LETTER = """Dear [HIRING_MANAGER],
+
+I am applying for the [POSITION] role. I built pipelines processing 500GB daily.
+
+I admire how [COMPANY_NAME] works, and I would bring the same care to [COMPANY_NAME].
+
+Sincerely,
+Jane Doe"""
+
+USER_INFO = {"name": "Jane Doe", "email": "jane@example.com", "phone": "", "linkedin": ""}
+
+
+def test_fill_placeholders_only_known_values():
+    """Test placeholders are filled from values and unknown ones are left alone"""
+    text = "[DATE] [COMPANY_NAME] [POSITION] [HIRING_MANAGER] [OTHER]"
+    assert fill_placeholders(text, {"DATE": "May 1", "COMPANY_NAME": "Acme"}) == \
+        "May 1 Acme [POSITION] [HIRING_MANAGER] [OTHER]"
+
+
+def test_parse_targets_defaults():
+    """Test target lines: blank lines skipped, position defaults, extra pipes kept in notes"""
+    targets = parse_targets("Acme | Data Engineer | Ann | likes Spark | and Kafka\n\nBeta\n | no company", "Engineer")
+    assert targets == [
+        {"company_name": "Acme", "position": "Data Engineer", "hiring_manager": "Ann",
+         "notes": "likes Spark | and Kafka"},
+        {"company_name": "Beta", "position": "Engineer", "hiring_manager": "", "notes": ""},
+    ]
+
+
+def test_tailorable_paragraph_skips_greeting_and_signoff():
+    """Test the company paragraph is picked, never the first or last"""
+    assert tailorable_paragraph(BASE_LETTER.split("\n\n")) == 2
+    assert tailorable_paragraph(["Dear [COMPANY_NAME],", "Body", "Bye"]) is None
+
+
+def test_generate_cover_letters_one_base_letter(monkeypatch):
+    """Test one generation serves every target and each DOCX has its own company"""
+    generator._base_letters.clear()
+    calls = []
+    monkeypatch.setattr(generator, "generate_cover_letter", lambda *args, **kwargs: calls.append(args) or BASE_LETTER)
+    monkeypatch.setattr(generator, "tailor_paragraph", lambda paragraph, target: f"Tailored for {target['company_name']}.")
+
+    targets = parse_targets("Acme | Data Engineer | Ann\nBeta Corp", "Engineer")
+    letters = generator.generate_cover_letters("resume", "job", USER_INFO, targets, tailor=True)
+    generator.generate_cover_letters("resume", "job", USER_INFO, targets)
+
+    assert len(calls) == 1
+    assert [letter["filename"] for letter in letters] == [
+        "Jane_Doe_cover_letter_Acme.docx", "Jane_Doe_cover_letter_Beta_Corp.docx"
+    ]
+    assert "Dear Ann," in letters[0]["text"] and "Dear Hiring Manager," in letters[1]["text"]
+    assert "Tailored for Beta Corp." in letters[1]["text"] and "[" not in letters[1]["text"]
+
+    paragraphs = [p.text for p in Document(io.BytesIO(letters[0]["data"])).paragraphs]
+    assert paragraphs[0].startswith("Jane Doe")
+    assert "I am applying for the Data Engineer role. I built pipelines processing 500GB daily." in paragraphs
+    assert "Sincerely,\nJane Doe" in paragraphs
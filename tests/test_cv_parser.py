@@ -0,0 +1,96 @@
+from src.models.cv import StructuredCV
+from src.services.ai_analizer import build_prompt
+from src.services.cv_parser import get_structured_cv, parse_cv_text, content_hash
+
+PDF_TEXT = """JOHN SMITH
+john@example.com | +1 (555) 123-4567 | linkedin.com/in/john
+PROFESSIONAL SUMMARY
+Data engineer with 6 years of experience.
+EXPERIENCE
+Data Engineer at TechCorp (2021-Present)
+- Built ETL pipelines
+- Used Python and SQL
+Analyst, Beta Ltd, 2018 - 2021
+Built dashboards
+EDUCATION
+BSc Computer Science, State University, 2018
+SKILLS
+Languages: python, js, SQL
+Tools: Docker, k8s, docker
+"""
+
+
+def test_parse_contact_sections_and_roles():
+    """Test contact details, section kinds and roles with their bullets"""
+    cv = parse_cv_text(PDF_TEXT)
+
+    assert (cv.contact.name, cv.contact.email, cv.contact.phone) == ("JOHN SMITH", "john@example.com", "+1 (555) 123-4567")
+    assert cv.contact.links == ("linkedin.com/in/john",)
+    assert [(s.title, s.kind) for s in cv.sections] == [
+        ("PROFESSIONAL SUMMARY", "summary"), ("EXPERIENCE", "experience"), ("EDUCATION", "education"), ("SKILLS", "skills")
+    ]
+    assert [(role.title, role.bullets) for role in cv.roles] == [
+        ("Data Engineer at TechCorp (2021-Present)", ["Built ETL pipelines", "Used Python and SQL"]),
+        ("Analyst, Beta Ltd, 2018 - 2021", ["Built dashboards"]),
+    ]
+
+
+def test_skills_are_normalized():
+    """Test skill aliases are canonicalized and duplicates dropped, keeping category labels"""
+    cv = parse_cv_text(PDF_TEXT)
+
+    assert cv.skills == ["Python", "JavaScript", "SQL", "Docker", "Kubernetes"]
+    assert cv.sections[-1].lines == ["Languages: Python, JavaScript, SQL", "Tools: Docker, Kubernetes"]
+
+
+def test_to_prompt_only_requested_fields():
+    """Test prompts include only the requested fields and cap bullets"""
+    text = parse_cv_text(PDF_TEXT).to_prompt(("experience", "skills"), max_bullets=1)
+
+    assert "john@example.com" not in text and "State University" not in text
+    assert "Built ETL pipelines" in text and "Used Python and SQL" not in text
+    assert "Tools: Docker, Kubernetes" in text
+
+
+def test_unstructured_cv_falls_back_to_raw_text():
+    """Test a CV without headings is sent to prompts unchanged"""
+    raw = "Jane Doe, engineer since 2015, knows Python and SQL"
+    assert parse_cv_text(raw).is_structured is False
+    assert raw in build_prompt(raw, "Data Engineer")
+
+
+def test_structured_cv_cached_across_line_endings():
+    """Test the parse is shared when a form post turns \\n into \\r\\n"""
+    cv = get_structured_cv(PDF_TEXT)
+
+    assert isinstance(cv, StructuredCV)
+    assert get_structured_cv(PDF_TEXT.replace("\n", "\r\n")) is cv
+    assert cv.content_hash == content_hash(PDF_TEXT)
+
+
+def test_to_prompt_keeps_every_source_line():
+    """Test rendering a parsed CV loses no header text, role or bullet"""
+    text = """Jane Doe
+jane@example.com | +44 7700 900123 | London, UK | janedoe.dev | github.com/janedoe
+Backend engineer who likes boring technology
+Experience
+Senior Engineer | Acme | 2020-Present
+- Ran the payments platform
+Lead at Foo Inc. (2 years)
+- Hired and led a team of four
+Education
+BSc Physics, Leeds, 2014
+Skills
+Python, SQL, Docker
+"""
+    cv = parse_cv_text(text)
+    rendered = cv.to_prompt().lower()
+
+    assert [role.title for role in cv.roles] == ["Senior Engineer | Acme | 2020-Present", "Lead at Foo Inc. (2 years)"]
+    for line in text.splitlines():
+        for piece in line.lstrip("- ").split(" | "):
+            assert piece.strip().lower() in rendered, piece
+
+    # The modifier rewrites the CV as uploaded, not the structured view
+    from src.services.cv_modifier import build_modification_prompt
+    assert text in build_modification_prompt(text, ["Quantify impact"])
@@ -0,0 +1,48 @@
+import io
+import zipfile
+
+from docx import Document
+
+from src.services.docx_renderer import tokenize, tokenize_line, render_markup, new_document
+
+
+def test_tokenize_line_bold_runs():
+    """Test bold markers split a line into runs"""
+    assert tokenize_line("Built **ETL** pipelines") == [("Built ", False), ("ETL", True), (" pipelines", False)]
+    assert tokenize_line("**Engineer** | 2021") == [("Engineer", True), (" | 2021", False)]
+    assert tokenize_line("unclosed **bold") == [("unclosed **bold", False)]
+
+
+def test_tokenize_blocks():
+    """Test headings, bullets and paragraphs; blank lines are skipped"""
+    text = "**HEADING: SKILLS**\n\n• Python\nplain line\n"
+    assert tokenize(text) == [
+        ("heading", [("SKILLS", True)]),
+        ("bullet", [("Python", False)]),
+        ("paragraph", [("plain line", False)]),
+    ]
+
+
+def test_render_markup_round_trip():
+    """Test the rendered DOCX opens with python-docx and keeps styles and formatting"""
+    data = render_markup("**HEADING: A & <B>**\n• Built **ETL**\nText\x01 here", heading_color="000000")
+    assert zipfile.ZipFile(io.BytesIO(data)).testzip() is None
+
+    paragraphs = Document(io.BytesIO(data)).paragraphs
+    assert [p.style.name for p in paragraphs] == ["Heading 1", "List Bullet", "Normal"]
+    heading = paragraphs[0].runs[0]
+    assert heading.text == "A & <B>" and heading.bold and heading.font.size.pt == 16
+    assert [(run.text, bool(run.bold)) for run in paragraphs[1].runs] == [("Built ", False), ("ETL", True)]
+    assert paragraphs[2].text == "Text here"
+
+
+def test_render_is_deterministic():
+    """Test identical markup renders to identical bytes (so uploads deduplicate)"""
+    assert render_markup("• same") == render_markup("• same")
+
+
+def test_new_document_is_independent_copy():
+    """Test documents from the template don't share content"""
+    first = new_document()
+    first.add_paragraph("only here")
+    assert new_document().paragraphs == []
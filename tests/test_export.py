@@ -0,0 +1,60 @@
+import csv
+import io
+import json
+import zipfile
+
+from src.services import export
+from src.services.storage_backends import LocalStorageBackend
+
+ANALYSES = [
+    {"id": 1, "created_at": "2025-03-01T10:00:00+00:00", "match_score": 80, "job_description": "Data engineer",
+     "missing_skills": ["AWS", "Kafka"], "original_cv_path": "u1/abc/resume.pdf", "improved_cv_path": "u1/def/resume.docx"},
+    {"id": 2, "created_at": "2025-03-02T10:00:00+00:00", "match_score": 60, "job_description": "Analyst",
+     "missing_skills": [], "original_cv_path": "u1/abc/resume.pdf", "improved_cv_path": "u2/other.docx"},
+]
+CVS = [{"created_at": "2025-03-03T10:00:00+00:00", "cv_file_path": "u1/ghi/resume.docx"}]
+LETTERS = [{"created_at": "2025-03-04T10:00:00+00:00", "cover_letter_file_path": "u1/gone/letter.docx"}]
+
+
+def run_export(monkeypatch, tmp_path):
+    backend = LocalStorageBackend(str(tmp_path), "test-secret")
+    backend.upload("u1/abc/resume.pdf", b"%PDF original")
+    backend.upload("u1/def/resume.docx", b"improved")
+    backend.upload("u1/ghi/resume.docx", b"generated")
+
+    monkeypatch.setattr(export, "get_storage_backend", lambda access_token=None: backend)
+    monkeypatch.setattr(export, "get_user_analyses", lambda user_id: ANALYSES)
+    monkeypatch.setattr(export, "get_user_generated_cvs", lambda user_id: CVS)
+    monkeypatch.setattr(export, "get_user_cover_letters", lambda user_id: LETTERS)
+    monkeypatch.setattr(export, "EXPORT_CONCURRENCY", 2)
+
+    chunks = list(export.iter_user_export("u1"))
+    return chunks, zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+
+
+def test_export_archive_contents(monkeypatch, tmp_path):
+    """Test files are exported once each, other users' paths are skipped and missing files are listed"""
+    chunks, archive = run_export(monkeypatch, tmp_path)
+
+    assert len(chunks) > 1
+    assert archive.testzip() is None
+    assert sorted(archive.namelist()) == [
+        "analyses.csv", "analyses.ndjson", "analyses/improved/resume.docx", "analyses/original/resume.pdf",
+        "cvs/resume.docx", "missing_files.txt"
+    ]
+    assert archive.read("analyses/original/resume.pdf") == b"%PDF original"
+    assert archive.read("cvs/resume.docx") == b"generated"
+    assert archive.read("missing_files.txt") == b"u1/gone/letter.docx\n"
+    assert archive.getinfo("cvs/resume.docx").date_time == (2025, 3, 3, 10, 0, 0)
+
+
+def test_export_analysis_rows(monkeypatch, tmp_path):
+    """Test the analysis history is dumped as NDJSON and CSV"""
+    _, archive = run_export(monkeypatch, tmp_path)
+
+    rows = [json.loads(line) for line in archive.read("analyses.ndjson").splitlines()]
+    assert [row["id"] for row in rows] == [1, 2]
+
+    table = list(csv.DictReader(io.StringIO(archive.read("analyses.csv").decode("utf-8"))))
+    assert table[0]["missing_skills"] == "AWS; Kafka"
+    assert table[1]["match_score"] == "60"
@@ -0,0 +1,38 @@
+import pytest
+
+from src.utils.http import parse_range_header, etag_matches
+
+
+def test_parse_simple_range():
+    """Test a closed byte range"""
+    assert parse_range_header("bytes=0-99", 1000) == (0, 99)
+
+
+def test_parse_open_and_suffix_ranges():
+    """Test open-ended and suffix ranges"""
+    assert parse_range_header("bytes=900-", 1000) == (900, 999)
+    assert parse_range_header("bytes=-100", 1000) == (900, 999)
+    assert parse_range_header("bytes=0-5000", 1000) == (0, 999)
+
+
+def test_ignored_ranges_fall_back_to_full_file():
+    """Test that ranges we don't serve partially return None"""
+    assert parse_range_header(None, 1000) is None
+    assert parse_range_header("bytes=0-1,5-6", 1000) is None
+    assert parse_range_header("items=0-1", 1000) is None
+    assert parse_range_header("bytes=abc", 1000) is None
+
+
+def test_unsatisfiable_range():
+    """Test that a range past the end raises ValueError"""
+    with pytest.raises(ValueError):
+        parse_range_header("bytes=1000-", 1000)
+
+
+def test_etag_matches():
+    """Test weak ETag comparison"""
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc", "def"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"xyz"', '"abc"')
+    assert not etag_matches(None, '"abc"')
@@ -0,0 +1,161 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+from starlette.responses import HTMLResponse, StreamingResponse
+
+from src.models.user import TokenUser
+from src.utils.idempotency import IdempotencyCache
+
+
+def test_concurrent_duplicates_share_one_run_and_later_ones_replay():
+    """Test duplicates while a request runs join it, and later ones get the stored response"""
+    async def scenario():
+        cache = IdempotencyCache(ttl=60)
+        calls = []
+
+        async def execute():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return StreamingResponse(iter([b"<h1>", b"Done</h1>"]), media_type="text/html")
+
+        results = await asyncio.gather(*(cache.run(("user-1", "/analyze", "k"), execute) for _ in range(3)))
+        assert len(calls) == 1
+        assert sorted(outcome for _, outcome in results) == ["executed", "joined", "joined"]
+        assert all(response.body == b"<h1>Done</h1>" for response, _ in results)
+
+        response, outcome = await cache.run(("user-1", "/analyze", "k"), execute)
+        assert outcome == "replayed" and response.headers["idempotent-replayed"] == "true"
+        assert response.headers["content-type"].startswith("text/html") and len(calls) == 1
+
+        # Another user with the same key runs their own request
+        _, outcome = await cache.run(("user-2", "/analyze", "k"), execute)
+        assert outcome == "executed" and len(calls) == 2
+        assert cache.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_errors_are_not_replayed():
+    """Test error pages and failed runs are not stored, so a retry runs again"""
+    async def scenario():
+        cache = IdempotencyCache(ttl=60)
+
+        async def error_page():
+            return HTMLResponse("<p>Error: OpenAI timed out</p>")
+
+        async def crash():
+            raise RuntimeError("boom")
+
+        for _ in range(2):
+            _, outcome = await cache.run("a", error_page)
+            assert outcome == "executed"
+
+        for _ in range(2):
+            try:
+                await cache.run("b", crash)
+            except RuntimeError:
+                pass
+        assert cache.stats()["size"] == 0 and cache.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_waiters_rerun_a_failed_request_once():
+    """Test duplicates waiting on a request that fails elect one of them to run it again"""
+    async def scenario():
+        cache = IdempotencyCache(ttl=60)
+        calls = []
+
+        async def execute():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            if len(calls) == 1:
+                raise RuntimeError("OpenAI timed out")
+            return HTMLResponse("<h1>Done</h1>")
+
+        results = await asyncio.gather(*(cache.run("k", execute) for _ in range(4)), return_exceptions=True)
+        assert len(calls) == 2
+        assert sum(isinstance(result, RuntimeError) for result in results) == 1
+        outcomes = sorted(result[1] for result in results if not isinstance(result, Exception))
+        assert outcomes == ["executed", "joined", "joined"]
+        assert cache.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_double_submit_runs_route_once(monkeypatch, tmp_path):
+    """Test the middleware replays a resubmitted form instead of generating the CV again"""
+    from src import main
+    from src.utils.metrics import IDEMPOTENT_REQUESTS
+
+    user = TokenUser("user-1", "user@example.com")
+    generated = []
+
+    def fake_generate_cv_file(text, filename):
+        path = tmp_path / filename
+        path.write_text(text)
+        return str(path)
+
+    monkeypatch.setattr(main, "_idempotency", IdempotencyCache(ttl=60))
+    monkeypatch.setattr(main, "get_current_user", lambda token: user if token else None)
+    monkeypatch.setattr(main, "build_cv_from_info", lambda data: generated.append(data) or "**HEADING: A**")
+    monkeypatch.setattr(main, "generate_cv_file", fake_generate_cv_file)
+    monkeypatch.setattr(main, "upload_file", lambda *args: {"success": True, "path": "user-1/cv.docx"})
+    monkeypatch.setattr(main, "save_generated_cv", lambda **kwargs: {"success": True})
+
+    form = {"name": "A B", "email": "a@example.com", "phone": "1", "summary": "S", "skills": "Python"}
+    before = IDEMPOTENT_REQUESTS.value("/generate-cv", "replayed")
+    client = TestClient(main.app)
+    first = client.post("/generate-cv?idempotency_key=form-1", data=form, cookies={"access_token": "token"})
+    second = client.post("/generate-cv?idempotency_key=form-1", data=form, cookies={"access_token": "token"})
+    assert first.status_code == second.status_code == 200
+    assert second.text == first.text and second.headers["idempotent-replayed"] == "true"
+    assert len(generated) == 1
+    assert IDEMPOTENT_REQUESTS.value("/generate-cv", "replayed") == before + 1
+
+    # A fresh key (a new form) generates again
+    client.post("/generate-cv", data=form, headers={"Idempotency-Key": "form-2"}, cookies={"access_token": "token"})
+    assert len(generated) == 2
+
+    # A form restored from history and edited keeps its key but is a new submission
+    edited = client.post("/generate-cv?idempotency_key=form-1", data={**form, "skills": "Go"},
+                         cookies={"access_token": "token"})
+    assert "idempotent-replayed" not in edited.headers
+    assert len(generated) == 3 and generated[-1]["skills"] == "Go"
+
+
+def test_multipart_fingerprint_ignores_the_boundary():
+    """Test two submissions of the same upload form match although their boundaries differ"""
+    from src.utils.idempotency import body_fingerprint
+
+    def multipart(boundary, job_description):
+        body = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"job_description\"\r\n\r\n"
+                f"{job_description}\r\n--{boundary}--\r\n").encode()
+        return body, f"multipart/form-data; boundary={boundary}"
+
+    first = body_fingerprint(*multipart("----WebKitFormBoundaryA1", "Data engineer"))
+    assert body_fingerprint(*multipart("----WebKitFormBoundaryZ9", "Data engineer")) == first
+    assert body_fingerprint(*multipart("----WebKitFormBoundaryZ9", "Pastry chef")) != first
+
+
+def test_forms_carry_a_fresh_key():
+    """Test the expensive forms render a new idempotency key each time"""
+    from src import main
+
+    user = TokenUser("user-1", "user@example.com")
+    template = main.templates.env.get_template("create.html")
+    first = template.render(request=None, user=user)
+    second = template.render(request=None, user=user)
+    assert 'action="/generate-cv?idempotency_key=' in first
+    assert first != second
+
+
+def test_form_pages_are_not_stored(monkeypatch):
+    """Test the form pages opt out of caching so history navigation renders a new key"""
+    from src import main
+
+    monkeypatch.setattr(main, "get_current_user", lambda token: TokenUser("user-1", "user@example.com"))
+    client = TestClient(main.app)
+    for path in ("/upload", "/create", "/cover-letter"):
+        response = client.get(path, cookies={"access_token": "token"})
+        assert response.status_code == 200 and response.headers["cache-control"] == "no-store"
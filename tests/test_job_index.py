@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from src.services import database
+from src.services.job_index import JobIndex, vectorize
+from src.services.repository import SqlRepository, set_repository
+
+POSTING = ("Senior Data Engineer at Acme. Build batch and streaming pipelines with Python, Spark and Airflow. "
+           "5+ years of experience with AWS, SQL and data modelling. Remote friendly.")
+REPOSTED = POSTING.replace("Remote friendly.", "Remote friendly, apply today!")
+UNRELATED = "Pastry chef wanted for a busy bakery. Croissants, sourdough and wedding cakes."
+
+
+def test_vectors_are_unit_length_and_similar_for_reposts():
+    """Test vectors are normalized and a lightly edited posting stays close"""
+    vectors = vectorize([POSTING, REPOSTED, UNRELATED, ""], 2048)
+
+    assert np.allclose(np.linalg.norm(vectors[:3], axis=1), 1.0, atol=1e-5)
+    assert not vectors[3].any()
+    assert vectors[0] @ vectors[1] > 0.9
+    assert vectors[0] @ vectors[2] < 0.2
+
+
+def test_search_batched_top_k_and_incremental_append():
+    """Test lazy loading, appends past the initial capacity and batched top-k order"""
+    loaded = [{"id": 1, "user_id": "u1", "job_description": UNRELATED}]
+    index = JobIndex(lambda user_id: loaded if user_id == "u1" else [], dims=1024)
+
+    assert [row["id"] for _, row in index.search("u1", [POSTING], k=3)[0]] == [1]
+    index.append([{"id": n, "user_id": "u1", "job_description": f"Data engineer job {n} {POSTING}"} for n in range(2, 40)])
+    index.append([{"id": 2, "user_id": "u1", "job_description": "already indexed"}])
+    index.append([{"id": 99, "user_id": "u2", "job_description": POSTING}])
+
+    results = index.search("u1", [POSTING, UNRELATED], k=3)
+    assert [len(found) for found in results] == [3, 3]
+    assert results[1][0][1]["id"] == 1
+    assert results[0][0][0] >= results[0][1][0] >= results[0][2][0]
+    assert index.stats()["rows"] == 39
+    assert index.search("u2", [POSTING]) == [[]]
+
+
+def test_duplicate_analysis_reused_only_for_same_cv(tmp_path, monkeypatch):
+    """Test a near-identical posting with the same CV file finds the earlier analysis"""
+    set_repository(SqlRepository(f"sqlite:///{tmp_path / 'jobfit.db'}"))
+    monkeypatch.setattr(database, "WRITE_BEHIND", False)
+    monkeypatch.setattr(database, "_record_skill_stats", lambda rows: None)
+    database._job_index.invalidate()
+    try:
+        database.find_similar_analyses("u1", [POSTING])  # load the (empty) index, then append on save
+        database.save_analysis("u1", POSTING, {"match_score": 82, "matching_skills": ["Python"]},
+                               original_cv_path="u1/abc/cv.pdf")
+
+        duplicate = database.find_duplicate_analysis("u1", REPOSTED, "u1/abc/cv.pdf")
+        assert duplicate["match_score"] == 82 and duplicate["matching_skills"] == ["Python"]
+        assert database.find_duplicate_analysis("u1", REPOSTED, "u1/other/cv.pdf") is None
+        assert database.find_duplicate_analysis("u1", UNRELATED, "u1/abc/cv.pdf") is None
+
+        database._job_index.invalidate()
+        similar = database.find_similar_analyses("u1", [REPOSTED, UNRELATED])
+        assert [len(found) for found in similar] == [1, 0]
+        assert similar[0][0]["similarity"] > 0.8
+    finally:
+        set_repository(None)
+        database._job_index.invalidate()
+
+
+def test_index_failure_does_not_reinsert_or_double_count(tmp_path, monkeypatch):
+    """Test an error while indexing a written batch is logged, not raised back to the write buffer"""
+    set_repository(SqlRepository(f"sqlite:///{tmp_path / 'jobfit.db'}"))
+    counted = []
+    monkeypatch.setattr(database, "_record_skill_stats", lambda rows: counted.extend(rows))
+
+    def broken_append(rows):
+        raise MemoryError("no room for vectors")
+
+    monkeypatch.setattr(database._job_index, "append", broken_append)
+    try:
+        inserted = database._insert_rows("cv_analyses", [{"user_id": "u1", "job_description": POSTING}])
+        assert len(inserted) == 1 and len(counted) == 1
+    finally:
+        set_repository(None)
+        database._job_index.invalidate()
+
+
+def test_duplicate_check_reuses_the_similar_search(monkeypatch):
+    """Test the duplicate check filters an existing search result instead of searching again"""
+    monkeypatch.setattr(database, "find_similar_analyses", lambda *args, **kwargs: pytest.fail("searched again"))
+    similar = [{"id": 1, "similarity": 0.7, "original_cv_path": "u1/abc/cv.pdf"},
+               {"id": 2, "similarity": 0.95, "original_cv_path": "u1/abc/cv.pdf"}]
+
+    assert database.find_duplicate_analysis("u1", POSTING, "u1/abc/cv.pdf", similar=similar)["id"] == 2
+    assert database.find_duplicate_analysis("u1", POSTING, "u1/other/cv.pdf", similar=similar) is None
@@ -0,0 +1,22 @@
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.bench_import_time import HEAVY_MODULES
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_app_imports_without_credentials_or_heavy_libraries():
+    """Test that importing the app needs no credentials and loads service libraries lazily"""
+    code = (
+        "import json, sys; import src.main; "
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    )
+    env = {key: value for key, value in os.environ.items()
+           if not key.startswith(("SUPABASE_", "OPENAI_", "DATABASE_URL"))}
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=ROOT, env=env)
+
+    assert result.returncode == 0, result.stderr
+    assert json.loads(result.stdout.strip().splitlines()[-1]) == []
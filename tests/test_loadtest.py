@@ -0,0 +1,106 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from loadtest import fake_openai, fake_supabase
+from loadtest.driver import parse_mix, percentile
+from loadtest.latency import parse_latency
+
+
+def test_latency_specs():
+    """Test latency specs parse and sample within their bounds"""
+    assert parse_latency("0.25").sample() == 0.25
+    assert 0.1 <= parse_latency("uniform:0.1,0.2").sample() <= 0.2
+    assert parse_latency("lognormal:1.0,0.5").sample() > 0
+    for bad in ("gamma:1", "uniform:1", "constant:-1", "lognormal:a,b"):
+        with pytest.raises(ValueError):
+            parse_latency(bad)
+
+
+def test_percentile_and_mix():
+    """Test nearest-rank percentiles and session mix parsing"""
+    values = sorted(range(1, 101))
+    assert (percentile(values, 50), percentile(values, 95), percentile(values, 99)) == (50, 95, 99)
+    assert percentile([7], 99) == 7 and percentile([], 50) is None
+    assert parse_mix("analyze=3,cover_letter") == {"analyze": 3.0, "cover_letter": 1.0}
+    with pytest.raises(ValueError):
+        parse_mix("checkout=1")
+
+
+def test_fake_openai_through_the_sdk(monkeypatch):
+    """Test the openai SDK parses the fake's plain and streamed answers"""
+    from openai import OpenAI
+
+    monkeypatch.setitem(fake_openai.config, "latency", parse_latency("0"))
+    monkeypatch.setitem(fake_openai.config, "token_interval", 0.0)
+    client = OpenAI(api_key="sk-test", base_url="http://testserver/v1",
+                    http_client=TestClient(fake_openai.app, base_url="http://testserver/v1"))
+
+    response = client.responses.create(model="gpt-5-nano", input="Analyze... Return ONLY valid JSON, no other text.")
+    analysis = json.loads(response.output_text)
+    assert 0 <= analysis["match_score"] <= 100 and analysis["suggestions"]
+    assert response.usage.output_tokens > 0
+
+    stream = client.chat.completions.create(
+        model="gpt-4o-mini", messages=[{"role": "user", "content": "Write a cover letter"}], stream=True)
+    text = "".join(chunk.choices[0].delta.content or "" for chunk in stream)
+    assert text == fake_openai.COVER_LETTER
+
+
+def test_fake_supabase_tables():
+    """Test PostgREST-style filters, ordering, or-groups and unique constraints"""
+    fake_supabase.reset()
+    client = TestClient(fake_supabase.app)
+    headers = {"Authorization": f"Bearer {fake_supabase.anon_key()}", "Prefer": "return=representation"}
+
+    assert client.get("/rest/v1/cv_analyses").status_code == 401
+    rows = [{"user_id": user, "created_at": f"2024-01-0{day}T00:00:00+00:00", "job_description": "x" * 200,
+             "missing_skills": skills} for user, day, skills in
+            (("u1", 1, ["Go"]), ("u1", 2, ["Kubernetes", "Go"]), ("u1", 3, []), ("u2", 4, ["Go"]))]
+    inserted = client.post("/rest/v1/cv_analyses", json=rows, headers=headers).json()
+    assert [row["id"] for row in inserted] == [1, 2, 3, 4]
+    assert len(inserted[0]["job_description_preview"]) == fake_supabase.PREVIEW_LENGTH
+
+    def ids(**params):
+        params = {"select": "id", "user_id": "eq.u1", "order": "created_at.desc", **params}
+        return [row["id"] for row in client.get("/rest/v1/cv_analyses", params=params, headers=headers).json()]
+
+    assert ids(limit=2) == [3, 2]
+    assert ids(missing_skills="cs.{Go}") == [2, 1]
+    day2 = "2024-01-02T00:00:00+00:00"
+    assert ids(**{"or": f'(created_at.lt."{day2}",and(created_at.eq."{day2}",id.lt.3))'}) == [2, 1]
+
+    client.patch("/rest/v1/cv_analyses?id=eq.3", json={"improved_cv_path": "u1/a.docx"}, headers=headers)
+    assert client.get("/rest/v1/cv_analyses?select=improved_cv_path&id=eq.3",
+                      headers=headers).json() == [{"improved_cv_path": "u1/a.docx"}]
+
+    stats = {"user_id": "u1", "stats": {}, "version": 1}
+    assert client.post("/rest/v1/skill_analytics", json=stats, headers=headers).status_code == 201
+    duplicate = client.post("/rest/v1/skill_analytics", json=stats, headers=headers)
+    assert duplicate.status_code == 409 and duplicate.json()["code"] == "23505"
+
+
+def test_fake_supabase_auth_and_storage():
+    """Test password sign-in issues tokens the app verifies and storage round-trips with ranges"""
+    from src.services.token_verifier import verify_access_token
+
+    fake_supabase.reset()
+    client = TestClient(fake_supabase.app)
+    session = client.post("/auth/v1/token?grant_type=password",
+                          json={"email": "a@example.com", "password": "pw"}).json()
+    claims = verify_access_token(session["access_token"], secret=fake_supabase.config["jwt_secret"])["claims"]
+    assert claims["sub"] == session["user"]["id"]
+    assert client.post("/auth/v1/token?grant_type=password",
+                       json={"email": "a@example.com", "password": "wrong"}).status_code == 400
+
+    auth = {"Authorization": f"Bearer {session['access_token']}"}
+    client.post("/storage/v1/object/cv-files/u1/cv.docx", files={"file": ("cv.docx", b"0123456789", "text/plain")},
+                headers=auth)
+    partial = client.get("/storage/v1/object/authenticated/cv-files/u1/cv.docx", headers={**auth, "Range": "bytes=2-4"})
+    assert partial.status_code == 206 and partial.content == b"234"
+
+    signed = client.post("/storage/v1/object/sign/cv-files", json={"paths": ["u1/cv.docx", "u1/missing"],
+                                                                  "expiresIn": 60}, headers=auth).json()
+    assert signed[1]["signedURL"] is None
+    assert client.get(f"/storage/v1{signed[0]['signedURL']}").content == b"0123456789"
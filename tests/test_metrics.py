@@ -0,0 +1,81 @@
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from src.utils.metrics import Registry, llm_call, usage_tokens, LLM_TOKENS, LLM_REQUESTS
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Test bucket counts are cumulative and values land in the first bucket they fit"""
+    registry = Registry()
+    histogram = registry.histogram("demo_seconds", "Demo", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, "parse")
+
+    lines = registry.render().splitlines()
+    assert 'demo_seconds_bucket{stage="parse",le="0.1"} 2' in lines
+    assert 'demo_seconds_bucket{stage="parse",le="1.0"} 3' in lines
+    assert 'demo_seconds_bucket{stage="parse",le="+Inf"} 4' in lines
+    assert 'demo_seconds_count{stage="parse"} 4' in lines
+    assert 'demo_seconds_sum{stage="parse"} 3.65' in lines
+
+
+def test_stats_callbacks_become_gauges():
+    """Test numeric stats are exported and nested dicts become labels"""
+    registry = Registry()
+    registry.register_stats("demo_cache", "Demo cache", lambda: {
+        "users": 3, "hit_rate": 0.5, "kinds": {"feed": {"hits": 7}}, "name": "ignored"
+    })
+
+    lines = registry.render().splitlines()
+    assert "demo_cache_users 3" in lines
+    assert "demo_cache_hit_rate 0.5" in lines
+    assert 'demo_cache_hits{kind="feed"} 7' in lines
+    assert not [line for line in lines if "name" in line and not line.startswith("#")]
+
+
+def test_llm_usage_from_both_openai_apis():
+    """Test token counts are read from Chat Completions and Responses usage objects"""
+    chat = SimpleNamespace(prompt_tokens=120, completion_tokens=30,
+                           prompt_tokens_details=SimpleNamespace(cached_tokens=64))
+    responses = SimpleNamespace(input_tokens=200, output_tokens=50, input_tokens_details=None)
+    assert usage_tokens(chat) == (120, 30, 64)
+    assert usage_tokens(responses) == (200, 50, 0)
+    assert usage_tokens(None) == (0, 0, 0)
+
+
+def test_llm_call_counts_tokens_and_errors():
+    """Test llm_call records tokens for recorded responses and counts failures"""
+    before = LLM_TOKENS.value("test-model", "unit", "prompt")
+    with llm_call("test-model", "unit") as call:
+        call.record(SimpleNamespace(usage=SimpleNamespace(prompt_tokens=10, completion_tokens=5)))
+    try:
+        with llm_call("test-model", "unit"):
+            raise RuntimeError("timeout")
+    except RuntimeError:
+        pass
+
+    assert LLM_TOKENS.value("test-model", "unit", "prompt") == before + 10
+    assert LLM_REQUESTS.value("test-model", "unit", "error") >= 1
+
+
+def test_metrics_endpoint(monkeypatch):
+    """Test /metrics serves request and render timings in Prometheus text format"""
+    from src import main
+
+    monkeypatch.setattr(main, "METRICS_TOKEN", None)
+    client = TestClient(main.app)
+    assert client.get("/metrics").status_code == 404  # closed unless a token is configured
+
+    monkeypatch.setattr(main, "METRICS_TOKEN", "secret")
+    client.get("/login")
+    response = client.get("/metrics", headers={"Authorization": "Bearer secret"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'jobfit_http_request_seconds_count{method="GET",route="/login",status="200"}' in response.text
+    assert 'jobfit_stage_seconds_count{stage="render"}' in response.text
+    assert "jobfit_write_buffer_pending" in response.text
+
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
@@ -0,0 +1,36 @@
+from src.utils.pagination import merge_feed_pages, decode_cursor, encode_cursor
+
+
+def item(created_at, source_rank, item_id):
+    return {"created_at": created_at, "source_rank": source_rank, "id": item_id}
+
+
+def test_merge_orders_newest_first():
+    """Test that pages from several sources are merged by date"""
+    analyses = [item("2024-03-05", 0, 9), item("2024-03-01", 0, 8)]
+    cvs = [item("2024-03-04", 1, 3)]
+    letters = [item("2024-03-06", 2, 5), item("2024-02-01", 2, 4)]
+
+    items, next_cursor = merge_feed_pages([analyses, cvs, letters], limit=10)
+
+    assert [i["created_at"] for i in items] == ["2024-03-06", "2024-03-05", "2024-03-04", "2024-03-01", "2024-02-01"]
+    assert next_cursor is None
+
+
+def test_merge_returns_cursor_when_more_items():
+    """Test that a cursor is returned when the page is full"""
+    analyses = [item("2024-03-05", 0, 9), item("2024-03-01", 0, 8)]
+    letters = [item("2024-03-06", 2, 5)]
+
+    items, next_cursor = merge_feed_pages([analyses, letters], limit=2)
+
+    assert len(items) == 2
+    assert decode_cursor(next_cursor) == ("2024-03-05", 0, 9)
+
+
+def test_cursor_round_trip():
+    """Test cursor encoding with timestamps containing separators"""
+    cursor = encode_cursor(item("2024-03-05T10:00:00+00:00", 1, 42))
+    assert decode_cursor(cursor) == ("2024-03-05T10:00:00+00:00", 1, 42)
+    assert decode_cursor("garbage") is None
+    assert decode_cursor(None) is None
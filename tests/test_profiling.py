@@ -0,0 +1,104 @@
+import time
+
+from fastapi.testclient import TestClient
+
+from src.utils.profiling import RequestProfiler
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def parse_pdf_slowly():
+    busy(0.02)
+
+
+def handle_request():
+    parse_pdf_slowly()
+    busy(0.005)
+
+
+def profile_once(profiler, seconds=None):
+    profile = profiler.start()
+    start = time.perf_counter()
+    handle_request()
+    profiler.finish(profile, seconds or time.perf_counter() - start, "GET", "/analyze", 200)
+
+
+def test_collapsed_stacks_follow_the_call_chain():
+    """Test the slow callee shows up under its caller with most of the time"""
+    profiler = RequestProfiler(keep=5)
+    profile_once(profiler)
+
+    lines = profiler.collapsed(1).splitlines()
+    stacks = {line.rsplit(" ", 1)[0]: int(line.rsplit(" ", 1)[1]) for line in lines}
+    slow = [stack for stack in stacks if "handle_request" in stack and stack.split(";")[-1].startswith("busy")
+            and "parse_pdf_slowly" in stack]
+    assert slow
+    assert stacks[slow[0]] > 10_000  # microseconds
+    assert profiler.collapsed(99) is None
+
+
+def test_only_the_slowest_profiles_are_kept():
+    """Test the buffer keeps the N slowest and one profile runs at a time"""
+    profiler = RequestProfiler(keep=2)
+    for seconds in (0.3, 0.1, 0.5, 0.2):
+        profile_once(profiler, seconds)
+
+    assert [entry["seconds"] for entry in profiler.profiles()] == [0.5, 0.3]
+    assert profiler.profiled == 4
+
+    first = profiler.start()
+    assert profiler.start() is None
+    profiler.finish(first, 0.01, "GET", "/", 200)
+
+
+def test_admin_profile_endpoints(monkeypatch):
+    """Test admin-flagged requests are profiled and the endpoints need the admin token"""
+    from src import main
+
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "admin-secret")
+    monkeypatch.setattr(main, "_profiler", RequestProfiler(sample_rate=0.0, keep=5))
+    client = TestClient(main.app)
+    admin = {"X-Admin-Token": "admin-secret"}
+
+    client.get("/login")
+    client.get("/login", headers={"X-Profile": "1"})
+    client.get("/login", headers={**admin, "X-Profile": "1"})
+
+    assert client.get("/admin/profiles").status_code == 404
+    assert client.get("/admin/profiles", headers={"X-Admin-Token": "wrong"}).status_code == 404
+    profiles = client.get("/admin/profiles", headers=admin).json()["profiles"]
+    assert [(p["method"], p["path"], p["status"]) for p in profiles] == [("GET", "/login", 200)]
+
+    collapsed = client.get(f"/admin/profiles/{profiles[0]['id']}/collapsed", headers=admin)
+    assert collapsed.status_code == 200 and collapsed.text.strip()
+    assert client.get("/admin/profiles/collapsed", headers=admin).text == collapsed.text
+
+
+def test_sync_route_work_is_profiled(monkeypatch, tmp_path):
+    """Test a plain def route's work on the thread pool ends up in the request profile"""
+    from src import main
+    from src.models.user import TokenUser
+
+    def modify_cv_slowly(cv_text, suggestions, filename):
+        busy(0.02)
+        path = tmp_path / filename
+        path.write_text(cv_text)
+        return str(path), cv_text
+
+    monkeypatch.setattr(main, "_profiler", RequestProfiler(sample_rate=1.0, keep=5))
+    monkeypatch.setattr(main, "get_current_user", lambda token: TokenUser("user-1", "user@example.com"))
+    monkeypatch.setattr(main, "modify_cv", modify_cv_slowly)
+    monkeypatch.setattr(main, "upload_file", lambda *args: {"success": True, "path": "user-1/cv.docx"})
+    monkeypatch.setattr(main, "get_file_url", lambda *args: {"success": True, "url": "http://files/cv.docx"})
+    monkeypatch.setattr(main, "update_latest_analysis_improved_cv", lambda *args, **kwargs: {"success": True})
+
+    form = {"cv_text": "CV", "filename": "cv.docx", "original_cv_path": "user-1/orig.docx", "suggestions": ["Add Go"]}
+    response = TestClient(main.app).post("/process-changes", data=form, cookies={"access_token": "token"})
+    assert response.status_code == 200
+
+    stacks = [line for line in main._profiler.collapsed().splitlines() if "modify_cv_slowly" in line]
+    assert any("process_changes" in stack and ";busy" in stack for stack in stacks)
@@ -0,0 +1,164 @@
+import pytest
+
+from src.services.repository import Repository, SqlRepository
+
+
+@pytest.fixture
+def repo(tmp_path):
+    return SqlRepository(f"sqlite:///{tmp_path / 'jobfit.db'}")
+
+
+def _analysis(user_id, created_at, missing_skills=()):
+    return {
+        "user_id": user_id,
+        "job_description": "Backend engineer " * 20,
+        "match_score": 70,
+        "matching_skills": ["Python"],
+        "missing_skills": list(missing_skills),
+        "suggestions": [],
+        "cover_letter_points": [],
+        "created_at": created_at,
+    }
+
+
+def test_insert_and_list_newest_first(repo):
+    """Test that rows come back newest first with ISO created_at and native lists"""
+    repo.insert_rows("cv_analyses", [
+        _analysis("u1", "2024-01-01T10:00:00+00:00"),
+        _analysis("u1", "2024-01-02T10:00:00.123456+00:00"),
+        _analysis("u2", "2024-01-03T10:00:00+00:00"),
+    ])
+
+    rows = repo.list_user_rows("cv_analyses", "u1")
+    assert [row["created_at"] for row in rows] == ["2024-01-02T10:00:00.123456+00:00", "2024-01-01T10:00:00+00:00"]
+    assert rows[0]["matching_skills"] == ["Python"]
+    assert rows[0]["job_description_preview"] == rows[0]["job_description"][:120]
+    assert repo.latest_row_id("cv_analyses", "u1") == rows[0]["id"]
+
+
+def test_insert_drops_pending_markers(repo):
+    """Test that rows from the write-behind buffer insert cleanly"""
+    row = {**_analysis("u1", "2024-01-01T10:00:00+00:00"), "id": "pending-abc", "pending": True}
+    inserted = repo.insert_rows("cv_analyses", [row])
+    assert isinstance(inserted[0]["id"], int)
+
+
+def test_get_and_update_user_row(repo):
+    """Test lookups are scoped to the user"""
+    analysis_id = repo.insert_rows("cv_analyses", [_analysis("u1", "2024-01-01T10:00:00+00:00")])[0]["id"]
+    assert repo.get_user_row("cv_analyses", analysis_id, "u2") is None
+
+    repo.update_row("cv_analyses", analysis_id, {"improved_cv_path": "u1/improved.docx"})
+    assert repo.get_user_row("cv_analyses", analysis_id, "u1")["improved_cv_path"] == "u1/improved.docx"
+
+
+def test_rows_with_skill(repo):
+    """Test skill containment filtering on the JSON list column"""
+    repo.insert_rows("cv_analyses", [
+        _analysis("u1", "2024-01-01T10:00:00+00:00", ["Docker", "AWS"]),
+        _analysis("u1", "2024-01-02T10:00:00+00:00", ["Kubernetes"]),
+    ])
+    rows = repo.rows_with_skill("u1", "Docker", "missing_skills", ("id", "missing_skills"))
+    assert [row["missing_skills"] for row in rows] == [["Docker", "AWS"]]
+
+
+def test_feed_page_keyset(repo):
+    """Test that the feed cursor continues after the last item shown"""
+    repo.insert_rows("cover_letters", [
+        {"user_id": "u1", "name": f"Letter {i}", "created_at": f"2024-01-0{i}T10:00:00+00:00"}
+        for i in range(1, 6)
+    ])
+    columns = ("id", "created_at", "name")
+    first = repo.feed_page("cover_letters", columns, "u1", None, 2, 2)
+    assert [row["name"] for row in first] == ["Letter 5", "Letter 4"]
+
+    cursor = (first[-1]["created_at"], 2, first[-1]["id"])
+    second = repo.feed_page("cover_letters", columns, "u1", cursor, 2, 2)
+    assert [row["name"] for row in second] == ["Letter 3", "Letter 2"]
+
+
+def test_stored_object_refcounts(repo):
+    """Test acquire/release reference counting"""
+    assert repo.acquire_stored_object("u1", "hash", "u1/a.docx", 10) == "u1/a.docx"
+    assert repo.acquire_stored_object("u1", "hash", "u1/b.docx", 10) == "u1/a.docx"
+    assert repo.find_stored_object("u1", "hash") == "u1/a.docx"
+
+    assert repo.release_stored_object("u1", "u1/a.docx") == 1
+    assert repo.release_stored_object("u1", "u1/a.docx") == 0
+    assert repo.find_stored_object("u1", "hash") is None
+    assert repo.release_stored_object("u1", "u1/untracked.docx") == 0
+
+
+def test_search_analyses_ranked_with_snippets(repo):
+    """Test full-text search is per user, ranked and snippeted"""
+    repo.insert_rows("cv_analyses", [
+        {**_analysis("u1", "2024-03-01T10:00:00+00:00"), "job_description": "Data engineer at a fintech startup"},
+        {**_analysis("u1", "2024-03-02T10:00:00+00:00"), "job_description": "Frontend developer for an agency"},
+        {**_analysis("u2", "2024-03-03T10:00:00+00:00"), "job_description": "Fintech data engineer"},
+    ])
+
+    results = repo.search_analyses("u1", "fintech engineer", 10, 0)
+    assert len(results) == 1
+    assert "\x02fintech\x03" in results[0]["snippet"]
+    assert results[0]["created_at"] == "2024-03-01T10:00:00+00:00"
+
+    # Skills are searchable too, and updates are re-indexed
+    repo.update_row("cv_analyses", results[0]["id"], {"missing_skills": ["Airflow"]})
+    assert [row["id"] for row in repo.search_analyses("u1", "airflow", 10, 0)] == [results[0]["id"]]
+
+
+def test_search_index_backfills_existing_rows(tmp_path):
+    """Test that rows inserted before the FTS table existed are indexed"""
+    url = f"sqlite:///{tmp_path / 'jobfit.db'}"
+    repo = SqlRepository(url)
+    repo.insert_rows("cv_analyses", [_analysis("u1", "2024-01-01T10:00:00+00:00")])
+    with repo.engine.begin() as conn:
+        conn.exec_driver_sql("drop table cv_analyses_fts")
+
+    assert len(SqlRepository(url).search_analyses("u1", "backend", 10, 0)) == 1
+
+
+def test_skill_stats_optimistic_concurrency(repo):
+    """Test that a stale version is rejected"""
+    assert repo.get_skill_stats("u1") == (None, 0)
+    assert repo.save_skill_stats("u1", {"analyses": 1}, 0)
+    assert not repo.save_skill_stats("u1", {"analyses": 5}, 0)
+
+    stats, version = repo.get_skill_stats("u1")
+    assert stats == {"analyses": 1} and version == 1
+    assert repo.save_skill_stats("u1", {"analyses": 2}, 1)
+    assert not repo.save_skill_stats("u1", {"analyses": 3}, 1)
+    assert repo.update_skill_stats("u1", lambda stats: {"analyses": stats["analyses"] + 1})
+    assert repo.get_skill_stats("u1") == ({"analyses": 3}, 3)
+
+
+def test_incomplete_repository_fails_on_construction():
+    """Test a repository missing required methods can't be instantiated"""
+    class InsertOnly(Repository):
+        def insert_rows(self, table, rows):
+            return rows
+
+    with pytest.raises(TypeError):
+        InsertOnly()
+
+
+def test_every_stub_is_abstract():
+    """Test a repository implementing all but one interface method still can't be instantiated"""
+    methods = {name: (lambda self, *args: None) for name in Repository.__abstractmethods__}
+    assert "release_stored_object" in Repository.__abstractmethods__
+
+    del methods["release_stored_object"]
+    with pytest.raises(TypeError):
+        type("AlmostComplete", (Repository,), methods)()
+
+
+def test_iter_rows_pages_by_id(repo):
+    """Test paging visits every row once, in id order, optionally for one user"""
+    repo.insert_rows("cv_analyses", [_analysis(f"u{n % 2}", f"2024-01-0{n}T10:00:00+00:00") for n in range(1, 8)])
+
+    batches = list(repo.iter_rows("cv_analyses", ("user_id",), batch_size=3))
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+    ids = [row["id"] for batch in batches for row in batch]
+    assert ids == sorted(ids) and len(set(ids)) == 7
+    assert sum(len(batch) for batch in repo.iter_rows("cv_analyses", user_id="u1", batch_size=2)) == 4
+    assert len(repo.list_all_rows("cv_analyses")) == 7
@@ -0,0 +1,34 @@
+from src.utils.search import fts5_query, highlight_snippet, SNIPPET_START, SNIPPET_END
+
+
+def test_fts5_query_quotes_terms():
+    """Test that user input can't inject FTS5 syntax"""
+    assert fts5_query('data OR "engineer') == '"data" "OR" "engineer"*'
+    assert fts5_query("  -*() ") is None
+
+
+def test_highlight_snippet_escapes_html():
+    """Test that snippet text is escaped before adding <mark> tags"""
+    snippet = f"<b>{SNIPPET_START}Python{SNIPPET_END}</b>"
+    assert str(highlight_snippet(snippet)) == "&lt;b&gt;<mark>Python</mark>&lt;/b&gt;"
+    assert str(highlight_snippet(None)) == ""
+
+
+def test_postgres_search_ddl_comes_from_the_migration():
+    """Test SqlRepository on Postgres runs migration 004 rather than its own copy of the DDL"""
+    from src.services import sql_schema
+
+    class FakeConnection:
+        class dialect:
+            name = "postgresql"
+
+        def __init__(self):
+            self.executed = []
+
+        def exec_driver_sql(self, statement):
+            self.executed.append(statement)
+
+    conn = FakeConnection()
+    sql_schema.install_search(conn)
+    assert conn.executed == [sql_schema.POSTGRES_SEARCH_MIGRATION.read_text()]
+    assert "cv_analyses_search_idx" in conn.executed[0]
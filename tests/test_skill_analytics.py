@@ -0,0 +1,69 @@
+from src.services.skill_analytics import apply_analyses, summarize
+
+
+def _analysis(created_at, score, missing=(), matching=()):
+    return {"created_at": created_at, "match_score": score,
+            "missing_skills": list(missing), "matching_skills": list(matching)}
+
+
+def test_apply_is_incremental():
+    """Test that applying analyses one by one equals applying them together"""
+    analyses = [
+        _analysis("2024-01-05T10:00:00+00:00", 60, ["Docker", "AWS"], ["Python"]),
+        _analysis("2024-02-01T10:00:00+00:00", 80, ["docker "], ["Python", "SQL"]),
+    ]
+    stats = None
+    for analysis in analyses:
+        stats = apply_analyses(stats, [analysis])
+    assert stats == apply_analyses(None, analyses)
+
+
+def test_summarize_top_gaps_and_trend():
+    """Test recurring gaps, averages and monthly trend"""
+    stats = apply_analyses(None, [
+        _analysis("2024-01-05T10:00:00+00:00", 60, ["Docker", "AWS"]),
+        _analysis("2024-01-20T10:00:00+00:00", 70, ["docker"]),
+        _analysis("2024-02-01T10:00:00+00:00", 90, ["Kafka"], ["Docker"]),
+    ])
+    summary = summarize(stats, top_n=2)
+
+    assert summary["analyses_count"] == 3
+    assert summary["average_score"] == 73.3
+    assert summary["top_missing"] == [{"skill": "Docker", "count": 2}, {"skill": "AWS", "count": 1}]
+    assert summary["top_matching"] == [{"skill": "Docker", "count": 1}]
+    assert summary["score_trend"] == [
+        {"month": "2024-01", "average_score": 65.0, "analyses": 2},
+        {"month": "2024-02", "average_score": 90.0, "analyses": 1},
+    ]
+    assert summary["last_analysis_at"] == "2024-02-01T10:00:00+00:00"
+
+
+def test_summarize_empty():
+    """Test the summary for a user without analyses"""
+    assert summarize(None)["analyses_count"] == 0
+    assert summarize(None)["average_score"] is None
+
+
+def test_backfill_counts_every_page(tmp_path):
+    """Test the backfill recounts users from all id-ordered pages, not just the first"""
+    from scripts.backfill_skill_analytics import backfill
+    from src.services.repository import SqlRepository, get_repository, set_repository
+
+    set_repository(SqlRepository(f"sqlite:///{tmp_path / 'jobfit.db'}"))
+    try:
+        rows = [{"user_id": user_id, "job_description": "Engineer", **_analysis(f"2024-01-{day:02d}T10:00:00+00:00",
+                                                                                50 + day, ["Docker"])}
+                for day in range(1, 8) for user_id in ("u1", "u2")]
+        get_repository().insert_rows("cv_analyses", rows)
+
+        assert backfill(batch_size=3) == {"users": 2, "analyses": 14}
+        for user_id in ("u1", "u2"):
+            stats, _ = get_repository().get_skill_stats(user_id)
+            assert stats == apply_analyses(None, [row for row in rows if row["user_id"] == user_id])
+
+        # --user repairs one user from all of their pages
+        get_repository().save_skill_stats("u1", apply_analyses(None, rows[:1]), 1)
+        assert backfill("u1", batch_size=2) == {"users": 1, "analyses": 7}
+        assert get_repository().get_skill_stats("u1")[0]["analyses"] == 7
+    finally:
+        set_repository(None)
@@ -0,0 +1,71 @@
+import hashlib
+import io
+import zipfile
+
+import pytest
+
+from src.services import storage
+from src.services.repository import SqlRepository, set_repository
+from src.services.storage_backends import LocalStorageBackend
+
+
+def _docx_like(date_time, body=b"<w:document>Hello</w:document>"):
+    data = io.BytesIO()
+    with zipfile.ZipFile(data, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, content in (("[Content_Types].xml", b"<Types/>"), ("word/document.xml", body)):
+            archive.writestr(zipfile.ZipInfo(name, date_time=date_time), content)
+    return data.getvalue()
+
+
+def test_zip_digest_ignores_entry_timestamps():
+    """Test two renders of the same DOCX hash equal while different content does not"""
+    first = _docx_like((2024, 5, 1, 10, 0, 0))
+    second = _docx_like((2024, 5, 1, 10, 0, 42))
+
+    assert first != second
+    assert storage.content_digest(first) == storage.content_digest(second)
+    assert storage.content_digest(_docx_like((2024, 5, 1, 10, 0, 0), b"Other")) != storage.content_digest(first)
+
+
+def test_digest_falls_back_to_raw_bytes(monkeypatch):
+    """Test non-zip data, corrupt zips and archives past the unzip cap get the plain hash"""
+    for data in (b"%PDF-1.4 not a zip", b"PK\x03\x04 truncated archive"):
+        assert storage.content_digest(data) == hashlib.sha256(data).hexdigest()
+
+    bomb = io.BytesIO()
+    with zipfile.ZipFile(bomb, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("word/document.xml", b"\0" * (4 * 1024 * 1024))
+    monkeypatch.setattr(storage, "CONTENT_DIGEST_MAX_UNZIPPED", 1024 * 1024)
+    assert storage.content_digest(bomb.getvalue()) == hashlib.sha256(bomb.getvalue()).hexdigest()
+
+
+@pytest.fixture
+def stored(tmp_path, monkeypatch):
+    set_repository(SqlRepository(f"sqlite:///{tmp_path / 'jobfit.db'}"))
+    backend = LocalStorageBackend(str(tmp_path / "files"), "test-secret")
+    uploads = []
+    original_upload = backend.upload
+    monkeypatch.setattr(backend, "upload", lambda *args: uploads.append(args[0]) or original_upload(*args))
+    monkeypatch.setattr(storage, "get_storage_backend", lambda access_token=None: backend)
+    storage._content_index.clear()
+    storage._content_index_keys.clear()
+    yield backend, uploads
+    set_repository(None)
+
+
+def test_duplicate_upload_reuses_the_stored_object(stored):
+    """Test re-uploading the same bytes transfers nothing and returns the existing path"""
+    backend, uploads = stored
+    data = _docx_like((2024, 5, 1, 10, 0, 0))
+
+    first = storage.upload_bytes(data, "cv.docx", "u1")
+    storage._content_index.clear()  # force the database lookup
+    second = storage.upload_bytes(_docx_like((2024, 5, 1, 11, 0, 0)), "renamed.docx", "u1")
+
+    assert first["deduplicated"] is False and second["deduplicated"] is True
+    assert second["path"] == first["path"] and uploads == [first["path"]]
+
+    # Each upload holds a reference; the object goes once both are released
+    assert storage.delete_file(first["path"]) == {"success": True, "deleted": False}
+    assert backend.stat(first["path"])["size"] == len(data)
+    assert storage.delete_file(first["path"]) == {"success": True, "deleted": True}
@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+from src.services.storage_backends import LocalStorageBackend, StorageBackend
+
+
+def make_backend(tmp_path):
+    return LocalStorageBackend(str(tmp_path), "test-secret")
+
+
+def test_local_upload_and_download(tmp_path):
+    """Test that uploaded bytes come back unchanged"""
+    backend = make_backend(tmp_path)
+    backend.upload("user-1/resume.docx", b"hello world")
+
+    assert backend.download("user-1/resume.docx") == b"hello world"
+    assert backend.stat("user-1/resume.docx")["size"] == 11
+
+
+def test_local_objects_are_sharded(tmp_path):
+    """Test that objects land two directory levels below the root"""
+    backend = make_backend(tmp_path)
+    backend.upload("user-1/resume.docx", b"data")
+
+    object_path = backend._object_path("user-1/resume.docx")
+    relative = os.path.relpath(object_path, str(tmp_path))
+    assert len(relative.split(os.sep)) == 3
+    assert not [name for name in os.listdir(os.path.dirname(object_path)) if name.startswith(".upload-")]
+
+
+def test_local_range_read(tmp_path):
+    """Test streaming a byte range"""
+    backend = make_backend(tmp_path)
+    backend.upload_stream("user-1/big.docx", [b"0123456789"] * 10)
+
+    data = b"".join(backend.iter_range("user-1/big.docx", 5, 14, chunk_size=4))
+    assert data == b"5678901234"
+
+
+def test_local_signed_url(tmp_path):
+    """Test that signed URLs verify and tampering is rejected"""
+    backend = make_backend(tmp_path)
+    url = backend.signed_url("user-1/resume.docx", 60)
+
+    query = dict(part.split("=") for part in url.split("?")[1].split("&"))
+    assert backend.verify_signature("user-1/resume.docx", query["expires"], query["signature"])
+    assert not backend.verify_signature("user-2/resume.docx", query["expires"], query["signature"])
+    assert not backend.verify_signature("user-1/resume.docx", "1", query["signature"])
+
+
+def test_local_delete(tmp_path):
+    """Test that deleted objects are gone"""
+    backend = make_backend(tmp_path)
+    backend.upload("user-1/resume.docx", b"data")
+    backend.delete("user-1/resume.docx")
+
+    assert not os.path.exists(backend._object_path("user-1/resume.docx"))
+
+
+def test_incomplete_backend_fails_on_construction():
+    """Test a backend missing required methods can't be instantiated"""
+    class UploadOnly(StorageBackend):
+        def upload(self, storage_path, data, content_type=None):
+            pass
+
+    with pytest.raises(TypeError):
+        UploadOnly()
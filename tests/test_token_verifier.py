@@ -0,0 +1,69 @@
+import base64
+import hashlib
+import hmac
+import json
+import time
+
+from src.services.token_verifier import verify_access_token, get_token_expiry
+
+SECRET = "test-jwt-secret"
+
+
+def _encode(data):
+    raw = json.dumps(data).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def make_token(payload, secret=SECRET, alg="HS256"):
+    header = _encode({"alg": alg, "typ": "JWT"})
+    body = _encode(payload)
+    signature = hmac.new(secret.encode(), f"{header}.{body}".encode(), hashlib.sha256).digest()
+    return f"{header}.{body}.{base64.urlsafe_b64encode(signature).rstrip(b'=').decode()}"
+
+
+def valid_payload(**overrides):
+    payload = {
+        "sub": "user-123",
+        "email": "jane@example.com",
+        "aud": "authenticated",
+        "exp": int(time.time()) + 3600,
+        "user_metadata": {"name": "Jane"}
+    }
+    payload.update(overrides)
+    return payload
+
+
+def test_valid_hs256_token():
+    """Test that a correctly signed token is accepted"""
+    result = verify_access_token(make_token(valid_payload()), secret=SECRET)
+    assert result["success"]
+    assert result["claims"]["sub"] == "user-123"
+
+
+def test_wrong_secret_rejected():
+    """Test that a token signed with another secret is rejected outright"""
+    result = verify_access_token(make_token(valid_payload(), secret="other"), secret=SECRET)
+    assert not result["success"]
+    assert not result.get("unverifiable")
+
+
+def test_expired_token_rejected():
+    """Test that expired tokens are rejected"""
+    token = make_token(valid_payload(exp=int(time.time()) - 3600))
+    result = verify_access_token(token, secret=SECRET)
+    assert not result["success"]
+    assert result["error"] == "Token expired"
+
+
+def test_unsupported_algorithm_is_unverifiable():
+    """Test that tokens we can't check locally are left to the remote lookup"""
+    token = make_token(valid_payload(), alg="ES256")
+    result = verify_access_token(token, secret=SECRET)
+    assert not result["success"]
+    assert result["unverifiable"]
+
+
+def test_malformed_token():
+    """Test that garbage input is rejected"""
+    assert not verify_access_token("not-a-token", secret=SECRET)["success"]
+    assert get_token_expiry("not-a-token") is None
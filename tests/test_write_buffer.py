@@ -0,0 +1,112 @@
+from src.services.write_buffer import WriteBuffer
+
+
+class FakeTable:
+    def __init__(self, fail_times=0):
+        self.inserts = []
+        self.fail_times = fail_times
+
+    def insert_rows(self, table, rows):
+        if self.fail_times > 0:
+            self.fail_times -= 1
+            raise RuntimeError("database unavailable")
+        self.inserts.append((table, rows))
+
+
+def make_buffer(tmp_path, db, **kwargs):
+    # A long flush interval keeps the background thread out of the way
+    return WriteBuffer(db.insert_rows, str(tmp_path), flush_interval=3600, **kwargs)
+
+
+def test_rows_are_batched_per_table(tmp_path):
+    """Test that queued rows are written with one insert per table"""
+    db = FakeTable()
+    buffer = make_buffer(tmp_path, db)
+    buffer.enqueue("cv_analyses", {"user_id": "u1", "match_score": 80})
+    buffer.enqueue("cv_analyses", {"user_id": "u1", "match_score": 60})
+    buffer.enqueue("cover_letters", {"user_id": "u1", "company_name": "Acme"})
+
+    buffer.flush()
+
+    assert [(table, len(rows)) for table, rows in db.inserts] == [("cv_analyses", 2), ("cover_letters", 1)]
+    assert buffer.stats()["pending"] == 0
+    buffer.stop()
+
+
+def test_pending_rows_are_readable(tmp_path):
+    """Test read-your-writes and updates before the flush"""
+    db = FakeTable()
+    buffer = make_buffer(tmp_path, db)
+    pending_id = buffer.enqueue("cv_analyses", {"user_id": "u1", "match_score": 80})
+    buffer.enqueue("cv_analyses", {"user_id": "u2", "match_score": 10})
+
+    rows = buffer.pending_rows("cv_analyses", user_id="u1")
+    assert len(rows) == 1
+    assert rows[0]["id"] == pending_id and rows[0]["pending"]
+
+    assert buffer.update_pending(pending_id, {"improved_cv_path": "u1/x.docx"})
+    buffer.flush()
+    assert db.inserts[0][1][0]["improved_cv_path"] == "u1/x.docx"
+    assert not buffer.update_pending(pending_id, {"improved_cv_path": "late"})
+    buffer.stop()
+
+
+def test_failed_inserts_are_retried(tmp_path):
+    """Test that rows stay queued when the insert fails"""
+    db = FakeTable(fail_times=2)
+    buffer = make_buffer(tmp_path, db)
+    buffer.enqueue("cv_analyses", {"user_id": "u1"})
+
+    buffer.flush()
+    assert buffer.stats()["pending"] == 1
+
+    buffer.flush(force=True)
+    assert buffer.stats()["pending"] == 0
+    assert len(db.inserts) == 1
+    buffer.stop()
+
+
+def test_spool_survives_restart(tmp_path):
+    """Test that unwritten rows are recovered by the next buffer"""
+    failing_db = FakeTable(fail_times=1000)
+    first = make_buffer(tmp_path, failing_db)
+    first.enqueue("generated_cvs", {"user_id": "u1", "name": "Jane"})
+    first.stop()
+
+    db = FakeTable()
+    second = make_buffer(tmp_path, db)
+    second.start()
+    assert second.pending_rows("generated_cvs")[0]["name"] == "Jane"
+
+    second.flush()
+    assert db.inserts == [("generated_cvs", [{"user_id": "u1", "name": "Jane"}])]
+    second.stop()
+
+
+def test_enqueue_leaves_fsync_to_the_flush_thread(tmp_path, monkeypatch):
+    """Test enqueue doesn't fsync, and one flush cycle syncs all queued rows at once"""
+    import os
+
+    synced = []
+    monkeypatch.setattr(os, "fsync", lambda fd: synced.append(fd))
+    db = FakeTable()
+    buffer = make_buffer(tmp_path, db)
+    for score in range(5):
+        buffer.enqueue("cv_analyses", {"user_id": "u1", "match_score": score})
+    assert synced == []
+
+    buffer._sync_spool()
+    buffer._sync_spool()
+    assert len(synced) == 1
+    buffer.stop()
+
+
+def test_merge_pending_matches_trimmed_timestamps():
+    """Test a row flushed during a read isn't shown twice when PostgREST trims its timestamp"""
+    from src.services.database import _merge_pending
+
+    pending = [{"id": "pending-1", "created_at": "2024-05-01T10:00:00.120000+00:00", "pending": True},
+               {"id": "pending-2", "created_at": "2024-05-01T10:00:01.500000+00:00", "pending": True}]
+    rows = [{"id": 7, "created_at": "2024-05-01T10:00:00.12+00:00"}]
+
+    assert [row["id"] for row in _merge_pending(pending, rows)] == ["pending-2", 7]